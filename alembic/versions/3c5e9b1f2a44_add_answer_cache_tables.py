@@ -0,0 +1,46 @@
+"""add_answer_cache_tables
+
+Revision ID: 3c5e9b1f2a44
+Revises: 80208e820e40
+Create Date: 2026-10-18 10:12:03.418227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5e9b1f2a44'
+down_revision: Union[str, None] = '80208e820e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('answer_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('collection_name', sa.String(length=128), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(
+        op.f('ix_answer_cache_collection_name'),
+        'answer_cache',
+        ['collection_name'],
+        unique=False,
+    )
+    op.create_table('collection_versions',
+    sa.Column('collection_name', sa.String(length=128), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('collection_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('collection_versions')
+    op.drop_index(op.f('ix_answer_cache_collection_name'), table_name='answer_cache')
+    op.drop_table('answer_cache')
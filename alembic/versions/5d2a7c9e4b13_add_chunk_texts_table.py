@@ -0,0 +1,39 @@
+"""add_chunk_texts_table
+
+Revision ID: 5d2a7c9e4b13
+Revises: 3c5e9b1f2a44
+Create Date: 2026-10-18 14:37:51.902614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a7c9e4b13'
+down_revision: Union[str, None] = '3c5e9b1f2a44'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('chunk_texts',
+    sa.Column('chunk_id', sa.String(length=255), nullable=False),
+    sa.Column('doc_id', sa.String(length=255), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('language', sa.String(length=32), nullable=False),
+    sa.Column('source', sa.Text(), nullable=False),
+    sa.Column('chunk_index', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('chunk_id')
+    )
+    op.create_index(
+        op.f('ix_chunk_texts_doc_id'), 'chunk_texts', ['doc_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_chunk_texts_doc_id'), table_name='chunk_texts')
+    op.drop_table('chunk_texts')
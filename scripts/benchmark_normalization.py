@@ -0,0 +1,72 @@
+from __future__ import annotations
+import random
+import string
+import sys
+import timeit
+
+from git_day_practice.normalization import (
+    DEFAULT_DICTIONARY_PATH,
+    RomanUrduNormalizer,
+    load_dictionary,
+)
+from git_day_practice.spelling import SymSpellIndex
+
+
+def synthetic_dictionary(size: int, seed: int = 0) -> dict[str, str]:
+    """Bundled entries plus random variants (10% multi-word phrases) up to size."""
+    rng = random.Random(seed)
+    replacements = load_dictionary(DEFAULT_DICTIONARY_PATH)
+
+    def word() -> str:
+        return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+    while len(replacements) < size:
+        if rng.random() < 0.1:
+            variant = " ".join(word() for _ in range(rng.randint(2, 3)))
+        else:
+            variant = word()
+        replacements[variant] = word()
+    return replacements
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    normalizer = RomanUrduNormalizer(synthetic_dictionary(size))
+    queries = [
+        "qdrant kia karta he",
+        "mjhe retrival ka javab btado",
+        "docker compose kia krta hy",
+        "vector db kese kaam karta hai is mein kya hota hai",
+    ]
+    runs = 20_000
+
+    uncached = timeit.timeit(
+        lambda: [normalizer.normalize_text(q) for q in queries], number=runs
+    )
+    cached = timeit.timeit(
+        lambda: [normalizer.normalize(q) for q in queries], number=runs
+    )
+    batch = timeit.timeit(lambda: normalizer.normalize_many(queries), number=runs)
+    calls = runs * len(queries)
+
+    print(f"Dictionary entries: {normalizer.size}")
+    print(f"Uncached: {uncached / calls * 1e6:.2f} us/call")
+    print(f"Cached:   {cached / calls * 1e6:.2f} us/call")
+    print(f"Batch:    {batch / calls * 1e6:.2f} us/query")
+
+    replacements = synthetic_dictionary(size)
+    vocabulary = {
+        canonical: 1 for canonical in replacements.values() if " " not in canonical
+    }
+    corrector = SymSpellIndex.build(vocabulary, replacements)
+    misspelled = ["retreival", "qdrnat", "mujhayy", "embeddng", "zzzzzzzz"]
+    lookup = timeit.timeit(
+        lambda: [corrector._correct(term) for term in misspelled], number=2_000
+    )
+    print(f"Spelling index: {len(corrector)} words")
+    per_term = lookup / (2_000 * len(misspelled))
+    print(f"Correction: {per_term * 1e6:.2f} us/term (uncached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import sys
+import time
+from pathlib import Path
+
+from git_day_practice.ivf_index import IVFIndex
+from git_day_practice.local_index import load_local_index, recall_at_k
+from git_day_practice.settings import settings
+
+
+def main() -> None:
+    n_clusters = int(sys.argv[1]) if len(sys.argv) > 1 else settings.ivf_n_clusters
+    output = Path(settings.ivf_index_path)
+
+    exact = load_local_index(settings.local_index_path)
+    started = time.perf_counter()
+    index = IVFIndex.build(
+        exact.vectors, exact.payloads, n_clusters=n_clusters, nprobe=settings.ivf_nprobe
+    )
+    build_seconds = time.perf_counter() - started
+    index.save(output)
+
+    loaded = IVFIndex.load(output)
+    queries = exact.vectors[: min(len(exact), 200)].tolist()
+    sizes = loaded.list_sizes()
+
+    print(
+        f"Vectors indexed: {len(loaded)} in {loaded.n_clusters} lists "
+        f"({build_seconds:.1f}s to train)"
+    )
+    print(f"List sizes: min {min(sizes)}, max {max(sizes)}")
+    print(f"File: {output} ({output.stat().st_size} bytes)")
+    base = settings.ivf_nprobe
+    for nprobe in sorted({1, base // 2 or 1, base, base * 2}):
+        loaded.nprobe = nprobe
+        recall = recall_at_k(loaded, exact, queries, k=5)
+        print(f"Recall@5 vs exact search (nprobe={nprobe}): {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+import sys
+from pathlib import Path
+
+from git_day_practice.disk_index import MappedVectorIndex, write_vector_store
+from git_day_practice.local_index import load_local_index, recall_at_k
+from git_day_practice.settings import settings
+
+
+def main() -> None:
+    quantization = sys.argv[1] if len(sys.argv) > 1 else "int8"
+    output = Path(settings.mmap_index_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    exact = load_local_index(settings.local_index_path)
+    write_vector_store(output, exact.vectors, exact.payloads, quantization=quantization)
+
+    index = MappedVectorIndex(
+        output,
+        prefilter_factor=settings.mmap_prefilter_factor,
+        rescore_factor=settings.mmap_rescore_factor,
+    )
+    queries = exact.vectors[: min(len(exact), 200)].tolist()
+    bytes_per_vector = index.quantized.itemsize * index.dim
+
+    print(f"Vectors written: {len(index)} (dim {index.dim}, {quantization})")
+    print(f"File: {output} ({output.stat().st_size} bytes)")
+    float32_bytes = exact.vectors.itemsize * index.dim
+    print(f"Scan bytes per vector: {bytes_per_vector} vs {float32_bytes} for float32")
+    print(f"Recall@5 vs exact search: {recall_at_k(index, exact, queries, k=5):.3f}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
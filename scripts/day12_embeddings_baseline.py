@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import hashlib
 import json
 import os
 from pathlib import Path
@@ -9,37 +8,18 @@ from typing import Any
 from qdrant_client import QdrantClient, models
 from sentence_transformers import SentenceTransformer
 
+from git_day_practice.embedding_cache import EmbeddingCache
+
 # Configuration
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 COLLECTION_NAME = "week2_day12_docs"
 DATA_FILE = Path("data/day12_documents.json")
 CACHE_DIR = Path(".cache/embeddings")
-CACHE_FILE = CACHE_DIR / "day12_embedding_cache.json"
+CACHE_FILE = CACHE_DIR / "embeddings.sqlite"
 HF_CACHE_DIR = Path(".cache/huggingface")
 QDRANT_URL = os.getenv("QDRANT_URL", "http://127.0.0.1:6333")
 
 
-def sha256_text(text: str) -> str:
-    """Create a unique hash for each text"""
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
-
-def load_embedding_cache() -> dict[str, list[float]]:
-    """Load cached embeddings if they exist"""
-    if CACHE_FILE.exists():
-        return json.loads(CACHE_FILE.read_text(encoding="utf-8"))
-    return {}
-
-
-def save_embedding_cache(cache: dict[str, list[float]]) -> None:
-    """Save embeddings to cache"""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    CACHE_FILE.write_text(
-        json.dumps(cache, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-
-
 def load_documents() -> list[dict[str, Any]]:
     """Load the sample documents"""
     return json.loads(DATA_FILE.read_text(encoding="utf-8"))
@@ -56,27 +36,20 @@ def get_or_compute_embeddings(
     documents: list[dict[str, Any]],
 ) -> list[list[float]]:
     """Get embeddings from cache or compute new ones"""
-    cache = load_embedding_cache()
-    vectors: list[list[float]] = []
+    cache = EmbeddingCache(CACHE_FILE)
+    texts = [doc["text"] for doc in documents]
+    cached = cache.get_many(MODEL_NAME, texts)
 
-    for doc in documents:
-        text = doc["text"]
-        key = sha256_text(text)
-
-        if key in cache:
-            # Use cached embedding
-            vector = cache[key]
+    for text, vector in zip(texts, cached, strict=True):
+        if vector is not None:
             print(f"✓ Cached: {text[:30]}...")
         else:
-            # Compute new embedding
-            vector = model.encode(text, normalize_embeddings=True).tolist()
-            cache[key] = vector
             print(f"🆕 New: {text[:30]}...")
 
-        vectors.append(vector)
-
-    save_embedding_cache(cache)
-    return vectors
+    # Only the misses are encoded, in a single batch
+    vectors = cache.encode(model, MODEL_NAME, texts, normalize_embeddings=True)
+    cache.close()
+    return vectors.tolist()
 
 
 def recreate_collection(client: QdrantClient, vector_size: int) -> None:
@@ -1,22 +1,43 @@
 from __future__ import annotations
-import json
 import os
 from pathlib import Path
 
 from qdrant_client import models
 from sentence_transformers import SentenceTransformer
 
-from git_day_practice.ingestion import build_chunk_records
-from git_day_practice.vector_store import get_qdrant_client, recreate_collection
+from git_day_practice.answer_cache import bump_collection_version
+from git_day_practice.bm25_index import BM25Index
+from git_day_practice.chunk_store import get_chunk_store, slim_payload
+from git_day_practice.embedding_cache import EmbeddingCache
+from git_day_practice.embedding_workers import EmbeddingWorkerPool
+from git_day_practice.ingestion import chunk_point_id, iter_json_array, token_counter
+from git_day_practice.ingestion_pipeline import run_ingestion_pipeline
+from git_day_practice.settings import settings
+from git_day_practice.spelling import save_vocabulary
+from git_day_practice.vector_store import (
+    delete_stale_chunks,
+    ensure_collection,
+    fetch_content_hashes,
+    get_qdrant_client,
+    has_legacy_point_ids,
+)
 
 MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-COLLECTION_NAME = "week2_day13_chunks"
+COLLECTION_NAME = settings.qdrant_collection_name
 DATA_FILE = Path("data/raw/day13_documents.json")
 HF_CACHE_DIR = Path(".cache/huggingface")
-
-
-def load_documents() -> list[dict]:
-    return json.loads(DATA_FILE.read_text(encoding="utf-8"))
+EMBEDDING_CACHE_FILE = Path(settings.embedding_cache_path)
+BM25_INDEX_FILE = Path(settings.bm25_index_path)
+BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", "4"))
+QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+FULL_REBUILD = os.getenv("INGEST_FULL_REBUILD", "") == "1"
+# 0 encodes in this process; N > 0 fans batches out to N worker processes
+EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "0"))
+TORCH_THREADS = int(os.getenv("INGEST_TORCH_THREADS", "1"))
+SNAP_TO_SENTENCES = os.getenv("INGEST_SNAP_SENTENCES", "") == "1"
+# Token budget per chunk; 0 keeps the plain 80-word windows
+MAX_CHUNK_TOKENS = int(os.getenv("INGEST_MAX_TOKENS", "0"))
 
 
 def get_model() -> SentenceTransformer:
@@ -24,40 +45,149 @@ def get_model() -> SentenceTransformer:
     return SentenceTransformer(MODEL_NAME)
 
 
-def main() -> None:
-    documents = load_documents()
-    chunk_records = build_chunk_records(documents)
-
-    if not chunk_records:
-        raise RuntimeError("No chunk records were created.")
+def get_chunk_options() -> dict:
+    options: dict = {"snap_to_sentences": SNAP_TO_SENTENCES}
+    if MAX_CHUNK_TOKENS > 0:
+        from transformers import AutoTokenizer
+        options["max_tokens"] = MAX_CHUNK_TOKENS
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        options["count_tokens"] = token_counter(tokenizer)
+    return options
 
-    model = get_model()
-    vectors = model.encode(
-        [record["text"] for record in chunk_records],
-        normalize_embeddings=True,
-    ).tolist()
 
-    vector_size = len(vectors[0])
+def main() -> None:
+    os.environ.setdefault("HF_HOME", str(HF_CACHE_DIR.resolve()))
+    worker_pool = (
+        EmbeddingWorkerPool(
+            MODEL_NAME,
+            EMBED_WORKERS,
+            torch_threads=TORCH_THREADS,
+            encode_batch_size=BATCH_SIZE,
+        )
+        if EMBED_WORKERS > 0
+        else None
+    )
+    model = get_model() if worker_pool is None else None
     client = get_qdrant_client()
-    recreate_collection(client, COLLECTION_NAME, vector_size)
-
-    points = []
-    for idx, (record, vector) in enumerate(
-        zip(chunk_records, vectors, strict=False), start=1
-    ):
-        points.append(
-            models.PointStruct(
-                id=idx,
-                vector=vector,
-                payload=record,
+    embedding_cache = EmbeddingCache(EMBEDDING_CACHE_FILE)
+    # Collections written before chunk_point_id use enumerate() integer ids;
+    # upserting UUID points next to them would duplicate every chunk
+    full_rebuild = FULL_REBUILD or has_legacy_point_ids(client, COLLECTION_NAME)
+    if full_rebuild and not FULL_REBUILD:
+        print("Collection uses legacy integer point ids; rebuilding it in full")
+    if full_rebuild and client.collection_exists(COLLECTION_NAME):
+        client.delete_collection(COLLECTION_NAME)
+    # With slim payloads Qdrant keeps only ids and hashes; chunk text lives in the
+    # chunk store
+    chunk_store = get_chunk_store() if settings.slim_payloads else None
+    if BM25_INDEX_FILE.exists() and not full_rebuild:
+        bm25 = BM25Index.load(BM25_INDEX_FILE)
+    else:
+        bm25 = BM25Index()
+
+    def select_changed(records: list[dict]) -> list[dict]:
+        point_ids = [chunk_point_id(record["chunk_id"]) for record in records]
+        stored = fetch_content_hashes(client, COLLECTION_NAME, point_ids)
+        changed = [
+            record for record in records
+            if stored.get(chunk_point_id(record["chunk_id"])) != record["content_hash"]
+        ]
+        # The lexical index is updated batch by batch, including chunks it lost
+        # track of
+        changed_ids = {record["chunk_id"] for record in changed}
+        bm25.add(
+            record for record in records
+            if record["chunk_id"] in changed_ids or record["chunk_id"] not in bm25
+        )
+        if chunk_store is not None:
+            chunk_ids = [record["chunk_id"] for record in records]
+            stored_chunks = chunk_store.get_many(chunk_ids)
+            chunk_store.put_many(
+                record for record in records
+                if record["chunk_id"] in changed_ids
+                or record["chunk_id"] not in stored_chunks
             )
+        return changed
+
+    def encode(texts: list[str]):
+        # Texts embedded by earlier runs (or a full rebuild) are read back from disk
+        return embedding_cache.encode(
+            model, MODEL_NAME, texts, batch_size=BATCH_SIZE, normalize_embeddings=True
+        )
+
+    def upsert(records: list[dict], vectors: list[list[float]]) -> None:
+        client.upsert(
+            collection_name=COLLECTION_NAME,
+            points=[
+                models.PointStruct(
+                    id=chunk_point_id(record["chunk_id"]),
+                    vector=vector,
+                    payload=slim_payload(record) if chunk_store is not None else record,
+                )
+                for record, vector in zip(records, vectors, strict=True)
+            ],
+        )
+
+    def print_progress(report: dict) -> None:
+        print(
+            f"  {report['documents']} docs, {report['chunks']} chunks, "
+            f"{report['upserted']} upserted "
+            f"({report['chunks_per_second']:.1f} chunks/s)"
+        )
+
+    def encode_stream(text_batches):
+        return worker_pool.encode_stream(text_batches, cache=embedding_cache)
+
+    try:
+        report = run_ingestion_pipeline(
+            iter_json_array(DATA_FILE),
+            encode,
+            upsert,
+            batch_size=BATCH_SIZE,
+            upsert_workers=UPSERT_WORKERS,
+            queue_size=QUEUE_SIZE,
+            on_first_vectors=lambda size: ensure_collection(
+                client, COLLECTION_NAME, size
+            ),
+            select_changed=select_changed,
+            progress=print_progress,
+            encode_stream=encode_stream if worker_pool is not None else None,
+            chunk_options=get_chunk_options(),
         )
+    finally:
+        if worker_pool is not None:
+            worker_pool.close()
 
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
+    if not report["chunks"]:
+        raise RuntimeError("No chunk records were created.")
 
-    print(f"Documents loaded: {len(documents)}")
-    print(f"Chunks created: {len(chunk_records)}")
+    stale = delete_stale_chunks(client, COLLECTION_NAME, report["doc_chunk_counts"])
+    bm25.prune(report["doc_chunk_counts"])
+    if chunk_store is not None:
+        chunk_store.delete_documents(report["doc_chunk_counts"])
+    bm25.save(BM25_INDEX_FILE)
+    # Known terms for query spelling correction
+    save_vocabulary(settings.spelling_vocabulary_path, bm25.vocabulary())
+
+    # Cached answers were built from the old chunks
+    changed = report["upserted"] or stale["deleted_docs"] or stale["shrunk_docs"]
+    collection_version = bump_collection_version(COLLECTION_NAME) if changed else None
+
+    print(f"Documents loaded: {report['documents']}")
+    print(f"Chunks created: {report['chunks']}")
+    print(f"Chunks upserted: {report['upserted']}")
+    print(f"Chunks unchanged: {report['unchanged']}")
+    print(f"Documents removed: {len(stale['deleted_docs'])}")
+    print(f"Documents shrunk: {len(stale['shrunk_docs'])}")
+    print(f"Failed batches: {report['failed_batches']}")
+    print(f"Embedding workers: {EMBED_WORKERS or 'in-process'}")
+    print(
+        f"Throughput: {report['docs_per_second']:.1f} docs/s, "
+        f"{report['chunks_per_second']:.1f} chunks/s"
+    )
+    print(f"BM25 index: {BM25_INDEX_FILE} ({len(bm25)} chunks)")
     print(f"Collection ready: {COLLECTION_NAME}")
+    print(f"Collection version: {collection_version or 'unchanged'}")
 
 
 if __name__ == "__main__":
@@ -17,10 +17,10 @@ def main() -> None:
         for idx, item in enumerate(result["results"], start=1):
             print({
                 "rank": idx,
-                "score": item["score"],
-                "chunk_id": item["chunk_id"],
-                "title": item["title"],
-                "text": item["text"][:200] + "..." if len(item["text"]) > 200 else item["text"],
+                "score": item.score,
+                "chunk_id": item.chunk_id,
+                "title": item.title,
+                "text": item.text[:200] + "..." if len(item.text) > 200 else item.text,
             })
 
 if __name__ == "__main__":
@@ -1,9 +1,21 @@
 from __future__ import annotations
 import json
-from typing import Any
-from git_day_practice.guardrails import choose_rag_action
-from git_day_practice.llm_client import generate_answer_from_prompt
-from git_day_practice.retrieval import dual_query_search
+import time
+from typing import Any, AsyncIterator
+from git_day_practice.answer_cache import (
+    get_or_generate_answer,
+    get_or_generate_answer_async,
+)
+from git_day_practice.context_packing import ContextPassage, build_context_passages
+from git_day_practice.guardrails import check_query, check_results, compute_confidence
+from git_day_practice.llm_client import (
+    generate_answer_from_prompt,
+    generate_answer_from_prompt_async,
+)
+from git_day_practice.normalization import normalize_roman_urdu
+from git_day_practice.rag import stream_answer_events
+from git_day_practice.retrieval import dual_query_search, dual_query_search_async
+from git_day_practice.retrieved_chunk import RetrievedChunk
 
 
 def build_agent_plan(question: str) -> list[str]:
@@ -16,25 +28,30 @@ def build_agent_plan(question: str) -> list[str]:
     ]
 
 
-def build_context_block(results: list[dict]) -> str:
-    """Build a formatted context block from retrieval results."""
+def build_context_block(passages: list[ContextPassage]) -> str:
+    """Build a formatted context block from packed passages.
+
+    See build_context_passages.
+
+    Passage N is labelled [Source N].
+    """
     parts: list[str] = []
     
-    for idx, item in enumerate(results, start=1):
+    for idx, item in enumerate(passages, start=1):
         parts.append(
             f"[Source {idx}]\n"
-            f"doc_id: {item['doc_id']}\n"
-            f"chunk_id: {item['chunk_id']}\n"
-            f"title: {item.get('title', 'Unknown')}\n"
-            f"text: {item['text']}\n"
+            f"doc_id: {item.doc_id}\n"
+            f"chunk_id: {', '.join(item.chunk_ids)}\n"
+            f"title: {item.title or 'Unknown'}\n"
+            f"text: {item.text}\n"
         )
     
     return "\n".join(parts)
 
 
-def build_agent_prompt(question: str, results: list[dict]) -> str:
+def build_agent_prompt(question: str, passages: list[ContextPassage]) -> str:
     """Build the prompt for answer generation."""
-    context = build_context_block(results)
+    context = build_context_block(passages)
     
     return f"""Answer the question using only the context below.
 
@@ -53,78 +70,230 @@ Rules:
 Answer:""".strip()
 
 
-def build_confidence_dict(results: list[dict]) -> dict:
+def build_confidence_dict(results: list[RetrievedChunk] | list[dict]) -> dict:
     """Build confidence object from results."""
-    if not results:
-        return {
-            "top_score": 0.0,
-            "avg_score": 0.0,
-            "result_count": 0
-        }
-    
-    scores = [r.get("score", 0.0) for r in results]
+    return compute_confidence(results)
+
+
+AGENT_FALLBACK_ANSWERS = {
+    "clarify": (
+        "I'm not sure I understand. "
+        "Please clarify your question with more specific details."
+    ),
+    "refuse": "I cannot answer that question as I don't have enough reliable context.",
+}
+
+
+def _lap(timings: dict[str, float], stage: str, stage_started: float) -> float:
+    """Record a stage's duration in milliseconds; returns the time it ended."""
+    now = time.perf_counter()
+    timings[stage] = round((now - stage_started) * 1000, 1)
+    return now
+
+
+def _skipped_retrieval_payload(question: str) -> dict:
+    """Stand-in retrieval payload when a query guard answers before retrieval."""
     return {
-        "top_score": max(scores),
-        "avg_score": sum(scores) / len(scores),
-        "result_count": len(results)
+        "normalized_query": normalize_roman_urdu(question),
+        "retrieval_path": "skipped",
+        "results": [],
+    }
+
+
+def _build_agent_result(
+    question: str,
+    plan: list[str],
+    retrieval_payload: dict,
+    decision: dict,
+    answer: str,
+    cache_type: str | None = None,
+    timings: dict[str, float] | None = None,
+    sources: list[RetrievedChunk] | None = None,
+) -> dict[str, Any]:
+    """sources defaults to the retrieved results; answers pass the cited passages."""
+    results = retrieval_payload["results"]
+    return {
+        "question": question,
+        "normalized_query": retrieval_payload["normalized_query"],
+        "retrieval_path": retrieval_payload["retrieval_path"],
+        "plan": plan,
+        "action": decision["action"],
+        "reason": decision["reason"],
+        "answer_cache_hit": cache_type is not None,
+        "answer_cache_type": cache_type,
+        "answer": answer,
+        "sources": results if sources is None else sources,
+        "confidence": build_confidence_dict(results),
+        "stage_timings_ms": timings or {},
     }
 
 
 def run_agent_loop(question: str, limit: int = 3) -> dict[str, Any]:
     """
     Run the controlled agent loop:
-    Plan -> Retrieve -> Judge -> Answer/Clarify/Refuse
+    Plan -> Check query -> Retrieve -> Judge -> Answer/Clarify/Refuse
+
+    Query-only guards run before retrieval, so a vague question gets its
+    clarify response without paying for search. Each stage's duration is
+    recorded in "stage_timings_ms".
     """
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
     # Step 1: Plan
     plan = build_agent_plan(question)
     
-    # Step 2: Retrieve
+    # Step 2: Guards that need only the question
+    decision = check_query(question)
+    mark = _lap(timings, "query_guards", started)
+    if decision is not None:
+        _lap(timings, "total", started)
+        return _build_agent_result(
+            question, plan, _skipped_retrieval_payload(question), decision,
+            AGENT_FALLBACK_ANSWERS[decision["action"]], timings=timings,
+        )
+
+    # Step 3: Retrieve
     retrieval_payload = dual_query_search(question, limit)
     results = retrieval_payload["results"]
-    normalized_query = retrieval_payload["normalized_query"]
-    
-    # Step 3: Judge - use existing guardrails
-    decision = choose_rag_action(question, results)
+    mark = _lap(timings, "retrieval", mark)
     
-    # Build confidence object
-    confidence = build_confidence_dict(results)
+    # Step 4: Judge the retrieved evidence
+    decision = check_results(compute_confidence(results))
+    mark = _lap(timings, "result_guards", mark)
     
-    # Step 4: Decide action based on judgment
-    if decision["action"] == "clarify":
-        return {
-            "question": question,
-            "normalized_query": normalized_query,
-            "plan": plan,
-            "action": "clarify",
-            "reason": decision["reason"],
-            "answer": "I'm not sure I understand. Please clarify your question with more specific details.",
-            "sources": results,
-            "confidence": confidence,
-        }
-    
-    if decision["action"] == "refuse":
-        return {
-            "question": question,
-            "normalized_query": normalized_query,
-            "plan": plan,
-            "action": "refuse",
-            "reason": decision["reason"],
-            "answer": "I cannot answer that question as I don't have enough reliable context.",
-            "sources": results,
-            "confidence": confidence,
-        }
+    # Step 5: Refuse without calling the LLM
+    if decision["action"] != "answer":
+        _lap(timings, "total", started)
+        return _build_agent_result(
+            question, plan, retrieval_payload, decision,
+            AGENT_FALLBACK_ANSWERS[decision["action"]], timings=timings,
+        )
     
     # Action is "answer" - generate the response
-    prompt = build_agent_prompt(question, results)
-    answer = generate_answer_from_prompt(prompt)
+    # [Source N] in the prompt cites sources[N - 1] of the response
+    passages = build_context_passages(results)
+    answer, cache_type = get_or_generate_answer(
+        "agent",
+        question,
+        retrieval_payload["normalized_query"],
+        limit,
+        results,
+        lambda: generate_answer_from_prompt(build_agent_prompt(question, passages)),
+    )
+    _lap(timings, "generation", mark)
+    _lap(timings, "total", started)
+    sources = [passage.to_source() for passage in passages]
+    return _build_agent_result(
+        question,
+        plan,
+        retrieval_payload,
+        decision,
+        answer,
+        cache_type,
+        timings,
+        sources,
+    )
+
+
+async def run_agent_loop_async(question: str, limit: int = 3) -> dict[str, Any]:
+    """Async run_agent_loop: same stages, without blocking the event loop."""
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    plan = build_agent_plan(question)
     
-    return {
+    decision = check_query(question)
+    mark = _lap(timings, "query_guards", started)
+    if decision is not None:
+        _lap(timings, "total", started)
+        return _build_agent_result(
+            question, plan, _skipped_retrieval_payload(question), decision,
+            AGENT_FALLBACK_ANSWERS[decision["action"]], timings=timings,
+        )
+
+    retrieval_payload = await dual_query_search_async(question, limit)
+    results = retrieval_payload["results"]
+    mark = _lap(timings, "retrieval", mark)
+
+    decision = check_results(compute_confidence(results))
+    mark = _lap(timings, "result_guards", mark)
+
+    if decision["action"] != "answer":
+        _lap(timings, "total", started)
+        return _build_agent_result(
+            question, plan, retrieval_payload, decision,
+            AGENT_FALLBACK_ANSWERS[decision["action"]], timings=timings,
+        )
+
+    # [Source N] in the prompt cites sources[N - 1] of the response
+    passages = build_context_passages(results)
+    answer, cache_type = await get_or_generate_answer_async(
+        "agent",
+        question,
+        retrieval_payload["normalized_query"],
+        limit,
+        results,
+        lambda: generate_answer_from_prompt_async(
+            build_agent_prompt(question, passages)
+        ),
+    )
+    _lap(timings, "generation", mark)
+    _lap(timings, "total", started)
+    sources = [passage.to_source() for passage in passages]
+    return _build_agent_result(
+        question,
+        plan,
+        retrieval_payload,
+        decision,
+        answer,
+        cache_type,
+        timings,
+        sources,
+    )
+
+
+async def stream_agent_loop(
+    question: str, limit: int = 3
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Streaming run_agent_loop_async.
+
+    Yields a "decision" event (plan, guardrail action and sources) as soon
+    as retrieval and judging finish (before any retrieval when a query
+    guard already decides), then "token" events with the answer or
+    the clarify/refuse message, then a final "done" event.
+    """
+    started = time.perf_counter()
+    plan = build_agent_plan(question)
+
+    decision = check_query(question)
+    if decision is None:
+        retrieval_payload = await dual_query_search_async(question, limit)
+        decision = check_results(compute_confidence(retrieval_payload["results"]))
+    else:
+        retrieval_payload = _skipped_retrieval_payload(question)
+    results = retrieval_payload["results"]
+    answering = decision["action"] == "answer"
+    # Answers cite the packed passages, so those are the sources to show
+    passages = build_context_passages(results) if answering else None
+    sources = [passage.to_source() for passage in passages] if answering else results
+    retrieval_ms = round((time.perf_counter() - started) * 1000, 1)
+    yield "decision", {
         "question": question,
-        "normalized_query": normalized_query,
+        "normalized_query": retrieval_payload["normalized_query"],
+        "retrieval_path": retrieval_payload["retrieval_path"],
         "plan": plan,
-        "action": "answer",
+        "action": decision["action"],
         "reason": decision["reason"],
-        "answer": answer,
-        "sources": results,
-        "confidence": confidence,
-    }
\ No newline at end of file
+        "sources": [item.to_dict() for item in sources],
+    }
+
+    async for event in stream_answer_events(
+        "agent",
+        question,
+        retrieval_payload,
+        limit,
+        build_agent_prompt(question, passages) if answering else None,
+        AGENT_FALLBACK_ANSWERS.get(decision["action"], ""),
+        started,
+        retrieval_ms,
+    ):
+        yield event
@@ -0,0 +1,373 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Sequence
+from git_day_practice.retrieved_chunk import RetrievedChunk
+from git_day_practice.semantic_cache import SemanticAnswerCache
+from git_day_practice.settings import settings
+
+
+def build_answer_cache_key(
+    namespace: str,
+    normalized_query: str,
+    limit: int,
+    chunk_ids: list[str],
+    collection_name: str,
+    collection_version: int,
+    content_hashes: Sequence[str] = (),
+) -> str:
+    """Hash everything an answer depends on into a fixed-size cache key.
+
+    chunk_ids stay stable when a chunk's text changes, so the chunks'
+    content_hashes are part of the key as well.
+    """
+    raw = json.dumps(
+        [
+            namespace, normalized_query, limit, chunk_ids, collection_name,
+            collection_version, list(content_hashes),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CollectionVersionFile:
+    """Collection versions in a small JSON file shared by every process.
+
+    The ingestion script bumps a version in its own process; API workers
+    see it on their next lookup because the file is re-read whenever its
+    mtime changes (one stat per lookup otherwise).
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._versions: dict[str, int] = {}
+        self._mtime_ns: int | None = None
+
+    def _refresh(self) -> None:
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._versions, self._mtime_ns = {}, None
+            return
+        if mtime_ns != self._mtime_ns:
+            self._versions = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+            self._mtime_ns = mtime_ns
+
+    def get(self, collection_name: str) -> int:
+        self._refresh()
+        return self._versions.get(collection_name, 0)
+
+    def bump(self, collection_name: str) -> int:
+        self._refresh()
+        versions = dict(self._versions)
+        versions[collection_name] = versions.get(collection_name, 0) + 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so readers never see a half-written file
+        tmp_path = self.path.with_suffix(f"{self.path.suffix}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(versions), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self._refresh()
+        return versions[collection_name]
+
+
+class InMemoryAnswerCache:
+    """Process-local answer cache holding at most max_entries answers.
+
+    The least recently used answer is evicted first, and set() also drops
+    expired answers from the least recently used end. Collection versions
+    come from version_file when given, so an ingest in another process
+    still invalidates this process's answers; without one they are only
+    seen in-process.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        version_file: CollectionVersionFile | None = None,
+        max_entries: int = 10_000,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.version_file = version_file
+        self.max_entries = max_entries
+        self._answers: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._answers.get(key)
+            if entry is None:
+                return None
+            expires_at, answer = entry
+            if time.monotonic() > expires_at:
+                del self._answers[key]
+                return None
+            self._answers.move_to_end(key)
+            return answer
+
+    def set(self, key: str, collection_name: str, answer: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            while self._answers and next(iter(self._answers.values()))[0] < now:
+                self._answers.popitem(last=False)
+            self._answers[key] = (now + self.ttl_seconds, answer)
+            self._answers.move_to_end(key)
+            while len(self._answers) > self.max_entries:
+                self._answers.popitem(last=False)
+
+    def get_collection_version(self, collection_name: str) -> int:
+        with self._lock:
+            if self.version_file is not None:
+                version = self.version_file.get(collection_name)
+                if version != self._versions.get(collection_name, 0):
+                    # Bumped elsewhere: old keys can never match again
+                    self._versions[collection_name] = version
+                    self._answers.clear()
+            return self._versions.get(collection_name, 0)
+
+    def bump_collection_version(self, collection_name: str) -> int:
+        with self._lock:
+            if self.version_file is not None:
+                version = self.version_file.bump(collection_name)
+            else:
+                version = self._versions.get(collection_name, 0) + 1
+            self._versions[collection_name] = version
+            # Old keys can never match again, so drop them right away
+            self._answers.clear()
+            return version
+
+
+class PostgresAnswerCache:
+    """Answer cache stored in the answer_cache / collection_versions tables."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+
+    def _session(self):
+        from git_day_practice.db import SessionLocal
+        return SessionLocal()
+
+    def get(self, key: str) -> str | None:
+        from git_day_practice.models import AnswerCacheEntry
+        with self._session() as db:
+            entry = db.get(AnswerCacheEntry, key)
+            if entry is None or entry.expires_at < datetime.utcnow():
+                return None
+            return entry.answer
+
+    def set(self, key: str, collection_name: str, answer: str) -> None:
+        from git_day_practice.models import AnswerCacheEntry
+        now = datetime.utcnow()
+        with self._session() as db:
+            db.merge(
+                AnswerCacheEntry(
+                    cache_key=key,
+                    collection_name=collection_name,
+                    answer=answer,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                )
+            )
+            db.commit()
+
+    def get_collection_version(self, collection_name: str) -> int:
+        from git_day_practice.models import CollectionVersion
+        with self._session() as db:
+            row = db.get(CollectionVersion, collection_name)
+            return row.version if row else 0
+
+    def bump_collection_version(self, collection_name: str) -> int:
+        from git_day_practice.models import AnswerCacheEntry, CollectionVersion
+        with self._session() as db:
+            row = db.get(CollectionVersion, collection_name, with_for_update=True)
+            if row is None:
+                row = CollectionVersion(collection_name=collection_name, version=0)
+                db.add(row)
+            row.version += 1
+            db.query(AnswerCacheEntry).filter(
+                AnswerCacheEntry.collection_name == collection_name
+            ).delete()
+            db.commit()
+            return row.version
+
+
+@lru_cache(maxsize=1)
+def get_answer_cache() -> InMemoryAnswerCache | PostgresAnswerCache:
+    if settings.answer_cache_backend == "postgres":
+        return PostgresAnswerCache(ttl_seconds=settings.answer_cache_ttl_seconds)
+    version_file = None
+    if settings.collection_version_path:
+        version_file = CollectionVersionFile(settings.collection_version_path)
+    return InMemoryAnswerCache(
+        ttl_seconds=settings.answer_cache_ttl_seconds,
+        version_file=version_file,
+        max_entries=settings.answer_cache_max_entries,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticAnswerCache:
+    return SemanticAnswerCache(
+        max_entries=settings.semantic_cache_max_entries,
+        similarity_threshold=settings.semantic_cache_similarity_threshold,
+        min_chunk_overlap=settings.semantic_cache_min_chunk_overlap,
+    )
+
+
+def bump_collection_version(collection_name: str) -> int:
+    """Invalidate every cached answer built from collection_name."""
+    version = get_answer_cache().bump_collection_version(collection_name)
+    get_semantic_cache().clear()
+    return version
+
+
+def _lookup_answer(
+    namespace: str,
+    question: str,
+    normalized_query: str,
+    limit: int,
+    results: list[RetrievedChunk],
+) -> tuple[str | None, str | None, dict]:
+    """Check the exact and semantic caches.
+
+    Returns (answer, cache type, state); state is what _store_answer needs
+    to record a freshly generated answer.
+    """
+    cache = get_answer_cache()
+    collection_name = settings.qdrant_collection_name
+    collection_version = cache.get_collection_version(collection_name)
+    chunk_ids = [item.chunk_id for item in results]
+    cache_key = build_answer_cache_key(
+        namespace,
+        normalized_query,
+        limit,
+        chunk_ids,
+        collection_name,
+        collection_version,
+        [item.content_hash for item in results],
+    )
+    state = {
+        "namespace": namespace,
+        "question": question,
+        "cache_key": cache_key,
+        "collection_name": collection_name,
+        "collection_version": collection_version,
+        "chunk_ids": chunk_ids,
+        "semantic_vector": None,
+    }
+    answer = cache.get(cache_key)
+    if answer is not None:
+        return answer, "exact", state
+
+    if settings.semantic_cache_enabled:
+        from git_day_practice.retrieval import encode_queries
+        state["semantic_vector"] = encode_queries([normalized_query])[0]
+        answer = get_semantic_cache().lookup(
+            namespace,
+            state["semantic_vector"],
+            chunk_ids,
+            collection_version,
+            question=question,
+        )
+        if answer is not None:
+            return answer, "semantic", state
+
+    return None, None, state
+
+
+def _store_answer(state: dict, answer: str) -> None:
+    get_answer_cache().set(state["cache_key"], state["collection_name"], answer)
+    if state["semantic_vector"] is not None:
+        get_semantic_cache().add(
+            state["namespace"], state["semantic_vector"], state["chunk_ids"],
+            state["collection_version"], answer, question=state["question"],
+        )
+
+
+def get_or_generate_answer(
+    namespace: str,
+    question: str,
+    normalized_query: str,
+    limit: int,
+    results: list[RetrievedChunk],
+    generate: Callable[[], str],
+) -> tuple[str, str | None]:
+    """Serve an answer from the exact or semantic cache, else generate and store it.
+
+    Returns the answer and which cache served it ("exact", "semantic" or None).
+    """
+    if not settings.answer_cache_enabled:
+        return generate(), None
+
+    answer, cache_type, state = _lookup_answer(
+        namespace, question, normalized_query, limit, results
+    )
+    if answer is not None:
+        return answer, cache_type
+
+    answer = generate()
+    _store_answer(state, answer)
+    return answer, None
+
+
+async def get_or_generate_answer_async(
+    namespace: str,
+    question: str,
+    normalized_query: str,
+    limit: int,
+    results: list[RetrievedChunk],
+    generate: Callable[[], Awaitable[str]],
+) -> tuple[str, str | None]:
+    """Async get_or_generate_answer; cache I/O and encoding run in a worker thread."""
+    if not settings.answer_cache_enabled:
+        return await generate(), None
+
+    answer, cache_type, state = await asyncio.to_thread(
+        _lookup_answer, namespace, question, normalized_query, limit, results
+    )
+    if answer is not None:
+        return answer, cache_type
+
+    answer = await generate()
+    await asyncio.to_thread(_store_answer, state, answer)
+    return answer, None
+
+
+async def stream_or_generate_answer_async(
+    namespace: str,
+    question: str,
+    normalized_query: str,
+    limit: int,
+    results: list[RetrievedChunk],
+    stream: Callable[[], AsyncIterator[str]],
+) -> AsyncIterator[tuple[str, str | None]]:
+    """Streaming get_or_generate_answer_async.
+
+    Yields (text, cache type) pairs: a cached answer arrives whole in one
+    pair with its cache type, a generated one as text deltas with None. The
+    generated answer is cached once the stream completes.
+    """
+    state = None
+    if settings.answer_cache_enabled:
+        answer, cache_type, state = await asyncio.to_thread(
+            _lookup_answer, namespace, question, normalized_query, limit, results
+        )
+        if answer is not None:
+            yield answer, cache_type
+            return
+
+    parts: list[str] = []
+    async for delta in stream():
+        parts.append(delta)
+        yield delta, None
+    if state is not None:
+        await asyncio.to_thread(_store_answer, state, "".join(parts))
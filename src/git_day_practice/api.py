@@ -1,15 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
 import psycopg2
-from qdrant_client import QdrantClient
 import sys
 import os
 
 sys.path.insert(0, '/app/src')
 
+from git_day_practice.agent import run_agent_loop_async, stream_agent_loop
+from git_day_practice.answer_cache import get_semantic_cache
+from git_day_practice.llm_client import LLMError
+from git_day_practice.normalization import get_normalizer
+from git_day_practice.rag import answer_with_rag_async, stream_rag_answer
+from git_day_practice.retrieval import get_bm25_index
+from git_day_practice.schema import AgentRequest, AgentResponse, RagRequest, RagResponse
 from git_day_practice.settings import settings
+from git_day_practice.vector_store import get_qdrant_client, get_search_adapter
 
-app = FastAPI(title="AI Backend API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the index / bind the Qdrant search API before the first request,
+    # not during it
+    get_search_adapter()
+    if settings.hybrid_search_enabled:
+        # Built from the documents file when no saved index exists
+        get_bm25_index()
+    if settings.spelling_correction_enabled:
+        # Building the SymSpell delete index takes a while on a large vocabulary
+        get_normalizer()
+    yield
+
+app = FastAPI(title="AI Backend API", lifespan=lifespan)
+
+@app.exception_handler(LLMError)
+async def llm_error_handler(request: Request, exc: LLMError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
 
 @app.get("/")
 def root():
@@ -30,13 +57,17 @@ def ready_health():
         raise HTTPException(status_code=503, detail=f"postgres not ready: {exc}")
     
     try:
-        client = QdrantClient(url=settings.qdrant_url)
-        client.get_collections()
+        get_qdrant_client().get_collections()
     except Exception as exc:
         raise HTTPException(status_code=503, detail=f"qdrant not ready: {exc}")
     
     return {"status": "ready"}
 
+@app.get("/cache/stats")
+def cache_stats():
+    """Semantic answer cache counters plus its recent hits and overlap rejections."""
+    return get_semantic_cache().stats()
+
 @app.post("/rag")
 async def rag_endpoint(request: Request):
     try:
@@ -69,3 +100,41 @@ async def agent_rag(request: Request):
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
+@app.post("/rag/async", response_model=RagResponse)
+async def rag_async_endpoint(payload: RagRequest) -> RagResponse:
+    result = await answer_with_rag_async(payload.question, payload.limit)
+    return RagResponse(**result)
+
+@app.post("/agent-rag/async", response_model=AgentResponse)
+async def agent_rag_async_endpoint(payload: AgentRequest) -> AgentResponse:
+    result = await run_agent_loop_async(payload.question, payload.limit)
+    return AgentResponse(**result)
+
+
+async def _sse(events):
+    """Format (event, data) pairs as server-sent events.
+
+    The response status is already sent, so an LLM failure mid-stream
+    becomes a final "error" event carrying the status it would have had.
+    """
+    try:
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    except LLMError as exc:
+        error = {"status_code": exc.status_code, "detail": str(exc)}
+        yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+def _event_stream(events) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/rag/stream")
+async def rag_stream_endpoint(payload: RagRequest) -> StreamingResponse:
+    return _event_stream(stream_rag_answer(payload.question, payload.limit))
+
+@app.post("/agent-rag/stream")
+async def agent_rag_stream_endpoint(payload: AgentRequest) -> StreamingResponse:
+    return _event_stream(stream_agent_loop(payload.question, payload.limit))
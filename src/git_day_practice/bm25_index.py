@@ -0,0 +1,226 @@
+from __future__ import annotations
+import json
+import math
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Iterable
+import numpy as np
+from git_day_practice.local_index import LocalHit, top_k_indices
+from git_day_practice.normalization import get_normalizer
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def tokenize(text: str, correct: bool = True) -> list[str]:
+    """Lowercased, Roman Urdu normalized word tokens; punctuation splits words.
+
+    correct=False skips spelling correction, as documents define the vocabulary.
+    """
+    # Chunk texts are seen once, so skip the query-sized LRU cache
+    normalizer = get_normalizer()
+    return normalizer.normalize_text(_PUNCTUATION.sub(" ", text), correct).split()
+
+
+class BM25Index:
+    """Okapi BM25 over chunk records, kept in compact per-term postings arrays.
+
+    Each term owns two growable int32 arrays (document slots and term
+    frequencies), so adding a batch of records only appends to them. Adding
+    a record whose chunk_id is already indexed retires the old slot; retired
+    slots stop matching at once and are dropped by compact() or save().
+    """
+
+    search_method = "bm25"
+    batch_method = "bm25"
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._term_ids: dict[str, int] = {}
+        self._postings_docs: list[array] = []
+        self._postings_tfs: list[array] = []
+        self._doc_lengths = array("i")
+        self._live = bytearray()
+        self._payloads: list[dict | None] = []
+        self._slot_by_chunk: dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_by_chunk)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._slot_by_chunk
+
+    def _retire(self, slot: int) -> None:
+        self._live[slot] = 0
+        self._total_length -= self._doc_lengths[slot]
+        self._payloads[slot] = None
+
+    def add(self, records: Iterable[dict[str, Any]]) -> None:
+        """Index chunk records (build_chunk_records output), replacing chunk_ids."""
+        with self._lock:
+            for record in records:
+                self._add_record(record)
+
+    def _add_record(self, record: dict[str, Any]) -> None:
+        previous = self._slot_by_chunk.get(record["chunk_id"])
+        if previous is not None:
+            self._retire(previous)
+        slot = len(self._payloads)
+        tokens = tokenize(record["text"], correct=False)
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._postings_docs)
+                self._postings_docs.append(array("i"))
+                self._postings_tfs.append(array("i"))
+            self._postings_docs[term_id].append(slot)
+            self._postings_tfs[term_id].append(tf)
+        self._doc_lengths.append(len(tokens))
+        self._live.append(1)
+        self._payloads.append(record)
+        self._slot_by_chunk[record["chunk_id"]] = slot
+        self._total_length += len(tokens)
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                slot = self._slot_by_chunk.pop(chunk_id, None)
+                if slot is not None:
+                    self._retire(slot)
+
+    def vocabulary(self) -> dict[str, int]:
+        """Term -> document frequency; retired slots count until compact()."""
+        with self._lock:
+            return {
+                term: len(self._postings_docs[term_id])
+                for term, term_id in self._term_ids.items()
+            }
+
+    def prune(self, doc_chunk_counts: dict[str, int]) -> None:
+        """Drop chunks of documents that disappeared or now have fewer chunks."""
+        with self._lock:
+            stale = []
+            for chunk_id, slot in self._slot_by_chunk.items():
+                payload = self._payloads[slot]
+                if payload["chunk_index"] > doc_chunk_counts.get(payload["doc_id"], 0):
+                    stale.append(chunk_id)
+            for chunk_id in stale:
+                self._retire(self._slot_by_chunk.pop(chunk_id))
+
+    def search(self, query: str, limit: int) -> list[LocalHit]:
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._slot_by_chunk)
+            if not n_docs or not terms:
+                return []
+            avg_length = self._total_length / n_docs
+            doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.int32)
+            live = np.frombuffer(self._live, dtype=np.uint8)
+            scores = np.zeros(len(doc_lengths), dtype=np.float32)
+            for term in terms:
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    continue
+                docs = np.frombuffer(self._postings_docs[term_id], dtype=np.int32)
+                tfs = np.frombuffer(self._postings_tfs[term_id], dtype=np.int32)
+                tfs = tfs.astype(np.float32)
+                # Retired slots still sit in the postings; df is approximate
+                # until compact()
+                df = len(docs)
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                length_ratio = doc_lengths[docs] / avg_length
+                norm = self.k1 * (1.0 - self.b + self.b * length_ratio)
+                scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+            scores *= live
+            best = [i for i in top_k_indices(scores, limit) if scores[i] > 0]
+            return [LocalHit(float(scores[i]), self._payloads[i]) for i in best]
+
+    def search_batch(self, queries: list[str], limit: int) -> list[list[LocalHit]]:
+        return [self.search(query, limit) for query in queries]
+
+    def compact(self) -> None:
+        """Rebuild the postings without retired slots."""
+        with self._lock:
+            records = [payload for payload in self._payloads if payload is not None]
+            self._reset()
+            for record in records:
+                self._add_record(record)
+
+    def save(self, path: str | Path) -> None:
+        """Write a compacted copy as one .npz file (CSR postings, JSON payloads)."""
+        self.compact()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            terms = sorted(self._term_ids, key=self._term_ids.get)
+            offsets = np.cumsum(
+                [0] + [len(docs) for docs in self._postings_docs], dtype=np.int64
+            )
+            empty = np.empty(0, dtype=np.int32)
+            docs = [np.frombuffer(post, dtype=np.int32) for post in self._postings_docs]
+            tfs = [np.frombuffer(post, dtype=np.int32) for post in self._postings_tfs]
+            with open(path, "wb") as handle:
+                np.savez(
+                    handle,
+                    params=np.array([self.k1, self.b], dtype=np.float64),
+                    terms=np.array(json.dumps(terms, ensure_ascii=False)),
+                    offsets=offsets,
+                    docs=np.concatenate(docs) if docs else empty,
+                    tfs=np.concatenate(tfs) if tfs else empty,
+                    doc_lengths=np.frombuffer(self._doc_lengths, dtype=np.int32),
+                    payloads=np.array(json.dumps(self._payloads, ensure_ascii=False)),
+                )
+
+    @classmethod
+    def load(cls, path: str | Path) -> BM25Index:
+        with np.load(path) as data:
+            k1, b = data["params"].tolist()
+            index = cls(k1, b)
+            terms = json.loads(str(data["terms"]))
+            offsets, docs, tfs = data["offsets"], data["docs"], data["tfs"]
+            index._term_ids = {term: i for i, term in enumerate(terms)}
+            spans = [(offsets[i], offsets[i + 1]) for i in range(len(terms))]
+            index._postings_docs = [
+                array("i", docs[start:end].tobytes()) for start, end in spans
+            ]
+            index._postings_tfs = [
+                array("i", tfs[start:end].tobytes()) for start, end in spans
+            ]
+            index._doc_lengths = array("i", data["doc_lengths"].tobytes())
+            index._payloads = json.loads(str(data["payloads"]))
+        index._live = bytearray(b"\x01" * len(index._payloads))
+        index._slot_by_chunk = {
+            payload["chunk_id"]: slot for slot, payload in enumerate(index._payloads)
+        }
+        index._total_length = int(sum(index._doc_lengths))
+        return index
+
+    @classmethod
+    def from_chunk_records(cls, records: Iterable[dict[str, Any]]) -> BM25Index:
+        index = cls()
+        index.add(records)
+        return index
+
+
+def load_bm25_index(index_path: str | Path, documents_path: str | Path) -> BM25Index:
+    """Load a saved index, or build one from a documents (or points) file."""
+    if Path(index_path).exists():
+        return BM25Index.load(index_path)
+    data = json.loads(Path(documents_path).read_text(encoding="utf-8"))
+    if isinstance(data, dict) and "points" in data:
+        return BM25Index.from_chunk_records(
+            point.get("payload") or {} for point in data["points"]
+        )
+
+    from git_day_practice.ingestion import iter_chunk_records
+    return BM25Index.from_chunk_records(iter_chunk_records(data))
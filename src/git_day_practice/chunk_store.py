@@ -0,0 +1,185 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+from git_day_practice.retrieved_chunk import RetrievedChunk
+from git_day_practice.settings import settings
+
+# Fields kept out of slim Qdrant payloads and hydrated from a chunk store
+CHUNK_FIELDS = ("doc_id", "title", "language", "source", "chunk_index", "text")
+# Fields a slim payload still carries: search needs chunk_id/doc_id (and
+# content_hash for answer cache keys), incremental ingestion needs
+# chunk_index and content_hash
+SLIM_PAYLOAD_FIELDS = ("chunk_id", "doc_id", "chunk_index", "content_hash")
+SEARCH_PAYLOAD_FIELDS = ["chunk_id", "doc_id", "content_hash"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    doc_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    language TEXT NOT NULL,
+    source TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL
+)
+"""
+DOC_INDEX = "CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks (doc_id, chunk_index)"
+
+
+def slim_payload(record: dict[str, Any]) -> dict[str, Any]:
+    return {field: record[field] for field in SLIM_PAYLOAD_FIELDS if field in record}
+
+
+class SQLiteChunkStore:
+    """Local chunk_id -> chunk fields store read through SQLite's mmap I/O."""
+
+    def __init__(self, path: str | Path, mmap_size: int = 256 * 1024 * 1024) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(SCHEMA)
+            connection.execute(DOC_INDEX)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.connection = connection
+        return connection
+
+    def put_many(self, records: Iterable[dict[str, Any]]) -> None:
+        rows = [
+            (record["chunk_id"], *(record.get(field, "") for field in CHUNK_FIELDS))
+            for record in records
+        ]
+        if not rows:
+            return
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO chunks "
+                "(chunk_id, doc_id, title, language, source, chunk_index, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def get_many(self, chunk_ids: list[str]) -> dict[str, dict[str, Any]]:
+        found: dict[str, dict[str, Any]] = {}
+        connection = self._connection()
+        for start in range(0, len(chunk_ids), 500):
+            chunk = chunk_ids[start:start + 500]
+            rows = connection.execute(
+                f"SELECT chunk_id, {', '.join(CHUNK_FIELDS)} FROM chunks "
+                f"WHERE chunk_id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for chunk_id, *values in rows:
+                found[chunk_id] = dict(zip(CHUNK_FIELDS, values, strict=True))
+        return found
+
+    def delete_documents(self, doc_chunk_counts: dict[str, int]) -> None:
+        """Drop chunks of documents that disappeared or now have fewer chunks.
+
+        Both deletes go through the (doc_id, chunk_index) index; only the ids
+        of disappeared documents are held in memory.
+        """
+        with self._connection() as connection:
+            connection.executemany(
+                "DELETE FROM chunks WHERE doc_id = ? AND chunk_index > ?",
+                doc_chunk_counts.items(),
+            )
+            stored_docs = connection.execute("SELECT DISTINCT doc_id FROM chunks")
+            gone = [
+                (doc_id,) for (doc_id,) in stored_docs if doc_id not in doc_chunk_counts
+            ]
+            connection.executemany("DELETE FROM chunks WHERE doc_id = ?", gone)
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class PostgresChunkStore:
+    """Chunk store kept in the chunk_texts table."""
+
+    def _session(self):
+        from git_day_practice.db import SessionLocal
+        return SessionLocal()
+
+    def put_many(self, records: Iterable[dict[str, Any]]) -> None:
+        from git_day_practice.models import ChunkText
+        with self._session() as db:
+            for record in records:
+                db.merge(ChunkText(
+                    chunk_id=record["chunk_id"],
+                    **{field: record.get(field, "") for field in CHUNK_FIELDS},
+                ))
+            db.commit()
+
+    def get_many(self, chunk_ids: list[str]) -> dict[str, dict[str, Any]]:
+        from git_day_practice.models import ChunkText
+        if not chunk_ids:
+            return {}
+        with self._session() as db:
+            rows = db.query(ChunkText).filter(ChunkText.chunk_id.in_(chunk_ids)).all()
+            return {
+                row.chunk_id: {field: getattr(row, field) for field in CHUNK_FIELDS}
+                for row in rows
+            }
+
+    def delete_documents(self, doc_chunk_counts: dict[str, int]) -> None:
+        from sqlalchemy import bindparam, delete
+        from git_day_practice.models import ChunkText
+        table = ChunkText.__table__
+        with self._session() as db:
+            if doc_chunk_counts:
+                # One executemany of per-document deletes, using the doc_id index
+                db.execute(
+                    delete(table).where(
+                        table.c.doc_id == bindparam("stale_doc_id"),
+                        table.c.chunk_index > bindparam("chunk_count"),
+                    ),
+                    [
+                        {"stale_doc_id": doc_id, "chunk_count": count}
+                        for doc_id, count in doc_chunk_counts.items()
+                    ],
+                )
+            stored_docs = db.query(ChunkText.doc_id).distinct().yield_per(1000)
+            gone = [
+                doc_id for (doc_id,) in stored_docs if doc_id not in doc_chunk_counts
+            ]
+            for start in range(0, len(gone), 500):
+                batch = gone[start:start + 500]
+                db.execute(delete(table).where(table.c.doc_id.in_(batch)))
+            db.commit()
+
+
+@lru_cache(maxsize=1)
+def get_chunk_store() -> SQLiteChunkStore | PostgresChunkStore:
+    if settings.chunk_store_backend == "postgres":
+        return PostgresChunkStore()
+    return SQLiteChunkStore(settings.chunk_store_path)
+
+
+def hydrate_results(results: list[RetrievedChunk], store=None) -> list[RetrievedChunk]:
+    """Fill chunk fields of slim search results in one store lookup.
+
+    Results whose chunk is missing from the store are returned unchanged.
+    """
+    missing = [item.chunk_id for item in results if not item.text]
+    if not missing:
+        return results
+    stored = (store or get_chunk_store()).get_many(missing)
+    return [
+        item.with_fields(stored[item.chunk_id]) if item.chunk_id in stored else item
+        for item in results
+    ]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Callable, Sequence
+from git_day_practice.ingestion import CLOSING_CHARS, SENTENCE_END_CHARS, token_counter
+from git_day_practice.retrieved_chunk import RetrievedChunk
+from git_day_practice.settings import settings
+
+
+@dataclass(frozen=True, slots=True)
+class ContextPassage:
+    """Text of one or more adjacent chunks of a document, as sent to the LLM.
+
+    best is the passage's highest-scoring chunk; to_source() turns the
+    passage into the response source that its [Source N] label cites.
+    """
+
+    score: float
+    doc_id: str
+    chunk_ids: tuple[str, ...]
+    title: str
+    text: str
+    best: RetrievedChunk
+
+    def to_source(self) -> RetrievedChunk:
+        return self.best.with_fields({"text": self.text})
+
+
+def estimate_tokens(word: str) -> int:
+    """Tokenizer-free estimate of about four characters per token."""
+    return max(1, -(-len(word) // 4))
+
+
+@lru_cache(maxsize=1)
+def get_context_token_counter() -> Callable[[str], int]:
+    if not settings.context_tokenizer_name:
+        return estimate_tokens
+    from transformers import AutoTokenizer
+    return token_counter(AutoTokenizer.from_pretrained(settings.context_tokenizer_name))
+
+
+def overlap_length(left: list[str], right: list[str], max_overlap: int = 100) -> int:
+    """Number of leading words of right that repeat the trailing words of left."""
+    for size in range(min(max_overlap, len(left), len(right)), 0, -1):
+        if left[-size:] == right[:size]:
+            return size
+    return 0
+
+
+def _ends_sentence(word: str) -> bool:
+    return word.rstrip(CLOSING_CHARS).endswith(tuple(SENTENCE_END_CHARS))
+
+
+def _merge_runs(
+    results: Sequence[RetrievedChunk],
+) -> list[tuple[ContextPassage, list[str]]]:
+    """Join chunks of a document with consecutive chunk_index into one passage.
+
+    The words a chunk shares with its predecessor (the chunking overlap) are
+    dropped, and a passage scores as its best chunk.
+    """
+    by_doc: dict[str, list[RetrievedChunk]] = {}
+    for item in results:
+        by_doc.setdefault(item.doc_id or item.chunk_id, []).append(item)
+
+    passages: list[tuple[ContextPassage, list[str]]] = []
+    for items in by_doc.values():
+        items.sort(key=lambda item: item.chunk_index)
+        run: list[RetrievedChunk] = []
+        words: list[str] = []
+        for item in items + [None]:
+            if item is not None and run and item.chunk_index == run[-1].chunk_index + 1:
+                item_words = item.text.split()
+                words.extend(item_words[overlap_length(words, item_words):])
+                run.append(item)
+                continue
+            if run:
+                best = max(run, key=lambda chunk: chunk.score)
+                passages.append((
+                    ContextPassage(
+                        score=best.score,
+                        doc_id=run[0].doc_id,
+                        chunk_ids=tuple(chunk.chunk_id for chunk in run),
+                        title=run[0].title,
+                        text=" ".join(words),
+                        best=best,
+                    ),
+                    words,
+                ))
+            if item is not None:
+                run, words = [item], item.text.split()
+    return passages
+
+
+def pack_context(
+    results: Sequence[RetrievedChunk],
+    max_tokens: int,
+    count_tokens: Callable[[str], int] | None = None,
+) -> list[ContextPassage]:
+    """Best-scoring passages of the results that fit in max_tokens.
+
+    Adjacent chunks are merged first (see _merge_runs). Passages are then
+    taken by score; one that does not fit whole is cut after the last
+    sentence that fits, or skipped when no sentence does. Only the very
+    first passage may be cut mid-sentence, so the context is never empty
+    while there are results.
+    """
+    count_tokens = count_tokens or get_context_token_counter()
+    packed: list[ContextPassage] = []
+    remaining = max_tokens
+    merged = sorted(_merge_runs(results), key=lambda entry: -entry[0].score)
+    for passage, words in merged:
+        used = 0
+        sentence_end = 0
+        cut = len(words)
+        for position, word in enumerate(words):
+            used += count_tokens(word)
+            if used > remaining:
+                cut = sentence_end if sentence_end or packed else position
+                break
+            if _ends_sentence(word):
+                sentence_end = position + 1
+        if cut == 0:
+            continue
+        if cut < len(words):
+            passage = replace(passage, text=" ".join(words[:cut]))
+        packed.append(passage)
+        remaining -= sum(count_tokens(word) for word in words[:cut])
+        if remaining <= 0:
+            break
+    return packed
+
+
+def build_context_passages(results: Sequence[RetrievedChunk]) -> list[ContextPassage]:
+    """Prompt passages for results: packed under the budget, or one per chunk.
+
+    Passage N is labelled [Source N] in the prompt, so responses list
+    [passage.to_source() for passage in passages] as their sources.
+    """
+    if settings.context_packing_enabled:
+        return pack_context(results, settings.context_max_tokens)
+    return [
+        ContextPassage(
+            item.score, item.doc_id, (item.chunk_id,), item.title, item.text, item
+        )
+        for item in results
+    ]
@@ -34,7 +34,7 @@ from sqlalchemy.orm import sessionmaker
 from .settings import settings
 
 # Create engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
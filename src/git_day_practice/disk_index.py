@@ -0,0 +1,184 @@
+from __future__ import annotations
+import json
+import mmap
+import struct
+from pathlib import Path
+import numpy as np
+from git_day_practice.local_index import LocalHit, normalize_rows, top_k_indices
+
+# File layout (all sections 64-byte aligned, little-endian):
+#   header | quantized vectors | int8 scales | float32 vectors | sign codes
+#   | payload offsets (count + 1 x uint64) | payload JSON bytes
+MAGIC = b"GDPVEC01"
+HEADER = struct.Struct("<8sIIQBBBx7Q")
+ALIGNMENT = 64
+QUANTIZATIONS = {"float16": 0, "int8": 1}
+
+# Number of set bits for every byte value, for Hamming distances
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization; returns codes and scales."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def write_vector_store(
+    path: str | Path,
+    vectors: np.ndarray,
+    payloads: list[dict],
+    quantization: str = "int8",
+    binary_codes: bool = True,
+    include_float32: bool = True,
+) -> None:
+    """Write normalized vectors and payloads in the memory-mappable store format."""
+    vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+    count, dim = vectors.shape
+    if len(payloads) != count:
+        raise ValueError("vectors and payloads must have the same length")
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization}")
+
+    if quantization == "int8":
+        quantized, scales = quantize_int8(vectors)
+    else:
+        quantized = vectors.astype(np.float16)
+        scales = np.empty(0, dtype=np.float32)
+    full = vectors if include_float32 else np.empty((0, dim), dtype=np.float32)
+    if binary_codes:
+        codes = np.packbits(vectors > 0, axis=1)
+    else:
+        codes = np.empty((0, 0), dtype=np.uint8)
+
+    encoded = [
+        json.dumps(payload, ensure_ascii=False).encode("utf-8") for payload in payloads
+    ]
+    offsets = np.zeros(count + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(item) for item in encoded])
+
+    sections = [quantized, scales, full, codes, offsets]
+    section_offsets = []
+    position = _align(HEADER.size)
+    for section in sections:
+        section_offsets.append(position)
+        position = _align(position + section.nbytes)
+    payload_offset = position
+
+    with open(path, "wb") as handle:
+        handle.write(
+            HEADER.pack(
+                MAGIC, 1, dim, count, QUANTIZATIONS[quantization],
+                int(binary_codes), int(include_float32),
+                *section_offsets, payload_offset, 0,
+            )
+        )
+        for offset, section in zip(section_offsets, sections, strict=True):
+            handle.seek(offset)
+            handle.write(np.ascontiguousarray(section).tobytes())
+        handle.seek(payload_offset)
+        handle.write(b"".join(encoded))
+
+
+class MappedVectorIndex:
+    """Read-only vector store opened with mmap and searched in three stages.
+
+    1. Optional Hamming prefilter over packed sign codes.
+    2. Scoring of the remaining candidates with the quantized vectors.
+    3. Rescoring of the best candidates with float32 vectors (when stored).
+
+    Every worker maps the same file, so pages are shared through the OS cache.
+    """
+
+    search_method = "mmap_quantized"
+    batch_method = "mmap_quantized"
+
+    def __init__(
+        self, path: str | Path, prefilter_factor: int = 20, rescore_factor: int = 4
+    ) -> None:
+        self.path = Path(path)
+        self.prefilter_factor = prefilter_factor
+        self.rescore_factor = rescore_factor
+        with open(self.path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, _version, dim, count, quantization, has_codes, has_full,
+         quantized_at, scales_at, full_at, codes_at, offsets_at, payload_at,
+         _reserved) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a vector store file")
+
+        self.dim, self.count = dim, count
+        is_int8 = quantization == QUANTIZATIONS["int8"]
+        self.quantization = "int8" if is_int8 else "float16"
+        dtype = np.int8 if is_int8 else np.float16
+        self.quantized = self._view(quantized_at, dtype, (count, dim))
+        self.scales = self._view(scales_at, np.float32, (count,)) if is_int8 else None
+        self.full = None
+        if has_full:
+            self.full = self._view(full_at, np.float32, (count, dim))
+        self.codes = None
+        if has_codes:
+            self.codes = self._view(codes_at, np.uint8, (count, (dim + 7) // 8))
+        self.payload_offsets = self._view(offsets_at, np.uint64, (count + 1,))
+        self._payload_at = payload_at
+
+    def _view(self, offset: int, dtype, shape: tuple) -> np.ndarray:
+        size = int(np.prod(shape))
+        view = np.frombuffer(self._mmap, dtype=dtype, count=size, offset=offset)
+        return view.reshape(shape)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def payload(self, index: int) -> dict:
+        start = self._payload_at + int(self.payload_offsets[index])
+        end = self._payload_at + int(self.payload_offsets[index + 1])
+        return json.loads(self._mmap[start:end])
+
+    def _quantized_scores(
+        self, query: np.ndarray, candidates: np.ndarray
+    ) -> np.ndarray:
+        vectors = self.quantized[candidates].astype(np.float32)
+        scores = vectors @ query
+        if self.scales is not None:
+            scores *= self.scales[candidates]
+        return scores
+
+    def search(self, query_vector: list[float], limit: int) -> list[LocalHit]:
+        query = np.asarray(query_vector, dtype=np.float32)
+        candidates = np.arange(self.count)
+
+        if self.codes is not None and self.count > limit * self.prefilter_factor:
+            query_code = np.packbits(query > 0)
+            bits = POPCOUNT[np.bitwise_xor(self.codes, query_code)]
+            distances = bits.sum(axis=1, dtype=np.int32).astype(np.float32)
+            candidates = top_k_indices(-distances, limit * self.prefilter_factor)
+
+        scores = self._quantized_scores(query, candidates)
+        if self.full is not None:
+            shortlist = candidates[top_k_indices(scores, limit * self.rescore_factor)]
+            scores = self.full[shortlist] @ query
+            candidates = shortlist
+
+        best = top_k_indices(scores, limit)
+        return [
+            LocalHit(float(scores[i]), self.payload(int(candidates[i]))) for i in best
+        ]
+
+    def search_batch(
+        self, query_vectors: list[list[float]], limit: int
+    ) -> list[list[LocalHit]]:
+        return [self.search(vector, limit) for vector in query_vectors]
+
+    def close(self) -> None:
+        # numpy views pin the mapping, so release them before closing it
+        self.quantized = self.scales = self.full = self.codes = None
+        self.payload_offsets = None
+        self._mmap.close()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_name TEXT NOT NULL,
+    text_hash BLOB NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    UNIQUE (model_name, text_hash)
+)
+"""
+
+
+def hash_text(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """Persistent float32 embedding cache keyed on (model name, sha256 of text).
+
+    Backed by SQLite in WAL mode, so any number of processes can read while
+    one writes. At most max_entries rows are kept; the oldest inserts are
+    evicted first.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 1_000_000) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, model_name: str, texts: list[str]) -> list[np.ndarray | None]:
+        hashes = [hash_text(text) for text in texts]
+        found: dict[bytes, np.ndarray] = {}
+        connection = self._connection()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            rows = connection.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model_name = ? "
+                f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                [model_name, *chunk],
+            )
+            for text_hash, vector in rows:
+                found[bytes(text_hash)] = np.frombuffer(vector, dtype=np.float32)
+        return [found.get(text_hash) for text_hash in hashes]
+
+    def put_many(self, model_name: str, texts: list[str], vectors: Any) -> None:
+        rows = []
+        for text, vector in zip(texts, vectors, strict=True):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((model_name, hash_text(text), len(vector), blob))
+        if not rows:
+            return
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model_name, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            # Live ids always fall in (MAX(id) - max_entries, MAX(id)], which
+            # bounds the size without a full COUNT(*) on every write
+            connection.execute(
+                "DELETE FROM embeddings "
+                "WHERE id <= (SELECT MAX(id) FROM embeddings) - ?",
+                (self.max_entries,),
+            )
+
+    def encode(
+        self, model, model_name: str, texts: list[str], **encode_kwargs
+    ) -> np.ndarray:
+        """Return embeddings for texts, encoding only the cache misses in one batch."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        pairs = list(zip(texts, self.get_many(model_name, texts), strict=True))
+        missing = sorted({text for text, vector in pairs if vector is None})
+        fresh: dict[str, np.ndarray] = {}
+        if missing:
+            encoded = model.encode(missing, **encode_kwargs)
+            vectors = np.asarray(encoded, dtype=np.float32)
+            self.put_many(model_name, missing, vectors)
+            fresh = dict(zip(missing, vectors, strict=True))
+        return np.stack([
+            fresh[text] if vector is None else vector for text, vector in pairs
+        ])
+
+    def __len__(self) -> int:
+        query = "SELECT COUNT(*) FROM embeddings"
+        return self._connection().execute(query).fetchone()[0]
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
@@ -0,0 +1,142 @@
+from __future__ import annotations
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator
+import numpy as np
+
+# Set once per worker process by _init_worker
+_worker_model = None
+
+
+def _init_worker(model_name: str, torch_threads: int) -> None:
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(torch_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _embedding_dim() -> int:
+    probe = _worker_model.encode(["dim"], normalize_embeddings=True)
+    return int(np.asarray(probe).shape[1])
+
+
+def _encode_into(texts: list[str], shm_name: str, batch_size: int) -> None:
+    """Encode texts and write the float32 matrix straight into shared memory."""
+    vectors = np.asarray(
+        _worker_model.encode(texts, batch_size=batch_size, normalize_embeddings=True),
+        dtype=np.float32,
+    )
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        np.ndarray(vectors.shape, dtype=np.float32, buffer=shm.buf)[:] = vectors
+    finally:
+        shm.close()
+
+
+class EmbeddingWorkerPool:
+    """Pool of processes that each load the embedding model once.
+
+    The parent allocates a shared-memory block per batch and workers write
+    their vectors into it, so results never go through pickle. encode_stream
+    yields results in submission order with at most max_in_flight batches
+    outstanding.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int,
+        torch_threads: int = 1,
+        max_in_flight: int | None = None,
+        encode_batch_size: int = 32,
+    ) -> None:
+        self.model_name = model_name
+        self.max_in_flight = max_in_flight or workers * 2
+        self.encode_batch_size = encode_batch_size
+        # spawn, not fork: forking a process that already imported torch can deadlock
+        self._pool = multiprocessing.get_context("spawn").Pool(
+            processes=workers,
+            initializer=_init_worker,
+            initargs=(model_name, torch_threads),
+        )
+        self.dim = self._pool.apply(_embedding_dim)
+
+    def _submit(self, texts: list[str]):
+        size = max(len(texts) * self.dim * 4, 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        result = self._pool.apply_async(
+            _encode_into, (texts, shm.name, self.encode_batch_size)
+        )
+        return result, shm
+
+    def _collect(self, result, shm, count: int) -> np.ndarray:
+        try:
+            result.get()
+            shape = (count, self.dim)
+            return np.ndarray(shape, dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def encode_stream(
+        self, text_batches: Iterable[list[str]], cache=None
+    ) -> Iterator[np.ndarray]:
+        """Yield one (len(texts), dim) float32 matrix per input batch, in order.
+
+        With an EmbeddingCache, cached texts are filled in locally and only
+        the misses are sent to the workers.
+        """
+        pending: deque = deque()
+
+        def finish(entry) -> np.ndarray:
+            pairs, missing, job = entry
+            fresh = {}
+            if job is not None:
+                vectors = self._collect(*job, count=len(missing))
+                if cache is not None:
+                    cache.put_many(self.model_name, missing, vectors)
+                fresh = dict(zip(missing, vectors, strict=True))
+            if not pairs:
+                return np.empty((0, self.dim), dtype=np.float32)
+            return np.stack([
+                fresh[text] if vector is None else vector for text, vector in pairs
+            ])
+
+        try:
+            for texts in text_batches:
+                if cache is not None:
+                    cached = cache.get_many(self.model_name, texts)
+                else:
+                    cached = [None] * len(texts)
+                pairs = list(zip(texts, cached, strict=True))
+                missing = sorted({text for text, vector in pairs if vector is None})
+                job = self._submit(missing) if missing else None
+                pending.append((pairs, missing, job))
+                while len(pending) >= self.max_in_flight:
+                    yield finish(pending.popleft())
+            while pending:
+                yield finish(pending.popleft())
+        finally:
+            # Free shared memory of batches abandoned by an early exit
+            for _, _, _, job in pending:
+                if job is not None:
+                    job[1].close()
+                    job[1].unlink()
+
+    def close(self) -> None:
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> EmbeddingWorkerPool:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
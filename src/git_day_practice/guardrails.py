@@ -1,5 +1,6 @@
 from __future__ import annotations
-from statistics import mean
+from typing import Sequence
+from git_day_practice.retrieved_chunk import RetrievedChunk, score_array
 from git_day_practice.settings import settings
 
 def is_query_too_vague(question: str) -> bool:
@@ -9,48 +10,53 @@ def is_query_too_vague(question: str) -> bool:
         return True
     return False
 
-def compute_confidence(results: list[dict]) -> dict:
+def compute_confidence(results: Sequence[RetrievedChunk | dict]) -> dict:
     if not results:
         return {"top_score": 0.0, "avg_score": 0.0, "result_count": 0}
-    scores = [item["score"] for item in results]
+    scores = score_array(results)
     return {
-        "top_score": max(scores),
-        "avg_score": mean(scores),
+        "top_score": float(scores.max()),
+        "avg_score": float(scores.sum() / len(scores)),
         "result_count": len(results),
     }
 
-def choose_rag_action(question: str, results: list[dict]) -> dict:
-    confidence = compute_confidence(results)
-    
+def check_query(question: str) -> dict | None:
+    """Guards that need only the question, run before any retrieval.
+
+    Returns a decision, or None when retrieval should go ahead.
+    """
     if settings.enable_clarify_behavior and is_query_too_vague(question):
         return {
             "action": "clarify",
             "reason": "Question is too vague or underspecified.",
-            "confidence": confidence,
         }
-    
+    return None
+
+def check_results(confidence: dict) -> dict:
+    """Guards on retrieval confidence (see compute_confidence)."""
     if settings.enable_refuse_behavior:
         if confidence["result_count"] < settings.min_results_for_answer:
             return {
                 "action": "refuse",
                 "reason": f"Not enough results (need {settings.min_results_for_answer})",
-                "confidence": confidence,
             }
         if confidence["top_score"] < settings.min_top_score_for_answer:
             return {
                 "action": "refuse",
                 "reason": f"Top score too weak ({confidence['top_score']:.2f} < {settings.min_top_score_for_answer})",
-                "confidence": confidence,
             }
         if confidence["avg_score"] < settings.min_avg_score_for_answer:
             return {
                 "action": "refuse",
                 "reason": f"Average score too weak ({confidence['avg_score']:.2f} < {settings.min_avg_score_for_answer})",
-                "confidence": confidence,
             }
     
     return {
         "action": "answer",
         "reason": "Retrieved context is sufficient.",
-        "confidence": confidence,
     }
+
+def choose_rag_action(question: str, results: Sequence[RetrievedChunk | dict]) -> dict:
+    confidence = compute_confidence(results)
+    decision = check_query(question) or check_results(confidence)
+    return {**decision, "confidence": confidence}
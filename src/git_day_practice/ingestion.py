@@ -1,46 +1,198 @@
 from __future__ import annotations
-from typing import Any
+import hashlib
+import json
+import uuid
+import re
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
 
 
-def chunk_text(text: str, chunk_size: int = 80, overlap: int = 20) -> list[str]:
-    words = text.split()
-    if not words:
-        return []
+# Word-final characters that end a sentence, including the Urdu/Hindi full stops
+SENTENCE_END_CHARS = ".!?।۔؟"
+CLOSING_CHARS = "\"')]»”’"
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+def token_counter(tokenizer, cache_size: int = 65536) -> Callable[[str], int]:
+    """Per-word token counter for a Hugging Face tokenizer, memoized by word."""
+    @lru_cache(maxsize=cache_size)
+    def count(word: str) -> int:
+        return len(tokenizer.tokenize(word))
+    return count
 
-    chunks: list[str] = []
-    step = chunk_size - overlap
 
-    if step <= 0:
+def iter_chunk_spans(
+    text: str,
+    chunk_size: int = 80,
+    overlap: int = 20,
+    *,
+    snap_to_sentences: bool = False,
+    max_tokens: int | None = None,
+    count_tokens: Callable[[str], int] | None = None,
+) -> Iterator[tuple[int, int]]:
+    """Yield (start_char, end_char) spans of overlapping word windows in one pass.
+
+    Only the current window of word offsets is kept, never the word list of
+    the whole text. A window closes at chunk_size words or, with max_tokens,
+    before the summed per-word token counts would exceed the budget. With
+    snap_to_sentences a window ends after the last sentence-final word in
+    its second half, when there is one. The next window repeats the last
+    `overlap` words (at most half of a window that was cut short).
+    """
+    if chunk_size - overlap <= 0:
         raise ValueError("chunk_size must be greater than overlap")
+    if max_tokens is not None and count_tokens is None:
+        raise ValueError("max_tokens requires count_tokens")
+
+    words: list[tuple[int, int]] = []
+    costs: list[int] = []
+    window_tokens = 0
+    fresh = 0  # trailing words not yet covered by an emitted span
+
+    for match in _WORD_PATTERN.finditer(text):
+        cost = count_tokens(match.group()) if max_tokens is not None else 0
+        while words and (
+            len(words) >= chunk_size
+            or (max_tokens is not None and window_tokens + cost > max_tokens)
+        ):
+            if fresh:
+                cut = len(words)
+                if snap_to_sentences:
+                    for i in range(len(words) - 1, len(words) // 2 - 1, -1):
+                        word = text[words[i][0]:words[i][1]].rstrip(CLOSING_CHARS)
+                        if word[-1:] in SENTENCE_END_CHARS:
+                            cut = i + 1
+                            break
+                yield words[0][0], words[cut - 1][1]
+                # A window cut short keeps at most half of itself as overlap
+                keep_from = max(cut - overlap, 1 if cut == chunk_size else cut // 2, 1)
+                fresh = len(words) - cut
+            else:
+                keep_from = 1
+            window_tokens -= sum(costs[:keep_from])
+            del words[:keep_from]
+            del costs[:keep_from]
+        words.append(match.span())
+        costs.append(cost)
+        window_tokens += cost
+        fresh += 1
+
+    if fresh:
+        yield words[0][0], words[-1][1]
+
+
+def span_text(text: str, start: int, end: int) -> str:
+    """Chunk text for a span, with whitespace collapsed to single spaces."""
+    return " ".join(text[start:end].split())
+
+
+def chunk_text(text: str, chunk_size: int = 80, overlap: int = 20) -> list[str]:
+    return [
+        span_text(text, start, end)
+        for start, end in iter_chunk_spans(text, chunk_size, overlap)
+    ]
 
-    for start in range(0, len(words), step):
-        end = start + chunk_size
-        chunk_words = words[start:end]
-        if not chunk_words:
-            continue
-        chunks.append(" ".join(chunk_words))
-        if end >= len(words):
-            break
 
-    return chunks
+# Fixed namespace so the same chunk_id always maps to the same Qdrant point id
+CHUNK_ID_NAMESPACE = uuid.UUID("5b0f3c52-8a1e-4c55-9d51-2f3f7d3a9e10")
 
 
-def build_chunk_records(documents: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    records: list[dict[str, Any]] = []
+def chunk_point_id(chunk_id: str) -> str:
+    return str(uuid.uuid5(CHUNK_ID_NAMESPACE, chunk_id))
 
+
+def compute_content_hash(record: dict[str, Any]) -> str:
+    """Hash of every payload field that affects the stored point."""
+    raw = json.dumps(
+        [
+            record["title"], record["language"], record["source"], record["text"],
+            record.get("start_char"), record.get("end_char"),
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def iter_json_array(path: str | Path, read_size: int = 65536) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array one at a time.
+
+    Only the current item and one read buffer are held in memory, so the
+    file can be much larger than RAM.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as handle:
+        buffer = ""
+        started = False
+        while True:
+            chunk = handle.read(read_size)
+            buffer += chunk
+            position = 0
+            while True:
+                # Skip whitespace and the separators between items
+                while position < len(buffer) and buffer[position] in " \t\r\n,":
+                    position += 1
+                if not started:
+                    if position >= len(buffer):
+                        break
+                    if buffer[position] != "[":
+                        raise ValueError(f"{path} does not contain a JSON array")
+                    started = True
+                    position += 1
+                    continue
+                if position < len(buffer) and buffer[position] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # Item is incomplete; read more of the file
+                    break
+                if end == len(buffer) and chunk:
+                    # A number or literal may continue in the next read
+                    break
+                yield item
+                position = end
+            buffer = buffer[position:]
+            if not chunk:
+                if buffer.strip():
+                    raise ValueError(f"{path} ends inside a JSON value")
+                return
+
+
+def iter_chunk_records(
+    documents: Iterable[dict[str, Any]], **chunk_options: Any
+) -> Iterator[dict[str, Any]]:
+    """Generator version of build_chunk_records.
+
+    chunk_options are passed to iter_chunk_spans. Each record keeps the
+    start_char/end_char offsets of its chunk in the document text.
+    """
     for doc in documents:
-        chunks = chunk_text(doc["text"])
-        for index, chunk in enumerate(chunks, start=1):
-            records.append(
-                {
-                    "chunk_id": f'{doc["doc_id"]}-chunk-{index:03d}',
-                    "doc_id": doc["doc_id"],
-                    "title": doc["title"],
-                    "language": doc["language"],
-                    "source": doc["source"],
-                    "chunk_index": index,
-                    "text": chunk,
-                }
-            )
-
-    return records
+        spans = iter_chunk_spans(doc["text"], **chunk_options)
+        for index, (start, end) in enumerate(spans, start=1):
+            record = {
+                "chunk_id": f'{doc["doc_id"]}-chunk-{index:03d}',
+                "doc_id": doc["doc_id"],
+                "title": doc["title"],
+                "language": doc["language"],
+                "source": doc["source"],
+                "chunk_index": index,
+                "text": span_text(doc["text"], start, end),
+                "start_char": start,
+                "end_char": end,
+            }
+            record["content_hash"] = compute_content_hash(record)
+            yield record
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def build_chunk_records(
+    documents: list[dict[str, Any]], **chunk_options: Any
+) -> list[dict[str, Any]]:
+    return list(iter_chunk_records(documents, **chunk_options))
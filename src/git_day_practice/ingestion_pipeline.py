@@ -0,0 +1,207 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator
+from git_day_practice.ingestion import batched, iter_chunk_records
+
+_DONE = object()
+
+
+class IngestionStats:
+    """Counters shared by the pipeline stages; reads are approximate while running."""
+
+    def __init__(self) -> None:
+        self.started_at = time.perf_counter()
+        self.documents = 0
+        self.chunks = 0
+        self.upserted = 0
+        self.unchanged = 0
+        self.doc_chunk_counts: dict[str, int] = {}
+        self.failed_batches: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, field: str, amount: int) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def record_chunk(self, doc_id: str, chunk_index: int) -> None:
+        with self._lock:
+            self.doc_chunk_counts[doc_id] = chunk_index
+
+    def report(self, final: bool = False) -> dict:
+        """Counters and rates.
+
+        doc_chunk_counts (one entry per document) is only included when final.
+        """
+        elapsed = max(time.perf_counter() - self.started_at, 1e-9)
+        report = {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "upserted": self.upserted,
+            "unchanged": self.unchanged,
+            "failed_batches": len(self.failed_batches),
+            "elapsed_seconds": elapsed,
+            "docs_per_second": self.documents / elapsed,
+            "chunks_per_second": self.chunks / elapsed,
+        }
+        if final:
+            with self._lock:
+                report["doc_chunk_counts"] = dict(self.doc_chunk_counts)
+        return report
+
+
+def _counted_documents(
+    documents: Iterable[dict], stats: IngestionStats
+) -> Iterator[dict]:
+    for document in documents:
+        stats.add("documents", 1)
+        yield document
+
+
+def _counted_records(records: Iterable[dict], stats: IngestionStats) -> Iterator[dict]:
+    for record in records:
+        stats.record_chunk(record["doc_id"], record["chunk_index"])
+        yield record
+
+
+def _put(target: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put with a timeout loop so a stopped pipeline never blocks forever."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def run_ingestion_pipeline(
+    documents: Iterable[dict[str, Any]],
+    encode: Callable[[list[str]], Any],
+    upsert: Callable[[list[dict], list[list[float]]], None],
+    *,
+    batch_size: int = 64,
+    upsert_workers: int = 4,
+    queue_size: int = 4,
+    max_retries: int = 3,
+    retry_delay_seconds: float = 0.5,
+    on_first_vectors: Callable[[int], None] | None = None,
+    select_changed: Callable[[list[dict]], list[dict]] | None = None,
+    progress: Callable[[dict], None] | None = None,
+    encode_stream: Callable[[Iterator[list[str]]], Iterator[Any]] | None = None,
+    chunk_options: dict[str, Any] | None = None,
+) -> dict:
+    """Stream documents through chunking, batched encoding and parallel upserts.
+
+    Stages are connected by bounded queues, so at most about
+    (2 * queue_size + upsert_workers + 2) batches are in memory whatever
+    the corpus size. A batch that still fails after max_retries is recorded
+    in the report and the rest of the run continues.
+
+    select_changed, when given, receives each chunk batch before encoding and
+    returns only the records that need to be (re-)embedded.
+
+    encode_stream, when given, replaces encode: it receives an iterator of
+    text batches and must yield one vector batch per input, in order. This
+    lets an encoder such as EmbeddingWorkerPool keep several batches in
+    flight at once. chunk_options are passed through to iter_chunk_spans.
+    """
+    stats = IngestionStats()
+    stop = threading.Event()
+    chunk_batches: queue.Queue = queue.Queue(maxsize=queue_size)
+    upsert_batches: queue.Queue = queue.Queue(maxsize=queue_size)
+    producer_errors: list[BaseException] = []
+
+    def produce() -> None:
+        try:
+            records = _counted_records(
+                iter_chunk_records(
+                    _counted_documents(documents, stats), **(chunk_options or {})
+                ),
+                stats,
+            )
+            for batch in batched(records, batch_size):
+                stats.add("chunks", len(batch))
+                if not _put(chunk_batches, batch, stop):
+                    return
+        except BaseException as exc:  # surfaced in the calling thread
+            producer_errors.append(exc)
+        finally:
+            _put(chunk_batches, _DONE, stop)
+
+    def consume() -> None:
+        while True:
+            item = upsert_batches.get()
+            if item is _DONE:
+                return
+            records, vectors = item
+            for attempt in range(max_retries + 1):
+                try:
+                    upsert(records, vectors)
+                    stats.add("upserted", len(records))
+                    break
+                except Exception as exc:
+                    if attempt == max_retries:
+                        stats.failed_batches.append({
+                            "first_chunk_id": records[0]["chunk_id"],
+                            "last_chunk_id": records[-1]["chunk_id"],
+                            "error": str(exc),
+                        })
+                    else:
+                        time.sleep(retry_delay_seconds * (2 ** attempt))
+
+    producer = threading.Thread(target=produce, name="ingest-chunker", daemon=True)
+    workers = [
+        threading.Thread(target=consume, name=f"ingest-upsert-{n}", daemon=True)
+        for n in range(upsert_workers)
+    ]
+    producer.start()
+    for worker in workers:
+        worker.start()
+
+    pending: deque = deque()
+
+    def text_batches() -> Iterator[list[str]]:
+        while (batch := chunk_batches.get()) is not _DONE:
+            if select_changed is not None:
+                changed = select_changed(batch)
+                stats.add("unchanged", len(batch) - len(changed))
+                batch = changed
+                if not batch:
+                    continue
+            pending.append(batch)
+            yield [record["text"] for record in batch]
+
+    try:
+        first = True
+        if encode_stream:
+            vector_batches = encode_stream(text_batches())
+        else:
+            vector_batches = map(encode, text_batches())
+        for vectors in vector_batches:
+            batch = pending.popleft()
+            if hasattr(vectors, "tolist"):
+                vectors = vectors.tolist()
+            else:
+                vectors = [list(vector) for vector in vectors]
+            if first and on_first_vectors is not None:
+                on_first_vectors(len(vectors[0]))
+            first = False
+            upsert_batches.put((batch, vectors))
+            if progress is not None:
+                progress(stats.report())
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for _ in workers:
+            upsert_batches.put(_DONE)
+        for worker in workers:
+            worker.join()
+        producer.join()
+
+    if producer_errors:
+        raise producer_errors[0]
+    return stats.report(final=True)
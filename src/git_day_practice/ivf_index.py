@@ -0,0 +1,245 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any
+import numpy as np
+from git_day_practice.local_index import LocalHit, normalize_rows, top_k_indices
+
+
+def train_centroids(
+    vectors: np.ndarray,
+    n_clusters: int,
+    batch_size: int = 1024,
+    iterations: int = 50,
+    seed: int = 0,
+) -> np.ndarray:
+    """Spherical mini-batch k-means over normalized vectors.
+
+    Each step assigns one random batch to its nearest centroids and moves them
+    with a per-centroid learning rate of 1 / (points seen so far).
+    """
+    vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+    n_clusters = min(n_clusters, len(vectors))
+    rng = np.random.default_rng(seed)
+    seeds = rng.choice(len(vectors), size=n_clusters, replace=False)
+    centroids = vectors[seeds].copy()
+    counts = np.zeros(n_clusters, dtype=np.int64)
+
+    for _ in range(iterations):
+        size = min(batch_size, len(vectors))
+        batch = vectors[rng.choice(len(vectors), size=size, replace=False)]
+        assignments = np.argmax(batch @ centroids.T, axis=1)
+        for cluster in np.unique(assignments):
+            members = batch[assignments == cluster]
+            counts[cluster] += len(members)
+            rate = len(members) / counts[cluster]
+            centroids[cluster] += rate * (members.mean(axis=0) - centroids[cluster])
+        centroids = normalize_rows(centroids)
+    return centroids
+
+
+class _PayloadBlob:
+    """Payloads kept as concatenated UTF-8 JSON, decoded one entry at a time."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def encode(cls, payloads: list[bytes]) -> _PayloadBlob:
+        lengths = [len(payload) for payload in payloads]
+        offsets = np.cumsum([0] + lengths, dtype=np.int64)
+        return cls(np.frombuffer(b"".join(payloads), dtype=np.uint8), offsets)
+
+    def raw(self, entry: int) -> bytes:
+        return self.data[self.offsets[entry]:self.offsets[entry + 1]].tobytes()
+
+    def __getitem__(self, entry: int) -> dict:
+        return json.loads(self.raw(entry))
+
+
+class IVFIndex:
+    """Inverted-file approximate index: only the `nprobe` closest lists are scanned.
+
+    Vectors can be added at any time after training; each one goes to the
+    inverted list of its nearest centroid. Each list is a buffer whose
+    capacity doubles when full, so adding n vectors copies O(n) rows in
+    total. Train offline (scripts/build_ivf_index.py) and load() the saved
+    index at serving time; a loaded index decodes a payload only when it is
+    returned as a hit.
+    """
+
+    search_method = "ivf"
+    batch_method = "ivf"
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = 8) -> None:
+        self.centroids = normalize_rows(np.asarray(centroids, dtype=np.float32))
+        self.nprobe = nprobe
+        n_clusters, dim = self.centroids.shape
+        self._list_vectors = [
+            np.empty((0, dim), dtype=np.float32) for _ in range(n_clusters)
+        ]
+        self._list_sizes = [0] * n_clusters
+        # Entries [0, n) of list c live in the loaded blob from _blob_starts[c] on;
+        # _list_payloads[c] holds the dicts added after them
+        self._blob: _PayloadBlob | None = None
+        self._blob_starts = [0] * n_clusters
+        self._blob_counts = [0] * n_clusters
+        self._list_payloads: list[list[dict]] = [[] for _ in range(n_clusters)]
+
+    def __len__(self) -> int:
+        return sum(self._list_sizes)
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.centroids)
+
+    def list_sizes(self) -> list[int]:
+        return list(self._list_sizes)
+
+    def add(self, vectors: np.ndarray, payloads: list[dict]) -> None:
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if len(vectors) != len(payloads):
+            raise ValueError("vectors and payloads must have the same length")
+        if len(vectors) == 0:
+            return
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        for cluster in np.unique(assignments):
+            positions = np.flatnonzero(assignments == cluster)
+            self._append(cluster, vectors[positions])
+            self._list_payloads[cluster].extend(payloads[i] for i in positions)
+
+    def _append(self, cluster: int, vectors: np.ndarray) -> None:
+        size = self._list_sizes[cluster]
+        buffer = self._list_vectors[cluster]
+        needed = size + len(vectors)
+        if needed > len(buffer):
+            capacity = max(needed, 2 * len(buffer), 16)
+            grown = np.empty((capacity, buffer.shape[1]), dtype=np.float32)
+            grown[:size] = buffer[:size]
+            self._list_vectors[cluster] = buffer = grown
+        buffer[size:needed] = vectors
+        self._list_sizes[cluster] = needed
+
+    def _list(self, cluster: int) -> np.ndarray:
+        return self._list_vectors[cluster][:self._list_sizes[cluster]]
+
+    def _payload(self, cluster: int, position: int) -> dict:
+        loaded = self._blob_counts[cluster]
+        if position < loaded:
+            return self._blob[self._blob_starts[cluster] + position]
+        return self._list_payloads[cluster][position - loaded]
+
+    def _raw_payload(self, cluster: int, position: int) -> bytes:
+        loaded = self._blob_counts[cluster]
+        if position < loaded:
+            return self._blob.raw(self._blob_starts[cluster] + position)
+        payload = self._list_payloads[cluster][position - loaded]
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def add_chunk_records(self, records: list[dict[str, Any]], model) -> None:
+        """Embed and add newly built chunk records (build_chunk_records output)."""
+        if not records:
+            return
+        texts = [record["text"] for record in records]
+        vectors = model.encode(texts, normalize_embeddings=True)
+        self.add(np.asarray(vectors, dtype=np.float32), list(records))
+
+    def search(
+        self, query_vector: list[float], limit: int, nprobe: int | None = None
+    ) -> list[LocalHit]:
+        return self.search_batch([query_vector], limit, nprobe)[0]
+
+    def search_batch(
+        self, query_vectors: list[list[float]], limit: int, nprobe: int | None = None
+    ) -> list[list[LocalHit]]:
+        """Score each probed list once for all the queries that probe it.
+
+        Lists are multiplied in place against the query block, so no probed
+        vectors are copied into a per-query matrix.
+        """
+        queries = np.asarray(query_vectors, dtype=np.float32).reshape(
+            len(query_vectors), self.centroids.shape[1]
+        )
+        centroid_scores = queries @ self.centroids.T
+        probes = [top_k_indices(row, nprobe or self.nprobe) for row in centroid_scores]
+        probing: dict[int, list[int]] = {}
+        for query_index, clusters in enumerate(probes):
+            for cluster in clusters:
+                probing.setdefault(int(cluster), []).append(query_index)
+
+        list_scores: dict[tuple[int, int], np.ndarray] = {}
+        for cluster, query_indices in probing.items():
+            block = self._list(cluster) @ queries[query_indices].T
+            for column, query_index in enumerate(query_indices):
+                list_scores[cluster, query_index] = block[:, column]
+
+        results = []
+        for query_index, clusters in enumerate(probes):
+            parts = [list_scores[int(cluster), query_index] for cluster in clusters]
+            starts = np.cumsum([0] + [len(part) for part in parts])
+            scores = np.concatenate(parts) if parts else np.empty(0, dtype=np.float32)
+            hits = []
+            for i in top_k_indices(scores, limit):
+                part = int(np.searchsorted(starts, i, side="right")) - 1
+                position = int(i - starts[part])
+                payload = self._payload(int(clusters[part]), position)
+                hits.append(LocalHit(float(scores[i]), payload))
+            results.append(hits)
+        return results
+
+    def save(self, path: str | Path) -> None:
+        """Write centroids and inverted lists as one .npz file.
+
+        Vectors are stored CSR-style by list; payloads as UTF-8 JSON bytes
+        with per-entry offsets, so load() can decode them lazily.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        offsets = np.cumsum([0] + self._list_sizes, dtype=np.int64)
+        blob = _PayloadBlob.encode([
+            self._raw_payload(cluster, position)
+            for cluster in range(self.n_clusters)
+            for position in range(self._list_sizes[cluster])
+        ])
+        lists = [self._list(cluster) for cluster in range(self.n_clusters)]
+        with open(path, "wb") as handle:
+            np.savez(
+                handle,
+                centroids=self.centroids,
+                nprobe=np.array(self.nprobe, dtype=np.int64),
+                offsets=offsets,
+                vectors=np.concatenate(lists),
+                payload_bytes=blob.data,
+                payload_offsets=blob.offsets,
+            )
+
+    @classmethod
+    def load(cls, path: str | Path, nprobe: int | None = None) -> IVFIndex:
+        with np.load(path) as data:
+            if nprobe is None:
+                nprobe = int(data["nprobe"])
+            index = cls(data["centroids"], nprobe=nprobe)
+            offsets, vectors = data["offsets"], data["vectors"]
+            spans = [
+                (int(offsets[i]), int(offsets[i + 1])) for i in range(index.n_clusters)
+            ]
+            index._list_vectors = [vectors[start:end].copy() for start, end in spans]
+            index._list_sizes = [end - start for start, end in spans]
+            index._blob = _PayloadBlob(data["payload_bytes"], data["payload_offsets"])
+        index._blob_starts = [start for start, _ in spans]
+        index._blob_counts = list(index._list_sizes)
+        return index
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        payloads: list[dict],
+        n_clusters: int,
+        nprobe: int = 8,
+        seed: int = 0,
+    ) -> IVFIndex:
+        index = cls(train_centroids(vectors, n_clusters, seed=seed), nprobe=nprobe)
+        index.add(vectors, payloads)
+        return index
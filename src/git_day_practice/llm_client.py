@@ -1,21 +1,270 @@
 from __future__ import annotations
-from groq import Groq
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable
+import groq
+import httpx
 from git_day_practice.settings import settings
 
-def generate_answer_from_prompt(prompt: str) -> str:
+
+class LLMError(Exception):
+    """Base class for LLM failures; status_code is what the API responds with."""
+
+    status_code = 502
+
+
+class LLMNotConfiguredError(LLMError):
+    status_code = 503
+
+
+class LLMTimeoutError(LLMError):
+    status_code = 504
+
+
+class LLMRateLimitError(LLMError):
+    status_code = 429
+
+
+class LLMUnavailableError(LLMError):
+    status_code = 503
+
+
+class LLMRequestError(LLMError):
+    """The provider rejected the request (bad request, auth, ...); don't retry."""
+
+    status_code = 502
+
+
+RETRYABLE_ERRORS = (LLMTimeoutError, LLMRateLimitError, LLMUnavailableError)
+
+
+def _translate_error(exc: Exception) -> LLMError:
+    if isinstance(exc, groq.APITimeoutError):
+        return LLMTimeoutError(f"LLM request timed out: {exc}")
+    if isinstance(exc, groq.APIConnectionError):
+        return LLMUnavailableError(f"LLM connection failed: {exc}")
+    if isinstance(exc, groq.RateLimitError):
+        return LLMRateLimitError(f"LLM rate limit exceeded: {exc}")
+    if isinstance(exc, groq.APIStatusError) and exc.status_code >= 500:
+        return LLMUnavailableError(f"LLM provider error {exc.status_code}: {exc}")
+    return LLMRequestError(f"LLM request failed: {exc}")
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    response = getattr(exc.__cause__, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
     try:
-        if not settings.groq_api_key or settings.groq_api_key == "REPLACE_ME":
-            return "GROQ_API_KEY not set in .env file"
-        
-        client = Groq(api_key=settings.groq_api_key)
-        response = client.chat.completions.create(
-            model=settings.groq_model_name,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _build_messages(prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+class LLMClient:
+    """Long-lived chat-completion client shared by every request.
+
+    The sync and async Groq clients each sit on one httpx connection pool,
+    so keep-alive connections (and their TLS sessions) are reused across
+    calls. Connect and read timeouts bound a hung upstream, retryable
+    failures (timeouts, connection errors, 429 and 5xx) are retried with
+    full-jitter exponential backoff. Failures raise LLMError subclasses.
+
+    Sync and async callers have separate caps of max_concurrency calls in
+    flight, one per connection pool (a threading semaphore, and an asyncio
+    semaphore per event loop that waiters acquire in FIFO order), so a
+    process using both paths may run up to twice that many. A stream keeps
+    its slot until it ends, as it keeps its connection.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        *,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.5,
+        retry_max_delay: float = 8.0,
+        max_concurrency: int = 16,
+        temperature: float = 0.2,
+    ) -> None:
+        self.model = model
+        self.temperature = temperature
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.max_concurrency = max_concurrency
+        self._api_key = api_key
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(
+            max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+        )
+        # Retries are ours, so the SDK must not add its own on top
+        self._client = groq.Groq(
+            api_key=api_key,
+            max_retries=0,
+            http_client=httpx.Client(timeout=self._timeout, limits=self._limits),
         )
-        return response.choices[0].message.content or ""
-    except Exception as e:
-        return f"Error: {str(e)}"
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        # The async client and semaphore belong to the event loop that made them
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+        self._async_client: groq.AsyncGroq | None = None
+        self._async_semaphore: asyncio.Semaphore | None = None
+        self._closing: set[asyncio.Task] = set()
+
+    def _backoff_delay(self, attempt: int, error: LLMError) -> float:
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * 2**attempt)
+        delay = random.uniform(0.0, ceiling)
+        retry_after = _retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_max_delay))
+        return delay
+
+    def _request(self) -> dict:
+        return {"model": self.model, "temperature": self.temperature}
+
+    def complete(self, prompt: str) -> str:
+        attempt = 0
+        while True:
+            try:
+                with self._semaphore:
+                    response = self._client.chat.completions.create(
+                        messages=_build_messages(prompt), **self._request()
+                    )
+                return response.choices[0].message.content or ""
+            except groq.GroqError as exc:
+                error = _translate_error(exc)
+                error.__cause__ = exc
+                retryable = isinstance(error, RETRYABLE_ERRORS)
+                if not retryable or attempt == self.max_retries:
+                    raise error from exc
+            time.sleep(self._backoff_delay(attempt, error))
+            attempt += 1
+
+    def _close_later(
+        self, closing: Awaitable[None], loop: asyncio.AbstractEventLoop
+    ) -> None:
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(closing, loop)
+            return
+        # Its loop has stopped: close from this one; connections whose transport
+        # died with the old loop fail to close cleanly and are dropped instead
+        async def close_quietly() -> None:
+            with contextlib.suppress(Exception):
+                await closing
+
+        task = asyncio.get_running_loop().create_task(close_quietly())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _async_state(self) -> tuple[groq.AsyncGroq, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            if self._async_client is not None:
+                self._close_later(self._async_client.close(), self._async_loop)
+            http_client = httpx.AsyncClient(timeout=self._timeout, limits=self._limits)
+            self._async_client = groq.AsyncGroq(
+                api_key=self._api_key, max_retries=0, http_client=http_client
+            )
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._async_loop = loop
+        return self._async_client, self._async_semaphore
+
+    async def complete_async(self, prompt: str) -> str:
+        client, semaphore = self._async_state()
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    response = await client.chat.completions.create(
+                        messages=_build_messages(prompt), **self._request()
+                    )
+                return response.choices[0].message.content or ""
+            except groq.GroqError as exc:
+                error = _translate_error(exc)
+                error.__cause__ = exc
+                retryable = isinstance(error, RETRYABLE_ERRORS)
+                if not retryable or attempt == self.max_retries:
+                    raise error from exc
+            await asyncio.sleep(self._backoff_delay(attempt, error))
+            attempt += 1
+
+    async def stream_async(self, prompt: str) -> AsyncIterator[str]:
+        """Yield answer text deltas as the provider streams them.
+
+        Only failures before the first delta are retried: once text has been
+        yielded the caller has already forwarded it.
+        """
+        client, semaphore = self._async_state()
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async with semaphore:
+                    stream = await client.chat.completions.create(
+                        messages=_build_messages(prompt), stream=True, **self._request()
+                    )
+                    async with stream:
+                        async for chunk in stream:
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if delta:
+                                started = True
+                                yield delta
+                return
+            except groq.GroqError as exc:
+                error = _translate_error(exc)
+                error.__cause__ = exc
+                retryable = not started and isinstance(error, RETRYABLE_ERRORS)
+                if not retryable or attempt == self.max_retries:
+                    raise error from exc
+            await asyncio.sleep(self._backoff_delay(attempt, error))
+            attempt += 1
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _is_api_key_missing() -> bool:
+    return not settings.groq_api_key or settings.groq_api_key == "REPLACE_ME"
+
+
+@lru_cache(maxsize=1)
+def get_llm_client() -> LLMClient:
+    if _is_api_key_missing():
+        raise LLMNotConfiguredError("GROQ_API_KEY not set in .env file")
+    return LLMClient(
+        settings.groq_api_key,
+        settings.groq_model,
+        connect_timeout=settings.llm_connect_timeout_seconds,
+        read_timeout=settings.llm_read_timeout_seconds,
+        max_retries=settings.llm_max_retries,
+        retry_base_delay=settings.llm_retry_base_delay_seconds,
+        retry_max_delay=settings.llm_retry_max_delay_seconds,
+        max_concurrency=settings.llm_max_concurrency,
+    )
+
+
+def generate_answer_from_prompt(prompt: str) -> str:
+    return get_llm_client().complete(prompt)
+
+
+async def generate_answer_from_prompt_async(prompt: str) -> str:
+    return await get_llm_client().complete_async(prompt)
+
+
+async def stream_answer_from_prompt_async(prompt: str) -> AsyncIterator[str]:
+    async for delta in get_llm_client().stream_async(prompt):
+        yield delta
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import json
+from pathlib import Path
+from typing import Any, NamedTuple
+import numpy as np
+
+
+class LocalHit(NamedTuple):
+    """Scored point with the same score/payload attributes as a Qdrant hit."""
+    score: float
+    payload: dict
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the `limit` highest scores, best first, without a full sort."""
+    if limit <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if limit < scores.size:
+        candidates = np.argpartition(-scores, limit - 1)[:limit]
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class LocalVectorIndex:
+    """Exact in-process cosine search over a contiguous float32 matrix.
+
+    Exposes the same search/search_batch interface as QdrantSearchAdapter,
+    so retrieval can use either backend.
+    """
+
+    search_method = "local_exact"
+    batch_method = "local_exact"
+
+    def __init__(self, vectors: np.ndarray, payloads: list[dict]) -> None:
+        if len(vectors) != len(payloads):
+            raise ValueError("vectors and payloads must have the same length")
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        self.vectors = np.ascontiguousarray(vectors)
+        self.payloads = payloads
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def search(self, query_vector: list[float], limit: int) -> list[LocalHit]:
+        scores = self.vectors @ np.asarray(query_vector, dtype=np.float32)
+        return self._hits(scores, limit)
+
+    def search_batch(
+        self, query_vectors: list[list[float]], limit: int
+    ) -> list[list[LocalHit]]:
+        score_matrix = np.asarray(query_vectors, dtype=np.float32) @ self.vectors.T
+        return [self._hits(scores, limit) for scores in score_matrix]
+
+    def _hits(self, scores: np.ndarray, limit: int) -> list[LocalHit]:
+        return [
+            LocalHit(float(scores[i]), self.payloads[i])
+            for i in top_k_indices(scores, limit)
+        ]
+
+    @classmethod
+    def from_chunk_records(
+        cls, records: list[dict[str, Any]], model
+    ) -> LocalVectorIndex:
+        """Embed build_chunk_records output with the given SentenceTransformer."""
+        texts = [record["text"] for record in records]
+        vectors = model.encode(texts, normalize_embeddings=True)
+        return cls(np.asarray(vectors, dtype=np.float32), list(records))
+
+    @classmethod
+    def from_points_file(cls, path: str | Path) -> LocalVectorIndex:
+        """Load a points file ({"points": [{"id", "vector", "payload"}]})."""
+        points = json.loads(Path(path).read_text(encoding="utf-8"))["points"]
+        vectors = np.array([point["vector"] for point in points], dtype=np.float32)
+        return cls(vectors, [point.get("payload") or {} for point in points])
+
+
+def recall_at_k(
+    index, exact_index: LocalVectorIndex, query_vectors: list[list[float]], k: int
+) -> float:
+    """Fraction of exact top-k chunk ids that `index` also returns, per query mean."""
+    if not query_vectors:
+        return 0.0
+    def hit_id(hit: LocalHit) -> str:
+        return hit.payload.get("chunk_id") or json.dumps(hit.payload, sort_keys=True)
+
+    total = 0.0
+    approx_batches = index.search_batch(query_vectors, k)
+    exact_batches = exact_index.search_batch(query_vectors, k)
+    for approx, exact in zip(approx_batches, exact_batches, strict=True):
+        exact_ids = {hit_id(hit) for hit in exact}
+        approx_ids = {hit_id(hit) for hit in approx}
+        total += len(exact_ids & approx_ids) / len(exact_ids) if exact_ids else 1.0
+    return total / len(query_vectors)
+
+
+def load_local_index(path: str | Path) -> LocalVectorIndex:
+    """Build the local index from a points file or a raw documents file."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict) and "points" in data:
+        return LocalVectorIndex.from_points_file(path)
+
+    from git_day_practice.ingestion import build_chunk_records
+    from git_day_practice.retrieval import get_embedding_model
+    records = build_chunk_records(data)
+    return LocalVectorIndex.from_chunk_records(records, get_embedding_model())
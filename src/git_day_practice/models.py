@@ -53,4 +53,39 @@ class AgentLog(Base):
     action: Mapped[str] = mapped_column(String(32), nullable=False)
     reason: Mapped[str] = mapped_column(Text, nullable=False)
     answer: Mapped[str] = mapped_column(Text, nullable=False, default="")
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
\ No newline at end of file
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+
+class AnswerCacheEntry(Base):
+    __tablename__ = "answer_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    collection_name: Mapped[str] = mapped_column(
+        String(128), nullable=False, index=True
+    )
+    answer: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class CollectionVersion(Base):
+    __tablename__ = "collection_versions"
+
+    collection_name: Mapped[str] = mapped_column(String(128), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class ChunkText(Base):
+    __tablename__ = "chunk_texts"
+
+    chunk_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    doc_id: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    title: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    language: Mapped[str] = mapped_column(String(32), nullable=False, default="")
+    source: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
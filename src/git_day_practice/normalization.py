@@ -1,36 +1,161 @@
 from __future__ import annotations
 import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable
+from git_day_practice.settings import settings
+
+DEFAULT_DICTIONARY_PATH = Path(__file__).parent / "data" / "roman_urdu_dictionary.tsv"
+
+_TOKEN_PATTERN = re.compile(r"\S+")
+# Trie key marking "a phrase ends here"; never a token since tokens contain no spaces
+_END = " "
 
-ROMAN_URDU_REPLACEMENTS = {
-    "kia": "kya",
-    "kya": "kya",
-    "kr": "kar",
-    "krta": "karta",
-    "krli": "karti",
-    "krna": "karna",
-    "he": "hai",
-    "hy": "hai",
-    "hn": "hain",
-    "mje": "mujhe",
-    "muje": "mujhe",
-    "mjhe": "mujhe",
-    "qdrnt": "qdrant",
-    "retrival": "retrieval",
-    "maloomat": "malumat",
-    "javab": "jawab",
-    "btado": "bata do",
-    "btao": "batao",
-}
 
 def basic_cleanup(text: str) -> str:
     text = text.strip().lower()
     text = re.sub(r"\s+", " ", text)
     return text
 
+
+def load_dictionary(path: str | Path) -> dict[str, str]:
+    """Read a variant<TAB>canonical file; '#' lines and blank lines are skipped."""
+    replacements: dict[str, str] = {}
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            variant, separator, canonical = line.partition("\t")
+            if not separator or not variant.strip() or not canonical.strip():
+                raise ValueError(
+                    f"{path}:{line_number}: expected 'variant<TAB>canonical'"
+                )
+            replacements[basic_cleanup(variant)] = basic_cleanup(canonical)
+    return replacements
+
+
+class RomanUrduNormalizer:
+    """Dictionary-driven normalizer with multi-word phrase support.
+
+    Single-word variants are a plain dict lookup. Multi-word variants live in
+    a word-level trie and the longest phrase starting at a token wins. Text
+    is lowercased and split by one precompiled pattern, and results are
+    memoized in an LRU cache of cache_size entries.
+
+    With a corrector (a SymSpellIndex), tokens that match no dictionary
+    entry are replaced by the nearest known term, when there is one.
+    """
+
+    def __init__(
+        self, replacements: dict[str, str], cache_size: int = 8192, corrector=None
+    ) -> None:
+        self.corrector = corrector
+        self._words: dict[str, str] = {}
+        self._phrases: dict = {}
+        for variant, canonical in replacements.items():
+            words = variant.split()
+            if len(words) == 1:
+                self._words[words[0]] = canonical
+                continue
+            node = self._phrases
+            for word in words:
+                node = node.setdefault(word, {})
+            node[_END] = canonical
+        self.size = len(replacements)
+        self.normalize = lru_cache(maxsize=cache_size)(self.normalize_text)
+        self.count_changed_tokens = lru_cache(maxsize=cache_size)(
+            self._count_changed_tokens
+        )
+
+    @classmethod
+    def from_file(
+        cls, path: str | Path, cache_size: int = 8192, corrector=None
+    ) -> RomanUrduNormalizer:
+        return cls(load_dictionary(path), cache_size=cache_size, corrector=corrector)
+
+    def _rewrite(self, text: str, correct: bool = True) -> tuple[list[str], int]:
+        """Return (output words, number of input tokens that were rewritten)."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        output: list[str] = []
+        changed = 0
+        position = 0
+        while position < len(tokens):
+            # Longest phrase match starting at this token
+            node = self._phrases.get(tokens[position])
+            match_end, canonical = 0, None
+            cursor = position + 1
+            while node is not None:
+                if _END in node:
+                    match_end, canonical = cursor, node[_END]
+                if cursor == len(tokens):
+                    break
+                node = node.get(tokens[cursor])
+                cursor += 1
+            if canonical is None:
+                token = tokens[position]
+                canonical, match_end = self._words.get(token), position + 1
+                if canonical is None and correct and self.corrector is not None:
+                    canonical = self.corrector.correct(token)
+                if canonical is None:
+                    canonical = token
+            span = tokens[position:match_end]
+            if canonical != " ".join(span):
+                changed += len(span)
+            output.append(canonical)
+            position = match_end
+        return output, changed
+
+    def normalize_text(self, text: str, correct: bool = True) -> str:
+        """Uncached normalize, for one-off texts such as documents being indexed.
+
+        Pass correct=False to apply only the dictionary, e.g. for corpus text
+        that defines the vocabulary in the first place.
+        """
+        return " ".join(self._rewrite(text, correct)[0])
+
+    def _count_changed_tokens(self, text: str) -> int:
+        return self._rewrite(text)[1]
+
+    def normalize_many(self, texts: Iterable[str]) -> list[str]:
+        """Normalize a batch; repeated texts are rewritten only once."""
+        texts = list(texts)
+        unique = {text: self.normalize(text) for text in dict.fromkeys(texts)}
+        return [unique[text] for text in texts]
+
+    def cache_info(self):
+        return self.normalize.cache_info()
+
+
+@lru_cache(maxsize=1)
+def get_normalizer() -> RomanUrduNormalizer:
+    replacements = load_dictionary(
+        settings.normalization_dictionary_path or DEFAULT_DICTIONARY_PATH
+    )
+    corrector = None
+    vocabulary_path = Path(settings.spelling_vocabulary_path)
+    if settings.spelling_correction_enabled and vocabulary_path.exists():
+        from git_day_practice.spelling import SymSpellIndex, load_vocabulary
+        corrector = SymSpellIndex.build(
+            load_vocabulary(settings.spelling_vocabulary_path),
+            replacements,
+            max_distance=settings.spelling_max_distance,
+        )
+    return RomanUrduNormalizer(
+        replacements,
+        cache_size=settings.normalization_cache_size,
+        corrector=corrector,
+    )
+
+
 def normalize_roman_urdu(text: str) -> str:
-    cleaned = basic_cleanup(text)
-    words = cleaned.split()
-    normalized_words = [ROMAN_URDU_REPLACEMENTS.get(word, word) for word in words]
-    normalized = " ".join(normalized_words)
-    normalized = re.sub(r"\s+", " ", normalized).strip()
-    return normalized
\ No newline at end of file
+    return get_normalizer().normalize(text)
+
+
+def normalize_roman_urdu_many(texts: Iterable[str]) -> list[str]:
+    return get_normalizer().normalize_many(texts)
+
+
+def count_normalized_tokens(text: str) -> int:
+    """Count how many words normalize_roman_urdu would rewrite."""
+    return get_normalizer().count_changed_tokens(text)
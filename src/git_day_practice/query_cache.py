@@ -0,0 +1,69 @@
+from __future__ import annotations
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_cache_text(text: str) -> str:
+    """Collapse whitespace so trivially different queries share a cache entry."""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query embeddings with a per-entry TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 3600.0) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # (model name, query) -> (expires at, vector)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, list[float]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_name: str, text: str) -> list[float] | None:
+        key = (model_name, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, vector = entry
+            if self.ttl_seconds > 0 and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, model_name: str, text: str, vector: list[float]) -> None:
+        if self.max_size <= 0:
+            return
+        key = (model_name, text)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
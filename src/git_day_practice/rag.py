@@ -1,21 +1,35 @@
 from __future__ import annotations
-from git_day_practice.llm_client import generate_answer_from_prompt
-from git_day_practice.retrieval import dual_query_search
+import time
+from typing import Any, AsyncIterator
+from git_day_practice.answer_cache import (
+    get_or_generate_answer,
+    get_or_generate_answer_async,
+    stream_or_generate_answer_async,
+)
+from git_day_practice.context_packing import ContextPassage, build_context_passages
+from git_day_practice.guardrails import compute_confidence
+from git_day_practice.llm_client import (
+    generate_answer_from_prompt,
+    generate_answer_from_prompt_async,
+    stream_answer_from_prompt_async,
+)
+from git_day_practice.retrieval import dual_query_search, dual_query_search_async
+from git_day_practice.retrieved_chunk import RetrievedChunk
 
-def build_context_block(results: list[dict]) -> str:
+def build_context_block(passages: list[ContextPassage]) -> str:
     parts: list[str] = []
-    for idx, item in enumerate(results, start=1):
+    for idx, item in enumerate(passages, start=1):
         parts.append(
             f"[Source {idx}]\n"
-            f"doc_id: {item['doc_id']}\n"
-            f"chunk_id: {item['chunk_id']}\n"
-            f"title: {item['title']}\n"
-            f"text: {item['text']}\n"
+            f"doc_id: {item.doc_id}\n"
+            f"chunk_id: {', '.join(item.chunk_ids)}\n"
+            f"title: {item.title}\n"
+            f"text: {item.text}\n"
         )
     return "\n".join(parts)
 
-def build_rag_prompt(question: str, results: list[dict]) -> str:
-    context = build_context_block(results)
+def build_rag_prompt(question: str, passages: list[ContextPassage]) -> str:
+    context = build_context_block(passages)
     return f"""Answer the question using only the context below.
 
 Question: {question}
@@ -30,28 +44,155 @@ Rules:
 
 Answer:""".strip()
 
+NO_RESULTS_ANSWER = "I couldn't find any relevant information to answer your question."
+
+def _build_rag_result(
+    question: str,
+    retrieval_payload: dict,
+    answer: str,
+    cache_type: str | None = None,
+    sources: list[RetrievedChunk] | None = None,
+) -> dict:
+    """sources defaults to the retrieved results.
+
+    Answered requests pass the cited passages instead.
+    """
+    return {
+        "question": question,
+        "normalized_query": retrieval_payload["normalized_query"],
+        "retrieval_path": retrieval_payload["retrieval_path"],
+        "answer_cache_hit": cache_type is not None,
+        "answer_cache_type": cache_type,
+        "answer": answer,
+        "sources": retrieval_payload["results"] if sources is None else sources,
+    }
+
 def answer_with_rag(question: str, limit: int = 3) -> dict:
     """Main RAG function - called by the API endpoint"""
     retrieval_payload = dual_query_search(question, limit)
     results = retrieval_payload["results"]
     
     if not results:
-        return {
-            "question": question,
-            "normalized_query": retrieval_payload["normalized_query"],
-            "answer": "I couldn't find any relevant information to answer your question.",
-            "sources": [],
-        }
+        return _build_rag_result(question, retrieval_payload, NO_RESULTS_ANSWER)
     
-    prompt = build_rag_prompt(question, results)
-    answer = generate_answer_from_prompt(prompt)
+    # [Source N] in the prompt cites sources[N - 1] of the response
+    passages = build_context_passages(results)
+    answer, cache_type = get_or_generate_answer(
+        "rag",
+        question,
+        retrieval_payload["normalized_query"],
+        limit,
+        results,
+        lambda: generate_answer_from_prompt(build_rag_prompt(question, passages)),
+    )
+    sources = [passage.to_source() for passage in passages]
+    return _build_rag_result(question, retrieval_payload, answer, cache_type, sources)
+
+async def answer_with_rag_async(question: str, limit: int = 3) -> dict:
+    """Async answer_with_rag for the async API endpoints"""
+    retrieval_payload = await dual_query_search_async(question, limit)
+    results = retrieval_payload["results"]
     
-    return {
+    if not results:
+        return _build_rag_result(question, retrieval_payload, NO_RESULTS_ANSWER)
+
+    # [Source N] in the prompt cites sources[N - 1] of the response
+    passages = build_context_passages(results)
+    answer, cache_type = await get_or_generate_answer_async(
+        "rag",
+        question,
+        retrieval_payload["normalized_query"],
+        limit,
+        results,
+        lambda: generate_answer_from_prompt_async(build_rag_prompt(question, passages)),
+    )
+    sources = [passage.to_source() for passage in passages]
+    return _build_rag_result(question, retrieval_payload, answer, cache_type, sources)
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+async def stream_answer_events(
+    namespace: str,
+    question: str,
+    retrieval_payload: dict,
+    limit: int,
+    prompt: str | None,
+    fallback_answer: str,
+    started: float,
+    retrieval_ms: float,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Stream ("token", ...) events for an answer, then one ("done", ...) event.
+
+    With prompt None there is nothing to generate and fallback_answer is
+    sent as the only token.
+    """
+    results = retrieval_payload["results"]
+    cache_type = None
+    first_token_ms = None
+    if prompt is None:
+        first_token_ms = _elapsed_ms(started)
+        yield "token", {"text": fallback_answer}
+    else:
+        async for text, chunk_cache_type in stream_or_generate_answer_async(
+            namespace,
+            question,
+            retrieval_payload["normalized_query"],
+            limit,
+            results,
+            lambda: stream_answer_from_prompt_async(prompt),
+        ):
+            # A cached answer arrives as one chunk tagged with its cache type
+            cache_type = chunk_cache_type
+            if first_token_ms is None:
+                first_token_ms = _elapsed_ms(started)
+            yield "token", {"text": text}
+    yield "done", {
+        "answer_cache_hit": cache_type is not None,
+        "answer_cache_type": cache_type,
+        "confidence": compute_confidence(results),
+        "timings_ms": {
+            "retrieval": retrieval_ms,
+            "first_token": first_token_ms,
+            "total": _elapsed_ms(started),
+        },
+    }
+
+
+async def stream_rag_answer(
+    question: str, limit: int = 3
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Streaming answer_with_rag: sources first, then answer tokens, then a summary.
+
+    Yields (event name, data) pairs: one "sources" event (the cited
+    passages, in [Source N] order) as soon as retrieval finishes, "token"
+    events with answer text, and a final "done" event with cache,
+    confidence and timing details.
+    """
+    started = time.perf_counter()
+    retrieval_payload = await dual_query_search_async(question, limit)
+    results = retrieval_payload["results"]
+    passages = build_context_passages(results)
+    retrieval_ms = _elapsed_ms(started)
+    yield "sources", {
         "question": question,
         "normalized_query": retrieval_payload["normalized_query"],
-        "answer": answer,
-        "sources": results,
+        "retrieval_path": retrieval_payload["retrieval_path"],
+        "sources": [passage.to_source().to_dict() for passage in passages],
     }
 
+    prompt = build_rag_prompt(question, passages) if results else None
+    async for event in stream_answer_events(
+        "rag",
+        question,
+        retrieval_payload,
+        limit,
+        prompt,
+        NO_RESULTS_ANSWER,
+        started,
+        retrieval_ms,
+    ):
+        yield event
+
 # Alias for compatibility with Day 18 expectations
-rag_endpoint = answer_with_rag
\ No newline at end of file
+rag_endpoint = answer_with_rag
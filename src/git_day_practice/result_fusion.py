@@ -0,0 +1,84 @@
+from __future__ import annotations
+import heapq
+from typing import Sequence
+from git_day_practice.retrieved_chunk import RetrievedChunk, score_array
+
+FUSION_STRATEGIES = ("max", "rrf", "weighted")
+
+
+def _normalized_scores(result_set: list[RetrievedChunk]) -> list[float]:
+    """Min-max scale one set's scores to [0, 1]; a flat set scores 1.0."""
+    if not result_set:
+        return []
+    scores = score_array(result_set)
+    low, high = scores.min(), scores.max()
+    if high == low:
+        return [1.0] * len(scores)
+    return ((scores - low) / (high - low)).tolist()
+
+
+def fuse_results(
+    result_sets: Sequence[list[RetrievedChunk]],
+    final_limit: int,
+    fusion: str = "max",
+    *,
+    weights: Sequence[float] | None = None,
+    rrf_k: int = 60,
+    collapse_by_doc: bool = False,
+) -> list[RetrievedChunk]:
+    """Merge any number of ranked result sets into one top-k list.
+
+    fusion picks how a chunk found in several sets is scored:
+      - "max": its best raw score
+      - "rrf": sum of weight / (rrf_k + rank) over the sets
+      - "weighted": sum of weight * min-max normalized score over the sets
+    Each chunk is represented by its highest-scoring item, and the items keep
+    their own "score". With collapse_by_doc only the best chunk of each
+    doc_id is kept. One pass builds the per-chunk totals and a heap selects
+    the top final_limit, so the cost is O(n log k) in the total number of
+    results n.
+    """
+    if fusion not in FUSION_STRATEGIES:
+        raise ValueError(
+            f"unknown fusion strategy {fusion!r}; expected one of {FUSION_STRATEGIES}"
+        )
+    if weights is None:
+        weights = [1.0] * len(result_sets)
+    elif len(weights) != len(result_sets):
+        raise ValueError("weights must have one entry per result set")
+
+    fused: dict[str, float] = {}
+    best_items: dict[str, RetrievedChunk] = {}
+    for result_set, weight in zip(result_sets, weights, strict=True):
+        if fusion == "weighted":
+            scores = _normalized_scores(result_set)
+            contributions = [weight * score for score in scores]
+        elif fusion == "rrf":
+            ranks = range(1, len(result_set) + 1)
+            contributions = [weight / (rrf_k + rank) for rank in ranks]
+        else:
+            contributions = [item.score for item in result_set]
+
+        for item, contribution in zip(result_set, contributions, strict=True):
+            chunk_id = item.chunk_id
+            current = best_items.get(chunk_id)
+            if current is None or item.score > current.score:
+                best_items[chunk_id] = item
+            if fusion == "max":
+                fused[chunk_id] = max(fused.get(chunk_id, contribution), contribution)
+            else:
+                fused[chunk_id] = fused.get(chunk_id, 0.0) + contribution
+
+    if collapse_by_doc:
+        best_chunk_by_doc: dict[str, str] = {}
+        for chunk_id, total in fused.items():
+            doc_id = best_items[chunk_id].doc_id or chunk_id
+            kept = best_chunk_by_doc.get(doc_id)
+            if kept is None or total > fused[kept]:
+                best_chunk_by_doc[doc_id] = chunk_id
+        candidates = best_chunk_by_doc.values()
+    else:
+        candidates = fused.keys()
+
+    top = heapq.nlargest(final_limit, candidates, key=fused.__getitem__)
+    return [best_items[chunk_id] for chunk_id in top]
@@ -1,60 +1,78 @@
 from __future__ import annotations
 
+import asyncio
 from functools import lru_cache
 from sentence_transformers import SentenceTransformer
-from git_day_practice.normalization import normalize_roman_urdu
+from git_day_practice.answer_cache import get_answer_cache
+from git_day_practice.bm25_index import BM25Index, load_bm25_index
+from git_day_practice.chunk_store import SEARCH_PAYLOAD_FIELDS, hydrate_results
+from git_day_practice.embedding_cache import EmbeddingCache
+from git_day_practice.guardrails import compute_confidence
+from git_day_practice.normalization import count_normalized_tokens, normalize_roman_urdu
+from git_day_practice.query_cache import QueryEmbeddingCache, normalize_cache_text
+from git_day_practice.result_fusion import fuse_results
+from git_day_practice.retrieved_chunk import RetrievedChunk
 from git_day_practice.settings import settings
-from git_day_practice.vector_store import get_qdrant_client
+from git_day_practice.vector_store import get_async_qdrant_client, get_search_adapter
 
 @lru_cache(maxsize=1)
 def get_embedding_model() -> SentenceTransformer:
     return SentenceTransformer(settings.embedding_model_name)
 
-def search_chunks(query: str, limit: int) -> list[dict]:
+@lru_cache(maxsize=1)
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(
+        max_size=settings.query_embedding_cache_size,
+        ttl_seconds=settings.query_embedding_cache_ttl_seconds,
+    )
+
+@lru_cache(maxsize=1)
+def get_persistent_embedding_cache() -> EmbeddingCache:
+    return EmbeddingCache(
+        settings.embedding_cache_path, max_entries=settings.embedding_cache_max_entries
+    )
+
+@lru_cache(maxsize=1)
+def _load_bm25_index(collection_version: int) -> BM25Index:
+    return load_bm25_index(settings.bm25_index_path, settings.local_index_path)
+
+def get_bm25_index() -> BM25Index:
+    """Shared BM25 index, reloaded once an ingest bumps the collection version."""
+    version = get_answer_cache().get_collection_version(settings.qdrant_collection_name)
+    return _load_bm25_index(version)
+
+def _encode_uncached(texts: list[str]) -> list[list[float]]:
     model = get_embedding_model()
-    client = get_qdrant_client()
-    
-    query_vector = model.encode(query, normalize_embeddings=True).tolist()
-    
-    # Try different search methods for different qdrant-client versions
-    results = None
-    
-    # Method 1: Try search_points (for older versions)
-    if hasattr(client, 'search_points'):
-        from qdrant_client.models import SearchRequest
-        results = client.search_points(
-            collection_name=settings.qdrant_collection_name,
-            vector=query_vector,
-            limit=limit,
-        )
-    # Method 2: Try search (for newer versions)
-    elif hasattr(client, 'search'):
-        try:
-            results = client.search(
-                collection_name=settings.qdrant_collection_name,
-                query_vector=query_vector,
-                limit=limit,
-            )
-        except:
-            # Try with vector parameter instead of query_vector
-            results = client.search(
-                collection_name=settings.qdrant_collection_name,
-                vector=query_vector,
-                limit=limit,
-            )
-    # Method 3: Try query_points (for latest versions)
-    elif hasattr(client, 'query_points'):
-        results = client.query_points(
-            collection_name=settings.qdrant_collection_name,
-            query=query_vector,
-            limit=limit,
-        )
-        results = results.points if results else []
-    else:
-        # If no search method found, return empty list
-        print(f"Warning: No search method found in QdrantClient")
-        return []
-    
+    if settings.query_embedding_persistent_cache:
+        return get_persistent_embedding_cache().encode(
+            model, settings.embedding_model_name, texts, normalize_embeddings=True
+        ).tolist()
+    return model.encode(texts, normalize_embeddings=True).tolist()
+
+def encode_queries(queries: list[str]) -> list[list[float]]:
+    """Encode queries, serving repeats from the query-embedding cache.
+
+    Cache misses are encoded together in one batched model.encode call.
+    """
+    texts = [normalize_cache_text(query) for query in queries]
+    if not settings.query_embedding_cache_enabled:
+        return _encode_uncached(texts)
+
+    cache = get_query_embedding_cache()
+    model_name = settings.embedding_model_name
+    vectors: list[list[float] | None] = [cache.get(model_name, text) for text in texts]
+
+    pairs = list(zip(texts, vectors, strict=True))
+    missing = sorted({text for text, vector in pairs if vector is None})
+    if missing:
+        encoded = _encode_uncached(missing)
+        fresh = dict(zip(missing, encoded, strict=True))
+        for text, vector in fresh.items():
+            cache.put(model_name, text, vector)
+        vectors = [fresh[text] if vector is None else vector for text, vector in pairs]
+    return vectors
+
+def _format_points(results) -> list[RetrievedChunk]:
     # Handle different result formats
     if results is None:
         return []
@@ -63,51 +81,265 @@ def search_chunks(query: str, limit: int) -> list[dict]:
     if hasattr(results, 'points'):
         results = results.points
     
-    formatted_results: list[dict] = []
-    for point in results:
-        payload = point.payload or {}
-        formatted_results.append({
-            "score": float(point.score),
-            "doc_id": payload.get("doc_id", ""),
-            "chunk_id": payload.get("chunk_id", ""),
-            "title": payload.get("title", ""),
-            "language": payload.get("language", ""),
-            "source": payload.get("source", ""),
-            "chunk_index": payload.get("chunk_index", 0),
-            "text": payload.get("text", ""),
-        })
-    return formatted_results
-
-def merge_results(result_sets: list[list[dict]], final_limit: int) -> list[dict]:
-    best_by_chunk_id: dict[str, dict] = {}
-    
-    for result_set in result_sets:
-        for item in result_set:
-            chunk_id = item["chunk_id"]
-            if chunk_id not in best_by_chunk_id:
-                best_by_chunk_id[chunk_id] = item
-            else:
-                if item["score"] > best_by_chunk_id[chunk_id]["score"]:
-                    best_by_chunk_id[chunk_id] = item
-    
-    merged = list(best_by_chunk_id.values())
-    merged.sort(key=lambda x: x["score"], reverse=True)
-    return merged[:final_limit]
+    return [
+        RetrievedChunk.from_payload(point.score, point.payload) for point in results
+    ]
+
+def reciprocal_rank_fusion(
+    result_sets: list[list[RetrievedChunk]], limit: int, k: int = 60
+) -> list[RetrievedChunk]:
+    return fuse_results(result_sets, limit, "rrf", rrf_k=k)
+
+def _hybrid_limit(limit: int) -> int:
+    if settings.hybrid_search_enabled:
+        return limit * settings.hybrid_candidate_factor
+    return limit
+
+def _fuse_with_lexical(
+    query: str, vector_results: list[RetrievedChunk], limit: int
+) -> list[RetrievedChunk]:
+    """RRF-fuse vector results with BM25 hits for the same query.
+
+    "score" stays a cosine similarity so the guardrail thresholds keep their
+    meaning. A chunk that only BM25 found was ranked below every vector
+    candidate, so it gets the lowest candidate score: its cosine is no
+    higher than that.
+    """
+    if not settings.hybrid_search_enabled:
+        return vector_results
+    lexical_hits = get_bm25_index().search(query, _hybrid_limit(limit))
+    lexical_results = _format_points(lexical_hits)
+    floor = min((item.score for item in vector_results), default=0.0)
+    lexical_results = [item.with_score(floor) for item in lexical_results]
+    return reciprocal_rank_fusion(
+        [vector_results, lexical_results], limit, k=settings.hybrid_rrf_k
+    )
+
+def _fuse_batch_with_lexical(
+    queries: list[str], batch_results: list, limit: int
+) -> list[list[RetrievedChunk]]:
+    return [
+        _fuse_with_lexical(query, _format_points(results), limit)
+        for query, results in zip(queries, batch_results, strict=True)
+    ]
+
+def search_chunks(query: str, limit: int) -> list[RetrievedChunk]:
+    query_vector = encode_queries([query])[0]
+    points = get_search_adapter().search(query_vector, _hybrid_limit(limit))
+    return _fuse_with_lexical(query, _format_points(points), limit)
+
+def search_chunks_batch(queries: list[str], limit: int) -> list[list[RetrievedChunk]]:
+    """Search several queries with one encode call and one Qdrant round trip."""
+    if not queries:
+        return []
+
+    query_vectors = encode_queries(queries)
+    batch_results = get_search_adapter().search_batch(
+        query_vectors, _hybrid_limit(limit)
+    )
+    return _fuse_batch_with_lexical(queries, batch_results, limit)
+
+def merge_results(
+    result_sets: list[list[RetrievedChunk]],
+    final_limit: int,
+    fusion: str | None = None,
+    collapse_by_doc: bool | None = None,
+) -> list[RetrievedChunk]:
+    """Merge result sets with the configured fusion strategy (see fuse_results)."""
+    if collapse_by_doc is None:
+        collapse_by_doc = settings.merge_collapse_by_doc
+    return fuse_results(
+        result_sets,
+        final_limit,
+        fusion or settings.merge_fusion_strategy,
+        rrf_k=settings.hybrid_rrf_k,
+        collapse_by_doc=collapse_by_doc,
+    )
+
+def is_confident_result_set(results: list[RetrievedChunk]) -> bool:
+    """Check a single result set against the guardrail answer thresholds."""
+    confidence = compute_confidence(results)
+    return (
+        confidence["top_score"] >= settings.min_top_score_for_answer
+        and confidence["avg_score"] >= settings.min_avg_score_for_answer
+    )
+
+def _adaptive_search(
+    original_query: str, normalized_query: str, limit: int
+) -> tuple[list[RetrievedChunk], list[RetrievedChunk], str]:
+    # Normalization rewrote enough words that both variants are worth searching
+    if count_normalized_tokens(original_query) >= settings.adaptive_min_changed_tokens:
+        original_results, normalized_results = search_chunks_batch(
+            [original_query, normalized_query], limit
+        )
+        return original_results, normalized_results, "adaptive_batched"
+
+    original_results = search_chunks(original_query, limit)
+    if is_confident_result_set(original_results):
+        return original_results, [], "adaptive_original_only"
+
+    normalized_results = search_chunks(normalized_query, limit)
+    return original_results, normalized_results, "adaptive_second_pass"
 
 def dual_query_search(query: str, limit: int) -> dict:
     original_query = query.strip()
     normalized_query = normalize_roman_urdu(query)
+    strategy = settings.dual_query_strategy
     
-    original_results = search_chunks(original_query, limit)
-    normalized_results = search_chunks(normalized_query, limit)
+    if count_normalized_tokens(original_query) == 0:
+        # Normalization only lowercased or re-spaced the query (no word was
+        # rewritten), so a second search would find the same chunks
+        original_results = search_chunks(original_query, limit)
+        normalized_results = []
+        retrieval_path = "single"
+    elif strategy == "adaptive":
+        original_results, normalized_results, retrieval_path = _adaptive_search(
+            original_query, normalized_query, limit
+        )
+    elif strategy == "sequential":
+        original_results = search_chunks(original_query, limit)
+        normalized_results = search_chunks(normalized_query, limit)
+        retrieval_path = "sequential"
+    else:
+        original_results, normalized_results = search_chunks_batch(
+            [original_query, normalized_query], limit
+        )
+        retrieval_path = "batched"
     
+    return _build_dual_query_payload(
+        original_query,
+        normalized_query,
+        original_results,
+        normalized_results,
+        retrieval_path,
+    )
+
+def _build_dual_query_payload(
+    original_query: str,
+    normalized_query: str,
+    original_results: list[RetrievedChunk],
+    normalized_results: list[RetrievedChunk],
+    retrieval_path: str,
+) -> dict:
+    # Re-sorting by cosine would undo the lexical fusion of hybrid results
     merged_results = merge_results(
-        [original_results, normalized_results], 
-        final_limit=getattr(settings, 'merged_search_limit', 5)
+        [original_results, normalized_results],
+        final_limit=getattr(settings, 'merged_search_limit', 5),
+        fusion="rrf" if settings.hybrid_search_enabled else None,
     )
+    if settings.slim_payloads:
+        # Only the final top-k ever needs chunk text
+        merged_results = hydrate_results(merged_results)
     
     return {
         "original_query": original_query,
         "normalized_query": normalized_query,
+        "retrieval_path": retrieval_path,
         "results": merged_results,
-    }
\ No newline at end of file
+    }
+
+# Async variants: same behaviour as above, but Qdrant calls go through
+# AsyncQdrantClient and CPU-bound encoding runs in a worker thread.
+
+def _search_payload_fields() -> bool | list[str]:
+    return SEARCH_PAYLOAD_FIELDS if settings.slim_payloads else True
+
+async def encode_queries_async(queries: list[str]) -> list[list[float]]:
+    return await asyncio.to_thread(encode_queries, queries)
+
+async def search_chunks_async(query: str, limit: int) -> list[RetrievedChunk]:
+    if settings.vector_backend != "qdrant":
+        # In-process backends have no network wait to overlap with
+        return await asyncio.to_thread(search_chunks, query, limit)
+
+    client = get_async_qdrant_client()
+
+    query_vector = (await encode_queries_async([query]))[0]
+    response = await client.query_points(
+        collection_name=settings.qdrant_collection_name,
+        query=query_vector,
+        limit=_hybrid_limit(limit),
+        with_payload=_search_payload_fields(),
+    )
+    # BM25 scoring (and a reload after an ingest) is CPU work: keep it off the loop
+    return await asyncio.to_thread(
+        _fuse_with_lexical, query, _format_points(response), limit
+    )
+
+async def search_chunks_batch_async(
+    queries: list[str], limit: int
+) -> list[list[RetrievedChunk]]:
+    if not queries:
+        return []
+    if settings.vector_backend != "qdrant":
+        return await asyncio.to_thread(search_chunks_batch, queries, limit)
+
+    from qdrant_client import models
+    client = get_async_qdrant_client()
+
+    query_vectors = await encode_queries_async(queries)
+    responses = await client.query_batch_points(
+        collection_name=settings.qdrant_collection_name,
+        requests=[
+            models.QueryRequest(
+                query=vector,
+                limit=_hybrid_limit(limit),
+                with_payload=_search_payload_fields(),
+            )
+            for vector in query_vectors
+        ],
+    )
+    return await asyncio.to_thread(_fuse_batch_with_lexical, queries, responses, limit)
+
+async def _adaptive_search_async(
+    original_query: str, normalized_query: str, limit: int
+) -> tuple[list[RetrievedChunk], list[RetrievedChunk], str]:
+    if count_normalized_tokens(original_query) >= settings.adaptive_min_changed_tokens:
+        original_results, normalized_results = await search_chunks_batch_async(
+            [original_query, normalized_query], limit
+        )
+        return original_results, normalized_results, "adaptive_batched"
+
+    original_results = await search_chunks_async(original_query, limit)
+    if is_confident_result_set(original_results):
+        return original_results, [], "adaptive_original_only"
+
+    normalized_results = await search_chunks_async(normalized_query, limit)
+    return original_results, normalized_results, "adaptive_second_pass"
+
+async def dual_query_search_async(query: str, limit: int) -> dict:
+    original_query = query.strip()
+    normalized_query = normalize_roman_urdu(query)
+    strategy = settings.dual_query_strategy
+
+    if count_normalized_tokens(original_query) == 0:
+        original_results = await search_chunks_async(original_query, limit)
+        normalized_results = []
+        retrieval_path = "single"
+    elif strategy == "adaptive":
+        (
+            original_results,
+            normalized_results,
+            retrieval_path,
+        ) = await _adaptive_search_async(original_query, normalized_query, limit)
+    elif strategy == "sequential":
+        original_results = await search_chunks_async(original_query, limit)
+        normalized_results = await search_chunks_async(normalized_query, limit)
+        retrieval_path = "sequential"
+    else:
+        original_results, normalized_results = await search_chunks_batch_async(
+            [original_query, normalized_query], limit
+        )
+        retrieval_path = "batched"
+
+    arguments = (
+        original_query,
+        normalized_query,
+        original_results,
+        normalized_results,
+        retrieval_path,
+    )
+    if settings.slim_payloads:
+        # Hydration reads the chunk store, which may block on SQLite or Postgres
+        return await asyncio.to_thread(_build_dual_query_payload, *arguments)
+    return _build_dual_query_payload(*arguments)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Sequence
+import numpy as np
+
+
+@dataclass(frozen=True, slots=True)
+class RetrievedChunk:
+    """One search hit, carried unchanged from retrieval to the API response.
+
+    Slots keep each hit to a fixed-size object instead of a per-hit dict;
+    frozen means stages derive new hits with with_score()/with_fields()
+    rather than copying dicts.
+    """
+
+    score: float
+    chunk_id: str
+    doc_id: str = ""
+    title: str = ""
+    language: str = ""
+    source: str = ""
+    chunk_index: int = 0
+    text: str = ""
+    content_hash: str = ""
+
+    @classmethod
+    def from_payload(
+        cls, score: float, payload: dict[str, Any] | None
+    ) -> RetrievedChunk:
+        payload = payload or {}
+        return cls(
+            score=float(score),
+            chunk_id=payload.get("chunk_id", ""),
+            doc_id=payload.get("doc_id", ""),
+            title=payload.get("title", ""),
+            language=payload.get("language", ""),
+            source=payload.get("source", ""),
+            chunk_index=payload.get("chunk_index", 0),
+            text=payload.get("text", ""),
+            content_hash=payload.get("content_hash", ""),
+        )
+
+    def with_score(self, score: float) -> RetrievedChunk:
+        return replace(self, score=score)
+
+    def with_fields(self, fields: dict[str, Any]) -> RetrievedChunk:
+        return replace(self, **fields)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def score_array(results: Sequence[RetrievedChunk | dict]) -> np.ndarray:
+    """Scores of a result list as one float64 array.
+
+    Plain dicts (as used by older callers) are accepted too; a dict without
+    a score counts as 0.0.
+    """
+    return np.fromiter(
+        (
+            item.get("score", 0.0) if isinstance(item, dict) else item.score
+            for item in results
+        ),
+        dtype=np.float64,
+        count=len(results),
+    )
@@ -1,11 +1,14 @@
 from __future__ import annotations
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class RagRequest(BaseModel):
     question: str = Field(min_length=1, description="The user question.")
     limit: int = Field(default=3, ge=1, le=10)
 
 class RagSourceItem(BaseModel):
+    # Validated straight from RetrievedChunk attributes
+    model_config = ConfigDict(from_attributes=True)
+
     score: float
     doc_id: str
     chunk_id: str
@@ -18,6 +21,9 @@ class RagSourceItem(BaseModel):
 class RagResponse(BaseModel):
     question: str
     normalized_query: str
+    retrieval_path: str | None = None
+    answer_cache_hit: bool = False
+    answer_cache_type: str | None = None
     answer: str
     sources: list[RagSourceItem]
 
@@ -28,6 +34,8 @@ class AgentRequest(BaseModel):
 
 
 class RagSourceItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     doc_id: str
     chunk_id: str
     title: str
@@ -44,9 +52,13 @@ class RagConfidence(BaseModel):
 class AgentResponse(BaseModel):
     question: str
     normalized_query: str
+    retrieval_path: str | None = None
     plan: list[str]
     action: str
     reason: str
+    answer_cache_hit: bool = False
+    answer_cache_type: str | None = None
     answer: str
     confidence: RagConfidence
-    sources: list[RagSourceItem]
\ No newline at end of file
+    sources: list[RagSourceItem]
+    stage_timings_ms: dict[str, float] = Field(default_factory=dict)
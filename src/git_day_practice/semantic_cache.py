@@ -0,0 +1,133 @@
+from __future__ import annotations
+import threading
+from collections import deque
+import numpy as np
+
+
+def chunk_overlap(left: list[str], right: list[str]) -> float:
+    """Jaccard overlap between two retrieved chunk_id lists."""
+    left_set, right_set = set(left), set(right)
+    if not left_set and not right_set:
+        return 1.0
+    return len(left_set & right_set) / len(left_set | right_set)
+
+
+class SemanticAnswerCache:
+    """Ring buffer of question embeddings and answers searched by cosine similarity.
+
+    Vectors are expected to be L2-normalized, so cosine similarity is a dot
+    product against the whole matrix.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        similarity_threshold: float = 0.92,
+        min_chunk_overlap: float = 0.5,
+        diagnostics_size: int = 50,
+    ) -> None:
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.min_chunk_overlap = min_chunk_overlap
+        self._vectors: np.ndarray | None = None
+        self._entries: list[dict | None] = [None] * max_entries
+        self._next_slot = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rejected_by_overlap = 0
+        self.recent_hits: deque[dict] = deque(maxlen=diagnostics_size)
+        self.recent_rejections: deque[dict] = deque(maxlen=diagnostics_size)
+
+    def lookup(
+        self,
+        namespace: str,
+        vector: list[float],
+        chunk_ids: list[str],
+        collection_version: int,
+        question: str = "",
+    ) -> str | None:
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None
+            query = np.asarray(vector, dtype=np.float32)
+            similarities = self._vectors[: self._size] @ query
+            # Walk candidates from most to least similar until one qualifies
+            for slot in np.argsort(-similarities):
+                similarity = float(similarities[slot])
+                if similarity < self.similarity_threshold:
+                    break
+                entry = self._entries[slot]
+                if (
+                    entry["namespace"] != namespace
+                    or entry["collection_version"] != collection_version
+                ):
+                    continue
+                overlap = chunk_overlap(entry["chunk_ids"], chunk_ids)
+                diagnostic = {
+                    "question": question,
+                    "cached_question": entry["question"],
+                    "similarity": similarity,
+                    "chunk_overlap": overlap,
+                }
+                if overlap < self.min_chunk_overlap:
+                    # Similar wording but different evidence: likely a false hit
+                    self.rejected_by_overlap += 1
+                    self.recent_rejections.append(diagnostic)
+                    continue
+                self.hits += 1
+                self.recent_hits.append(diagnostic)
+                return entry["answer"]
+            self.misses += 1
+            return None
+
+    def add(
+        self,
+        namespace: str,
+        vector: list[float],
+        chunk_ids: list[str],
+        collection_version: int,
+        answer: str,
+        question: str = "",
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            query = np.asarray(vector, dtype=np.float32)
+            if self._vectors is None:
+                self._vectors = np.zeros(
+                    (self.max_entries, query.shape[0]), dtype=np.float32
+                )
+            slot = self._next_slot
+            self._vectors[slot] = query
+            self._entries[slot] = {
+                "namespace": namespace,
+                "chunk_ids": list(chunk_ids),
+                "collection_version": collection_version,
+                "answer": answer,
+                "question": question,
+            }
+            self._next_slot = (slot + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = [None] * self.max_entries
+            self._next_slot = 0
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "rejected_by_overlap": self.rejected_by_overlap,
+                "recent_hits": list(self.recent_hits),
+                "recent_rejections": list(self.recent_rejections),
+            }
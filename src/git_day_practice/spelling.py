@@ -0,0 +1,169 @@
+from __future__ import annotations
+from functools import lru_cache
+from pathlib import Path
+
+
+def bounded_edit_distance(left: str, right: str, max_distance: int) -> int:
+    """Optimal-string-alignment distance, or max_distance + 1 once it is exceeded."""
+    if left == right:
+        return 0
+    if abs(len(left) - len(right)) > max_distance:
+        return max_distance + 1
+    # Shared prefixes and suffixes never add to the distance
+    start = 0
+    while start < len(left) and start < len(right) and left[start] == right[start]:
+        start += 1
+    end = 0
+    while (
+        end < len(left) - start
+        and end < len(right) - start
+        and left[-1 - end] == right[-1 - end]
+    ):
+        end += 1
+    left, right = left[start:len(left) - end], right[start:len(right) - end]
+    if not left or not right:
+        return min(len(left) + len(right), max_distance + 1)
+
+    previous_previous: list[int] = []
+    previous = list(range(len(right) + 1))
+    for i in range(1, len(left) + 1):
+        current = [i] + [0] * len(right)
+        for j in range(1, len(right) + 1):
+            cost = 0 if left[i - 1] == right[j - 1] else 1
+            current[j] = min(
+                previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost
+            )
+            if (
+                i > 1
+                and j > 1
+                and left[i - 1] == right[j - 2]
+                and left[i - 2] == right[j - 1]
+            ):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def _deletes(word: str, max_distance: int) -> set[str]:
+    """Every string made by removing up to max_distance characters from word."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:i] + variant[i + 1:]
+            for variant in frontier
+            for i in range(len(variant))
+        } - variants
+        variants |= frontier
+    return variants
+
+
+class SymSpellIndex:
+    """Symmetric-delete spelling correction over a known vocabulary.
+
+    Every known word is indexed under all deletions of its first
+    prefix_length characters. A lookup generates the same deletions for the
+    query term, so candidates come from a handful of dict hits instead of a
+    scan over the vocabulary, and only those candidates are checked with a
+    real edit distance. Known words may map to a canonical spelling, so a
+    near-miss of a dictionary variant corrects straight to its canonical
+    form.
+    """
+
+    def __init__(
+        self, max_distance: int = 2, prefix_length: int = 7, min_term_length: int = 4
+    ) -> None:
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.min_term_length = min_term_length
+        self._counts: dict[str, int] = {}
+        self._canonical: dict[str, str] = {}
+        self._deletes: dict[str, list[str]] = {}
+        self.correct = lru_cache(maxsize=16384)(self._correct)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._counts
+
+    def add_word(self, word: str, count: int = 1, canonical: str | None = None) -> None:
+        if word not in self._counts:
+            for variant in _deletes(word[:self.prefix_length], self.max_distance):
+                self._deletes.setdefault(variant, []).append(word)
+        self._counts[word] = self._counts.get(word, 0) + count
+        if canonical is not None:
+            self._canonical[word] = canonical
+        self.correct.cache_clear()
+
+    def _correct(self, term: str) -> str | None:
+        """Canonical form of the closest known word within max_distance, or None.
+
+        Known words and terms shorter than min_term_length are left alone
+        (None). Ties on distance go to the more frequent word.
+        """
+        if term in self._counts or len(term) < self.min_term_length or term.isdigit():
+            return None
+        best: tuple[int, int, str] | None = None
+        bound = self.max_distance
+        seen: set[str] = set()
+        for variant in _deletes(term[:self.prefix_length], self.max_distance):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                # Only candidates that can tie or beat the best so far are worth a DP
+                if abs(len(candidate) - len(term)) > bound:
+                    continue
+                distance = bounded_edit_distance(term, candidate, bound)
+                if distance > bound:
+                    continue
+                bound = distance
+                key = (distance, -self._counts[candidate], candidate)
+                if best is None or key < best:
+                    best = key
+        if best is None:
+            return None
+        word = best[2]
+        return self._canonical.get(word, word)
+
+    @classmethod
+    def build(
+        cls,
+        vocabulary: dict[str, int],
+        replacements: dict[str, str] | None = None,
+        max_distance: int = 2,
+    ) -> SymSpellIndex:
+        """Index corpus words (word -> frequency) plus dictionary words."""
+        index = cls(max_distance=max_distance)
+        for word, count in vocabulary.items():
+            index.add_word(word, count)
+        for variant, canonical in (replacements or {}).items():
+            if " " in variant:
+                continue
+            index.add_word(variant, canonical=canonical)
+            for word in canonical.split():
+                index.add_word(word)
+        return index
+
+
+def load_vocabulary(path: str | Path) -> dict[str, int]:
+    """Read a word<TAB>count file as written by save_vocabulary."""
+    vocabulary: dict[str, int] = {}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            word, _, count = line.rstrip("\n").partition("\t")
+            if word:
+                vocabulary[word] = int(count or 1)
+    return vocabulary
+
+
+def save_vocabulary(path: str | Path, vocabulary: dict[str, int]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        ordered = sorted(vocabulary.items(), key=lambda item: (-item[1], item[0]))
+        for word, count in ordered:
+            handle.write(f"{word}\t{count}\n")
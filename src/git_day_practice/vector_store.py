@@ -33,18 +33,299 @@
 #     )
 
 from __future__ import annotations
-from qdrant_client import QdrantClient
+import inspect
+from functools import lru_cache
+from typing import Callable
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from git_day_practice.settings import settings
 
-def get_qdrant_client() -> QdrantClient:
+def _client_options() -> dict:
+    """Connection options shared by the sync and async clients."""
     # Use qdrant_url if it exists, otherwise use host and port
     if hasattr(settings, 'qdrant_url') and settings.qdrant_url:
-        return QdrantClient(url=settings.qdrant_url)
+        location = {"url": settings.qdrant_url}
     elif hasattr(settings, 'qdrant_host') and hasattr(settings, 'qdrant_port'):
-        return QdrantClient(
-            host=settings.qdrant_host,
-            port=settings.qdrant_port,
-        )
+        location = {"host": settings.qdrant_host, "port": settings.qdrant_port}
     else:
         # Default to localhost
-        return QdrantClient(location=":memory:")  # Use in-memory for testing
\ No newline at end of file
+        return {"location": ":memory:"}  # Use in-memory for testing
+    return {
+        **location,
+        "timeout": settings.qdrant_timeout_seconds,
+        "prefer_grpc": settings.qdrant_prefer_grpc,
+        "grpc_port": settings.qdrant_grpc_port,
+    }
+
+@lru_cache(maxsize=1)
+def get_qdrant_client() -> QdrantClient:
+    """Process-wide client, so its keep-alive connection pool is reused."""
+    return QdrantClient(**_client_options())
+
+def recreate_collection(
+    client: QdrantClient, collection_name: str, vector_size: int
+) -> None:
+    from qdrant_client import models
+    if client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+        ),
+    )
+
+def ensure_collection(
+    client: QdrantClient, collection_name: str, vector_size: int
+) -> None:
+    """Create the collection (and a doc_id payload index) only if it is missing."""
+    from qdrant_client import models
+    if client.collection_exists(collection_name):
+        return
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config=models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+        ),
+    )
+    client.create_payload_index(
+        collection_name=collection_name,
+        field_name="doc_id",
+        field_schema=models.PayloadSchemaType.KEYWORD,
+    )
+
+def fetch_content_hashes(
+    client: QdrantClient, collection_name: str, point_ids: list[str]
+) -> dict[str, str]:
+    """Return {point id: stored content_hash} for the ids that already exist."""
+    if not client.collection_exists(collection_name):
+        return {}
+    points = client.retrieve(
+        collection_name=collection_name,
+        ids=point_ids,
+        with_payload=["content_hash"],
+        with_vectors=False,
+    )
+    return {
+        str(point.id): (point.payload or {}).get("content_hash", "")
+        for point in points
+    }
+
+def has_legacy_point_ids(client: QdrantClient, collection_name: str) -> bool:
+    """True if the collection still holds pre-chunk_point_id integer point ids.
+
+    Qdrant orders integer ids before UUIDs, so the first scrolled point is
+    enough to tell.
+    """
+    if not client.collection_exists(collection_name):
+        return False
+    points, _ = client.scroll(
+        collection_name=collection_name,
+        limit=1,
+        with_payload=False,
+        with_vectors=False,
+    )
+    return bool(points) and isinstance(points[0].id, int)
+
+def delete_stale_chunks(
+    client: QdrantClient,
+    collection_name: str,
+    doc_chunk_counts: dict[str, int],
+    scroll_batch_size: int = 1024,
+) -> dict:
+    """Remove chunks of documents that disappeared or now have fewer chunks.
+
+    Only doc_id and chunk_index are scrolled, so no vectors or text move over
+    the network. Deletes are issued as doc_id filters. Points that still use
+    legacy integer ids are duplicates of their UUID-keyed replacements and
+    are deleted as well.
+    """
+    from qdrant_client import models
+    if not client.collection_exists(collection_name):
+        return {"deleted_docs": [], "shrunk_docs": {}, "legacy_points": 0}
+
+    stored_counts: dict[str, int] = {}
+    legacy_ids: list[int] = []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=scroll_batch_size,
+            offset=offset,
+            with_payload=["doc_id", "chunk_index"],
+            with_vectors=False,
+        )
+        for point in points:
+            if isinstance(point.id, int):
+                legacy_ids.append(point.id)
+                continue
+            payload = point.payload or {}
+            doc_id = payload.get("doc_id", "")
+            stored_counts[doc_id] = max(
+                stored_counts.get(doc_id, 0), payload.get("chunk_index", 0)
+            )
+        if offset is None:
+            break
+
+    deleted_docs = sorted(
+        doc_id for doc_id in stored_counts if doc_id not in doc_chunk_counts
+    )
+    shrunk_docs = {
+        doc_id: doc_chunk_counts[doc_id]
+        for doc_id, stored in stored_counts.items()
+        if doc_id in doc_chunk_counts and stored > doc_chunk_counts[doc_id]
+    }
+
+    if deleted_docs:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    must=[
+                        models.FieldCondition(
+                            key="doc_id", match=models.MatchAny(any=deleted_docs)
+                        )
+                    ]
+                )
+            ),
+        )
+    for doc_id, chunk_count in shrunk_docs.items():
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.FilterSelector(
+                filter=models.Filter(
+                    must=[
+                        models.FieldCondition(
+                            key="doc_id", match=models.MatchValue(value=doc_id)
+                        ),
+                        models.FieldCondition(
+                            key="chunk_index", range=models.Range(gt=chunk_count)
+                        ),
+                    ]
+                )
+            ),
+        )
+    if legacy_ids:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=legacy_ids),
+        )
+    return {
+        "deleted_docs": deleted_docs,
+        "shrunk_docs": shrunk_docs,
+        "legacy_points": len(legacy_ids),
+    }
+
+@lru_cache(maxsize=1)
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Shared async client; its connection pool serves every in-flight request."""
+    return AsyncQdrantClient(**_client_options())
+
+
+class QdrantSearchAdapter:
+    """Search calls bound once to whichever API the installed qdrant-client has.
+
+    Both methods return plain lists of scored points.
+    """
+
+    def __init__(
+        self, client, collection_name: str, with_payload: bool | list[str] = True
+    ) -> None:
+        self.client = client
+        self.collection_name = collection_name
+        self.with_payload = with_payload
+        self.search_method, self._search = self._resolve_search()
+        self.batch_method, self._search_batch = self._resolve_search_batch()
+
+    def search(self, query_vector: list[float], limit: int) -> list:
+        return self._search(query_vector, limit)
+
+    def search_batch(self, query_vectors: list[list[float]], limit: int) -> list[list]:
+        return self._search_batch(query_vectors, limit)
+
+    def _resolve_search(self) -> tuple[str, Callable[[list[float], int], list]]:
+        client = self.client
+        options: dict = {"collection_name": self.collection_name}
+        # The default already returns the full payload
+        if self.with_payload is not True:
+            options["with_payload"] = self.with_payload
+        # query_points (latest versions)
+        if hasattr(client, 'query_points'):
+            return "query_points", lambda vector, limit: client.query_points(
+                query=vector, limit=limit, **options
+            ).points
+        # search (older versions); the vector keyword changed name over time
+        if hasattr(client, 'search'):
+            parameters = inspect.signature(client.search).parameters
+            keyword = "query_vector" if "query_vector" in parameters else "vector"
+            return "search", lambda vector, limit: client.search(
+                limit=limit, **{keyword: vector}, **options
+            )
+        if hasattr(client, 'search_points'):
+            return "search_points", lambda vector, limit: client.search_points(
+                vector=vector, limit=limit, **options
+            )
+        raise RuntimeError(
+            f"No supported search method found on {type(client).__name__}"
+        )
+
+    def _resolve_search_batch(
+        self,
+    ) -> tuple[str, Callable[[list[list[float]], int], list[list]]]:
+        from qdrant_client import models
+        client, collection_name = self.client, self.collection_name
+        # query_batch_points (qdrant-client >= 1.10)
+        if hasattr(client, 'query_batch_points'):
+            return "query_batch_points", lambda vectors, limit: [
+                response.points
+                for response in client.query_batch_points(
+                    collection_name=collection_name,
+                    requests=[
+                        models.QueryRequest(
+                            query=vector, limit=limit, with_payload=self.with_payload
+                        )
+                        for vector in vectors
+                    ],
+                )
+            ]
+        # search_batch (older versions)
+        if hasattr(client, 'search_batch'):
+            return "search_batch", lambda vectors, limit: client.search_batch(
+                collection_name=collection_name,
+                requests=[
+                    models.SearchRequest(
+                        vector=vector, limit=limit, with_payload=self.with_payload
+                    )
+                    for vector in vectors
+                ],
+            )
+        # No batch API available: fall back to one request per vector
+        return "per_vector", lambda vectors, limit: [
+            self._search(vector, limit) for vector in vectors
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_search_adapter():
+    """Search backend selected by settings.vector_backend."""
+    if settings.vector_backend == "local":
+        from git_day_practice.local_index import load_local_index
+        return load_local_index(settings.local_index_path)
+    if settings.vector_backend == "ivf":
+        # Trained offline by scripts/build_ivf_index.py
+        from git_day_practice.ivf_index import IVFIndex
+        return IVFIndex.load(settings.ivf_index_path, nprobe=settings.ivf_nprobe)
+    if settings.vector_backend == "mmap":
+        from git_day_practice.disk_index import MappedVectorIndex
+        return MappedVectorIndex(
+            settings.mmap_index_path,
+            prefilter_factor=settings.mmap_prefilter_factor,
+            rescore_factor=settings.mmap_rescore_factor,
+        )
+    from git_day_practice.chunk_store import SEARCH_PAYLOAD_FIELDS
+    return QdrantSearchAdapter(
+        get_qdrant_client(),
+        settings.qdrant_collection_name,
+        with_payload=SEARCH_PAYLOAD_FIELDS if settings.slim_payloads else True,
+    )
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import pytest
+
+from git_day_practice import answer_cache, rag, retrieval
+from git_day_practice.answer_cache import (
+    CollectionVersionFile,
+    InMemoryAnswerCache,
+    build_answer_cache_key,
+)
+from git_day_practice.retrieved_chunk import RetrievedChunk
+from git_day_practice.semantic_cache import SemanticAnswerCache
+
+
+def test_cache_key_depends_on_chunk_ids_and_version() -> None:
+    query = "qdrant kya karta hai"
+    key = build_answer_cache_key("rag", query, 3, ["a", "b"], "docs", 1)
+    assert key == build_answer_cache_key("rag", query, 3, ["a", "b"], "docs", 1)
+    assert key != build_answer_cache_key("rag", query, 3, ["a", "c"], "docs", 1)
+    assert key != build_answer_cache_key("rag", query, 3, ["a", "b"], "docs", 2)
+    # Same chunk ids, rewritten chunk text
+    assert build_answer_cache_key(
+        "rag", "q", 3, ["a"], "docs", 1, ["h1"]
+    ) != build_answer_cache_key("rag", "q", 3, ["a"], "docs", 1, ["h2"])
+
+
+def test_version_bump_in_another_process_invalidates_memory_cache(tmp_path) -> None:
+    path = tmp_path / "versions.json"
+    api_cache = InMemoryAnswerCache(60, version_file=CollectionVersionFile(path))
+    ingest_cache = InMemoryAnswerCache(60, version_file=CollectionVersionFile(path))
+    assert api_cache.get_collection_version("docs") == 0
+    api_cache.set("key", "docs", "old answer")
+
+    assert ingest_cache.bump_collection_version("docs") == 1
+    assert api_cache.get_collection_version("docs") == 1
+    assert api_cache.get("key") is None
+
+
+
+def test_memory_cache_evicts_least_recently_used_and_expired(monkeypatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: now[0])
+    cache = InMemoryAnswerCache(ttl_seconds=10, max_entries=2)
+    cache.set("a", "docs", "A")
+    cache.set("b", "docs", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "docs", "C")
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+
+    now[0] = 11.0
+    cache.set("d", "docs", "D")
+    assert list(cache._answers) == ["d"]
+
+@pytest.fixture()
+def rag_fakes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        rag,
+        "dual_query_search",
+        lambda question, limit: {
+            "original_query": question,
+            "normalized_query": question.lower(),
+            "retrieval_path": "batched",
+            "results": [
+                RetrievedChunk(
+                    score=0.9, chunk_id="c1", doc_id="d1", title="t", text="x"
+                )
+            ],
+        },
+    )
+
+    def fake_generate(prompt: str) -> str:
+        calls.append(prompt)
+        return "Qdrant is a vector database."
+
+    monkeypatch.setattr(rag, "generate_answer_from_prompt", fake_generate)
+    monkeypatch.setattr(answer_cache, "get_answer_cache", lambda: cache)
+    monkeypatch.setattr(answer_cache, "get_semantic_cache", lambda: semantic)
+    # Paraphrases of the Qdrant question share one embedding direction
+    monkeypatch.setattr(
+        retrieval,
+        "encode_queries",
+        lambda queries: [[1.0, 0.0] if "qdrant" in q else [0.0, 1.0] for q in queries],
+    )
+    cache = InMemoryAnswerCache(ttl_seconds=60)
+    semantic = SemanticAnswerCache(max_entries=8, similarity_threshold=0.9)
+    return cache, calls
+
+
+def test_answer_with_rag_reuses_cached_answer(rag_fakes) -> None:
+    cache, calls = rag_fakes
+    first = rag.answer_with_rag("What is Qdrant?")
+    second = rag.answer_with_rag("What is Qdrant?")
+    assert len(calls) == 1
+    assert first["answer_cache_hit"] is False
+    assert second["answer_cache_hit"] is True
+    assert second["answer"] == first["answer"]
+
+
+def test_collection_version_bump_invalidates_answers(rag_fakes) -> None:
+    cache, calls = rag_fakes
+    rag.answer_with_rag("What is Qdrant?")
+    answer_cache.bump_collection_version(answer_cache.settings.qdrant_collection_name)
+    assert rag.answer_with_rag("What is Qdrant?")["answer_cache_hit"] is False
+    assert len(calls) == 2
+
+
+def test_answer_with_rag_serves_paraphrase_from_semantic_cache(rag_fakes) -> None:
+    cache, calls = rag_fakes
+    rag.answer_with_rag("Qdrant kya karta hai")
+    second = rag.answer_with_rag("qdrant kia krta he")
+    assert len(calls) == 1
+    assert second["answer_cache_type"] == "semantic"
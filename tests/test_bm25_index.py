@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from git_day_practice.bm25_index import BM25Index, tokenize
+
+
+def make_record(chunk_id: str, text: str, chunk_index: int = 1) -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "doc_id": chunk_id.split("-")[0],
+        "chunk_index": chunk_index,
+        "text": text,
+    }
+
+
+RECORDS = [
+    make_record("a-chunk-001", "Qdrant stores vectors for semantic search."),
+    make_record("b-chunk-001", "Error code ERR-4711 means the collection is missing."),
+    make_record("c-chunk-001", "Mujhe batao retrieval kaise kaam karta hai."),
+]
+
+
+def test_tokenize_splits_punctuation_and_normalizes_roman_urdu() -> None:
+    assert tokenize("Mje btao, ERR-4711 kia he?") == [
+        "mujhe", "batao", "err", "4711", "kya", "hai"
+    ]
+
+
+def test_search_ranks_exact_identifier_first() -> None:
+    index = BM25Index.from_chunk_records(RECORDS)
+    hits = index.search("what is ERR-4711", limit=3)
+    assert hits[0].payload["chunk_id"] == "b-chunk-001"
+    assert all(hit.score > 0 for hit in hits)
+    # Roman Urdu spelling variants match through normalization
+    hits = index.search("retrival kese krta he", limit=1)
+    assert hits[0].payload["chunk_id"] == "c-chunk-001"
+
+
+def test_incremental_add_replaces_and_prune_removes() -> None:
+    index = BM25Index.from_chunk_records(RECORDS)
+    index.add([make_record("b-chunk-001", "Now about payload indexes.")])
+    assert len(index) == 3
+    assert index.search("ERR-4711", limit=3) == []
+    assert index.search("payload", limit=1)[0].payload["chunk_id"] == "b-chunk-001"
+
+    index.prune({"a": 1, "b": 1})
+    assert "c-chunk-001" not in index
+    assert index.search("batao", limit=3) == []
+
+
+def test_save_and_load_round_trip(tmp_path) -> None:
+    index = BM25Index.from_chunk_records(RECORDS)
+    index.remove(["a-chunk-001"])
+    path = tmp_path / "bm25.npz"
+    index.save(path)
+
+    loaded = BM25Index.load(path)
+    assert len(loaded) == 2
+    def ranked(hits):
+        return [(hit.payload["chunk_id"], round(hit.score, 5)) for hit in hits]
+
+    for query in ["ERR-4711", "retrieval karta"]:
+        assert ranked(loaded.search(query, 3)) == ranked(index.search(query, 3))
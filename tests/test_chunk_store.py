@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from qdrant_client import QdrantClient, models
+
+from git_day_practice.chunk_store import (
+    SEARCH_PAYLOAD_FIELDS,
+    SQLiteChunkStore,
+    hydrate_results,
+    slim_payload,
+)
+from git_day_practice.ingestion import build_chunk_records
+from git_day_practice.retrieved_chunk import RetrievedChunk
+from git_day_practice.vector_store import QdrantSearchAdapter, ensure_collection
+
+
+def make_records() -> list[dict]:
+    documents = [
+        {"doc_id": doc_id, "title": doc_id.upper(), "language": "en", "source": "test",
+         "text": " ".join(f"{doc_id}{i}" for i in range(words))}
+        for doc_id, words in [("a", 100), ("b", 50)]
+    ]
+    return build_chunk_records(documents)
+
+
+def test_sqlite_store_round_trip_and_stale_cleanup(tmp_path) -> None:
+    store = SQLiteChunkStore(tmp_path / "chunks.sqlite")
+    records = make_records()
+    store.put_many(records)
+
+    found = store.get_many([records[0]["chunk_id"], "missing"])
+    assert list(found) == [records[0]["chunk_id"]]
+    assert found[records[0]["chunk_id"]]["text"] == records[0]["text"]
+
+    store.delete_documents({"a": 1})
+    remaining = store.get_many([record["chunk_id"] for record in records])
+    assert list(remaining) == ["a-chunk-001"]
+    # Documents missing from the counts are dropped whole
+    store.delete_documents({})
+    assert store.get_many(["a-chunk-001"]) == {}
+
+
+def test_slim_search_hydrates_only_final_results(tmp_path) -> None:
+    store = SQLiteChunkStore(tmp_path / "chunks.sqlite")
+    records = make_records()
+    store.put_many(records)
+
+    client = QdrantClient(location=":memory:")
+    ensure_collection(client, "slim", 2)
+    client.upsert(
+        collection_name="slim",
+        points=[
+            models.PointStruct(id=i, vector=[1.0, i / 10], payload=slim_payload(record))
+            for i, record in enumerate(records)
+        ],
+    )
+    adapter = QdrantSearchAdapter(client, "slim", with_payload=SEARCH_PAYLOAD_FIELDS)
+    hits = adapter.search([1.0, 0.0], limit=2)
+    slim_fields = {"chunk_id", "doc_id", "content_hash"}
+    assert all(set(hit.payload) == slim_fields for hit in hits)
+
+    results = [RetrievedChunk.from_payload(hit.score, hit.payload) for hit in hits]
+    hydrated = hydrate_results(results, store=store)
+    by_id = {record["chunk_id"]: record for record in records}
+    expected_texts = [by_id[item.chunk_id]["text"] for item in results]
+    assert [item.text for item in hydrated] == expected_texts
+    assert hydrated[0].title == by_id[results[0].chunk_id]["title"]
+    assert hydrated[0].score == results[0].score
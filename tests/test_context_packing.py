@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from git_day_practice.context_packing import (
+    build_context_passages,
+    overlap_length,
+    pack_context,
+)
+from git_day_practice.ingestion import build_chunk_records
+from git_day_practice.rag import build_context_block
+from git_day_practice.retrieved_chunk import RetrievedChunk
+
+
+def count_words(word: str) -> int:
+    return 1
+
+
+def chunk(
+    chunk_id: str, doc_id: str, index: int, text: str, score: float
+) -> RetrievedChunk:
+    return RetrievedChunk(
+        score=score,
+        chunk_id=chunk_id,
+        doc_id=doc_id,
+        title=doc_id,
+        chunk_index=index,
+        text=text,
+    )
+
+
+def test_overlap_length_finds_longest_shared_run() -> None:
+    assert overlap_length("a b c d".split(), "c d e".split()) == 2
+    assert overlap_length("a b".split(), "x y".split()) == 0
+
+
+def test_adjacent_chunks_merge_without_repeating_overlap() -> None:
+    text = " ".join(f"w{i}." for i in range(30))
+    document = {
+        "doc_id": "d", "title": "t", "language": "en", "source": "s", "text": text
+    }
+    records = build_chunk_records([document], chunk_size=12, overlap=4)
+    results = [
+        RetrievedChunk(score=0.9 - 0.1 * i, chunk_id=r["chunk_id"], doc_id="d",
+                       chunk_index=r["chunk_index"], text=r["text"])
+        for i, r in enumerate(records[:3])
+    ]
+    [passage] = pack_context(
+        list(reversed(results)), max_tokens=1000, count_tokens=count_words
+    )
+    assert passage.text == " ".join(f"w{i}." for i in range(28))
+    assert passage.chunk_ids == tuple(r["chunk_id"] for r in records[:3])
+    assert passage.score == 0.9
+
+
+def test_budget_packs_by_score_and_trims_at_sentences() -> None:
+    results = [
+        chunk("low", "d1", 0, "Low one. Low two.", 0.3),
+        chunk("high", "d2", 0, "High one. High two.", 0.9),
+        chunk("mid", "d3", 4, "Mid one is long. Mid two is longer still.", 0.6),
+    ]
+    passages = pack_context(results, max_tokens=10, count_tokens=count_words)
+    assert [p.chunk_ids for p in passages] == [("high",), ("mid",), ("low",)]
+    assert [p.text for p in passages] == [
+        "High one. High two.",
+        "Mid one is long.",
+        "Low one.",
+    ]
+
+
+def test_passage_without_a_fitting_sentence_is_skipped() -> None:
+    results = [
+        chunk("a", "d1", 0, "One two three.", 0.9),
+        chunk("b", "d2", 0, "Four five six seven.", 0.8),
+    ]
+    passages = pack_context(results, max_tokens=5, count_tokens=count_words)
+    assert [p.chunk_ids for p in passages] == [("a",)]
+    # The best passage is cut mid-sentence rather than leaving the context empty
+    passages = pack_context(results[1:], max_tokens=2, count_tokens=count_words)
+    assert passages[0].text == "Four five"
+
+
+def test_context_block_lists_merged_chunk_ids() -> None:
+    passages = build_context_passages(
+        [
+            chunk("c1", "d", 0, "Alpha beta gamma.", 0.9),
+            chunk("c2", "d", 1, "gamma. Delta.", 0.8),
+        ]
+    )
+    block = build_context_block(passages)
+    assert "chunk_id: c1, c2" in block
+    assert "text: Alpha beta gamma. Delta." in block
+
+
+def test_answer_sources_follow_source_numbers(monkeypatch) -> None:
+    from git_day_practice import rag
+    from git_day_practice.settings import settings
+
+    results = [
+        chunk("low", "d1", 0, "Low one.", 0.3),
+        chunk("high-a", "d2", 0, "High one.", 0.9),
+        chunk("high-b", "d2", 1, "High two.", 0.7),
+    ]
+    prompts = []
+    monkeypatch.setattr(settings, "answer_cache_enabled", False)
+    monkeypatch.setattr(rag, "dual_query_search", lambda question, limit: {
+        "normalized_query": question, "retrieval_path": "batched", "results": results,
+    })
+    monkeypatch.setattr(
+        rag,
+        "generate_answer_from_prompt",
+        lambda prompt: prompts.append(prompt) or "See [Source 1].",
+    )
+
+    result = rag.answer_with_rag("What is high?")
+    sources = result["sources"]
+    assert [item.chunk_id for item in sources] == ["high-a", "low"]
+    assert sources[0].text == "High one. High two."
+    assert "[Source 1]\ndoc_id: d2\nchunk_id: high-a, high-b" in prompts[0]
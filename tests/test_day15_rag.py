@@ -52,4 +52,39 @@ def test_rag_endpoint_with_limit_1():
     )
     assert response.status_code == 200
     body = response.json()
-    assert len(body["sources"])
\ No newline at end of file
+    assert len(body["sources"])
+
+
+def test_rag_async_endpoint_uses_async_pipeline(monkeypatch):
+    """Test the async RAG endpoint returns the async pipeline result."""
+    from git_day_practice import api
+    from git_day_practice.retrieved_chunk import RetrievedChunk
+
+    async def fake_answer_with_rag_async(question, limit):
+        return {
+            "question": question,
+            "normalized_query": question.lower(),
+            "retrieval_path": "single",
+            "answer": "Qdrant stores vectors.",
+            "sources": [
+                RetrievedChunk(
+                    score=0.8,
+                    chunk_id="d1-chunk-001",
+                    doc_id="d1",
+                    title="Qdrant",
+                    language="en",
+                    source="docs",
+                    chunk_index=1,
+                    text="Qdrant stores vectors.",
+                )
+            ],
+        }
+
+    monkeypatch.setattr(api, "answer_with_rag_async", fake_answer_with_rag_async)
+    response = client.post(
+        "/rag/async", json={"question": "What is Qdrant?", "limit": 3}
+    )
+    assert response.status_code == 200
+    assert response.json()["answer"] == "Qdrant stores vectors."
+    # Result objects are only turned into JSON by the response model
+    assert response.json()["sources"][0]["chunk_id"] == "d1-chunk-001"
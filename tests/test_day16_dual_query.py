@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from git_day_practice.normalization import normalize_roman_urdu
+from git_day_practice.normalization import count_normalized_tokens, normalize_roman_urdu
 
 def test_normalize_roman_urdu_changes_common_forms() -> None:
     assert normalize_roman_urdu("qdrant kia karta he") == "qdrant kya karta hai"
 
 def test_normalize_roman_urdu_keeps_clean_text_stable() -> None:
-    assert normalize_roman_urdu("what does qdrant do") == "what does qdrant do"
\ No newline at end of file
+    assert normalize_roman_urdu("what does qdrant do") == "what does qdrant do"
+
+def test_count_normalized_tokens() -> None:
+    assert count_normalized_tokens("qdrant kia krta he") == 3
+    assert count_normalized_tokens("what does qdrant do") == 0
@@ -30,4 +30,56 @@ def test_build_confidence_dict_with_results() -> None:
     result = build_confidence_dict(results)
     assert result["top_score"] == 0.9
     assert result["avg_score"] == 0.7
-    assert result["result_count"] == 3
\ No newline at end of file
+    assert result["result_count"] == 3
+
+
+@pytest.fixture()
+def agent_fakes(monkeypatch):
+    from git_day_practice import agent
+    from git_day_practice.retrieved_chunk import RetrievedChunk
+
+    searches = []
+
+    def fake_search(question: str, limit: int) -> dict:
+        searches.append(question)
+        return {
+            "original_query": question,
+            "normalized_query": question.lower(),
+            "retrieval_path": "batched",
+            "results": [
+                RetrievedChunk(
+                    score=0.8, chunk_id="c1", doc_id="d1", text="Qdrant stores vectors."
+                ),
+                RetrievedChunk(
+                    score=0.05, chunk_id="c2", doc_id="d1", text="It searches them."
+                ),
+            ],
+        }
+
+    monkeypatch.setattr(agent, "dual_query_search", fake_search)
+    return searches
+
+
+def test_vague_question_is_clarified_before_retrieval(agent_fakes) -> None:
+    from git_day_practice.agent import run_agent_loop
+
+    result = run_agent_loop("hi")
+    assert result["action"] == "clarify"
+    assert result["retrieval_path"] == "skipped"
+    assert agent_fakes == []
+    assert "retrieval" not in result["stage_timings_ms"]
+    assert set(result["stage_timings_ms"]) == {"query_guards", "total"}
+
+
+def test_staged_checks_match_choose_rag_action(agent_fakes) -> None:
+    from git_day_practice.agent import run_agent_loop
+    from git_day_practice.guardrails import choose_rag_action
+
+    result = run_agent_loop("What does Qdrant store?")
+    expected = choose_rag_action(result["question"], result["sources"])
+    assert result["action"] == expected["action"]
+    assert result["reason"] == expected["reason"]
+    assert result["action"] == "refuse"
+    assert agent_fakes == ["What does Qdrant store?"]
+    stages = {"query_guards", "retrieval", "result_guards", "total"}
+    assert stages <= set(result["stage_timings_ms"])
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from git_day_practice.disk_index import MappedVectorIndex, write_vector_store
+from git_day_practice.local_index import LocalVectorIndex, recall_at_k
+
+
+@pytest.fixture()
+def corpus():
+    rng = np.random.default_rng(7)
+    vectors = rng.normal(size=(400, 32)).astype(np.float32)
+    payloads = [{"chunk_id": f"doc-chunk-{i:03d}"} for i in range(len(vectors))]
+    return vectors, payloads
+
+
+@pytest.mark.parametrize("quantization", ["int8", "float16"])
+def test_mapped_index_round_trips_payloads_and_keeps_recall(
+    tmp_path, corpus, quantization
+) -> None:
+    vectors, payloads = corpus
+    path = tmp_path / "chunks.vec"
+    write_vector_store(path, vectors, payloads, quantization=quantization)
+    index = MappedVectorIndex(path, prefilter_factor=20, rescore_factor=4)
+    exact = LocalVectorIndex(vectors, payloads)
+
+    assert len(index) == 400
+    assert index.payload(123) == {"chunk_id": "doc-chunk-123"}
+    hit = index.search(exact.vectors[5].tolist(), limit=1)[0]
+    assert hit.payload["chunk_id"] == "doc-chunk-005"
+    assert abs(hit.score - 1.0) < 1e-5
+
+    queries = exact.vectors[:20].tolist()
+    assert recall_at_k(index, exact, queries, k=5) >= 0.8
+    index.close()
+
+
+def test_mapped_index_without_binary_codes_or_float32(tmp_path, corpus) -> None:
+    vectors, payloads = corpus
+    path = tmp_path / "chunks.vec"
+    write_vector_store(
+        path, vectors, payloads, binary_codes=False, include_float32=False
+    )
+    index = MappedVectorIndex(path)
+    assert index.codes is None and index.full is None
+    hit = index.search(vectors[9].tolist(), limit=1)[0]
+    assert hit.payload["chunk_id"] == "doc-chunk-009"
+    index.close()
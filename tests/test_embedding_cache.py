@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+
+from git_day_practice.embedding_cache import EmbeddingCache
+
+
+class CountingModel:
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode(self, texts, normalize_embeddings=False):
+        self.encoded.extend(texts)
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+def test_batch_put_and_get_round_trip_float32(tmp_path) -> None:
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite")
+    cache.put_many("model-a", ["hello", "world"], np.array([[0.5, 1.5], [2.0, 3.0]]))
+    hello, missing, world = cache.get_many("model-a", ["hello", "other", "world"])
+    assert hello.dtype == np.float32
+    assert hello.tolist() == [0.5, 1.5]
+    assert missing is None
+    assert world.tolist() == [2.0, 3.0]
+    assert cache.get_many("model-b", ["hello"]) == [None]
+
+
+def test_encode_only_embeds_misses_and_persists(tmp_path) -> None:
+    path = tmp_path / "embeddings.sqlite"
+    model = CountingModel()
+    first = EmbeddingCache(path).encode(model, "m", ["a", "bb", "a"])
+    second = EmbeddingCache(path).encode(model, "m", ["bb", "ccc"])
+    assert model.encoded == ["a", "bb", "ccc"]
+    assert first[:, 0].tolist() == [1.0, 2.0, 1.0]
+    assert second[:, 0].tolist() == [2.0, 3.0]
+
+
+def test_size_limit_evicts_oldest_entries(tmp_path) -> None:
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite", max_entries=2)
+    for text in ["one", "two", "three"]:
+        cache.put_many("m", [text], [[1.0]])
+    assert len(cache) == 2
+    assert cache.get_many("m", ["one"]) == [None]
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+
+from git_day_practice import embedding_workers
+from git_day_practice.embedding_cache import EmbeddingCache
+from git_day_practice.embedding_workers import EmbeddingWorkerPool
+
+
+class FakeModel:
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=False):
+        self.encoded.extend(texts)
+        rows = [[float(len(text)), 1.0, 0.5] for text in texts]
+        return np.array(rows, dtype=np.float32)
+
+
+class InlineResult:
+    def get(self) -> None:
+        return None
+
+
+class InlinePool:
+    """Runs jobs in this process; the shared-memory hand-off is still exercised."""
+
+    def apply_async(self, func, args):
+        func(*args)
+        return InlineResult()
+
+
+def make_pool(
+    monkeypatch, model: FakeModel, max_in_flight: int = 2
+) -> EmbeddingWorkerPool:
+    monkeypatch.setattr(embedding_workers, "_worker_model", model)
+    pool = object.__new__(EmbeddingWorkerPool)
+    pool.model_name = "fake"
+    pool.max_in_flight = max_in_flight
+    pool.encode_batch_size = 32
+    pool.dim = 3
+    pool._pool = InlinePool()
+    return pool
+
+
+def test_encode_stream_returns_batches_in_order_through_shared_memory(
+    monkeypatch,
+) -> None:
+    pool = make_pool(monkeypatch, FakeModel())
+    batches = [["a", "bb"], ["ccc"], ["dddd", "e", "ff"], ["ggggg"]]
+    results = list(pool.encode_stream(iter(batches)))
+
+    assert [result.shape for result in results] == [(2, 3), (1, 3), (3, 3), (1, 3)]
+    for texts, vectors in zip(batches, results, strict=True):
+        assert vectors.dtype == np.float32
+        assert vectors[:, 0].tolist() == [float(len(text)) for text in texts]
+
+
+def test_encode_stream_only_sends_misses_to_workers(monkeypatch, tmp_path) -> None:
+    model = FakeModel()
+    pool = make_pool(monkeypatch, model)
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite")
+    cached_vector = np.array([[9.0, 9.0, 9.0]], dtype=np.float32)
+    cache.put_many("fake", ["cached"], cached_vector)
+
+    [vectors] = list(pool.encode_stream([["cached", "new", "new"]], cache=cache))
+
+    assert model.encoded == ["new"]
+    assert vectors[:, 0].tolist() == [9.0, 3.0, 3.0]
+    assert cache.get_many("fake", ["new"])[0] is not None
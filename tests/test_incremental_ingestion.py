@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from qdrant_client import QdrantClient, models
+
+from git_day_practice.ingestion import (
+    build_chunk_records,
+    chunk_point_id,
+    compute_content_hash,
+)
+from git_day_practice.vector_store import (
+    delete_stale_chunks,
+    ensure_collection,
+    fetch_content_hashes,
+    has_legacy_point_ids,
+)
+
+COLLECTION = "test_chunks"
+
+
+def make_document(doc_id: str, words: int, text_prefix: str = "word") -> dict:
+    return {
+        "doc_id": doc_id,
+        "title": doc_id,
+        "language": "en",
+        "source": "test",
+        "text": " ".join(f"{text_prefix}{i}" for i in range(words)),
+    }
+
+
+def upsert_records(client: QdrantClient, records: list[dict]) -> None:
+    client.upsert(
+        collection_name=COLLECTION,
+        points=[
+            models.PointStruct(
+                id=chunk_point_id(record["chunk_id"]),
+                vector=[1.0, 0.0],
+                payload=record,
+            )
+            for record in records
+        ],
+    )
+
+
+def test_point_ids_and_hashes_are_deterministic() -> None:
+    first = build_chunk_records([make_document("doc-a", 100)])
+    second = build_chunk_records([make_document("doc-a", 100)])
+    changed = build_chunk_records([make_document("doc-a", 100, text_prefix="other")])
+    assert chunk_point_id(first[0]["chunk_id"]) == chunk_point_id(second[0]["chunk_id"])
+    assert first[0]["content_hash"] == compute_content_hash(first[0])
+    assert first[0]["content_hash"] != changed[0]["content_hash"]
+
+
+def test_fetch_content_hashes_returns_stored_hashes() -> None:
+    client = QdrantClient(location=":memory:")
+    assert fetch_content_hashes(client, COLLECTION, [chunk_point_id("x")]) == {}
+    ensure_collection(client, COLLECTION, 2)
+    records = build_chunk_records([make_document("doc-a", 100)])
+    upsert_records(client, records)
+    ids = [chunk_point_id(record["chunk_id"]) for record in records]
+    ids.append(chunk_point_id("missing"))
+    stored = fetch_content_hashes(client, COLLECTION, ids)
+    assert stored == {chunk_point_id(r["chunk_id"]): r["content_hash"] for r in records}
+
+
+def test_delete_stale_chunks_removes_deleted_and_shrunk_documents() -> None:
+    client = QdrantClient(location=":memory:")
+    ensure_collection(client, COLLECTION, 2)
+    upsert_records(
+        client,
+        build_chunk_records([make_document("doc-a", 200), make_document("doc-b", 50)]),
+    )
+
+    new_records = build_chunk_records([make_document("doc-a", 70)])
+    counts = {"doc-a": max(record["chunk_index"] for record in new_records)}
+    result = delete_stale_chunks(client, COLLECTION, counts)
+
+    assert result["deleted_docs"] == ["doc-b"]
+    assert result["shrunk_docs"] == {"doc-a": 1}
+    remaining, _ = client.scroll(
+        collection_name=COLLECTION, limit=100, with_payload=True
+    )
+    assert [point.payload["chunk_id"] for point in remaining] == ["doc-a-chunk-001"]
+
+
+def test_legacy_integer_ids_are_detected_and_removed() -> None:
+    client = QdrantClient(location=":memory:")
+    ensure_collection(client, COLLECTION, 2)
+    records = build_chunk_records([make_document("doc-a", 100)])
+    upsert_records(client, records)
+    assert has_legacy_point_ids(client, COLLECTION) is False
+
+    client.upsert(
+        collection_name=COLLECTION,
+        points=[
+            models.PointStruct(id=i, vector=[1.0, 0.0], payload=r)
+            for i, r in enumerate(records)
+        ],
+    )
+    assert has_legacy_point_ids(client, COLLECTION) is True
+    counts = {"doc-a": max(record["chunk_index"] for record in records)}
+    result = delete_stale_chunks(client, COLLECTION, counts)
+    assert result["legacy_points"] == len(records)
+    assert client.count(collection_name=COLLECTION).count == len(records)
+    assert has_legacy_point_ids(client, COLLECTION) is False
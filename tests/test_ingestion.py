@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from git_day_practice.ingestion import (
+    build_chunk_records,
+    chunk_text,
+    iter_chunk_spans,
+    iter_json_array,
+)
+from git_day_practice.ingestion_pipeline import run_ingestion_pipeline
+
+
+def make_documents(count: int) -> list[dict]:
+    return [
+        {
+            "doc_id": f"doc-{i:03d}",
+            "title": f"Doc {i}",
+            "language": "en",
+            "source": "test",
+            "text": " ".join(f"word{j}" for j in range(150)),
+        }
+        for i in range(count)
+    ]
+
+
+def test_iter_json_array_streams_items_across_small_reads(tmp_path) -> None:
+    documents = make_documents(5) + [12345, "tail"]
+    path = tmp_path / "docs.json"
+    path.write_text(json.dumps(documents, indent=2), encoding="utf-8")
+    assert list(iter_json_array(path, read_size=5)) == documents
+
+
+def test_iter_json_array_rejects_non_array(tmp_path) -> None:
+    path = tmp_path / "docs.json"
+    path.write_text('{"points": []}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json_array(path))
+
+
+def test_pipeline_upserts_every_chunk_and_reports_throughput() -> None:
+    documents = make_documents(20)
+    upserted: list[str] = []
+    lock = threading.Lock()
+    vector_sizes: list[int] = []
+
+    def upsert(records, vectors):
+        with lock:
+            upserted.extend(record["chunk_id"] for record in records)
+
+    progress_reports: list[dict] = []
+    report = run_ingestion_pipeline(
+        iter(documents),
+        lambda texts: [[1.0, 0.0]] * len(texts),
+        upsert,
+        batch_size=7,
+        upsert_workers=3,
+        on_first_vectors=vector_sizes.append,
+        progress=progress_reports.append,
+    )
+    expected = [record["chunk_id"] for record in build_chunk_records(documents)]
+    assert sorted(upserted) == sorted(expected)
+    assert vector_sizes == [2]
+    assert report["documents"] == 20
+    assert report["chunks"] == len(expected)
+    assert report["chunks_per_second"] > 0
+    # Per-document counts are only copied once, into the final report
+    assert len(report["doc_chunk_counts"]) == 20
+    assert progress_reports
+    assert all("doc_chunk_counts" not in item for item in progress_reports)
+
+
+def test_pipeline_records_failed_batches_and_continues() -> None:
+    def upsert(records, vectors):
+        if records[0]["doc_id"] == "doc-000":
+            raise RuntimeError("qdrant unavailable")
+
+    report = run_ingestion_pipeline(
+        iter(make_documents(4)),
+        lambda texts: [[1.0]] * len(texts),
+        upsert,
+        batch_size=3,
+        max_retries=1,
+        retry_delay_seconds=0,
+    )
+    assert report["failed_batches"] == 1
+    assert report["upserted"] == report["chunks"] - 3
+
+
+def test_pipeline_encode_stream_keeps_vectors_paired_with_records() -> None:
+    pairs: list[tuple[str, float]] = []
+    lock = threading.Lock()
+
+    def encode_stream(text_batches):
+        # Pull two batches ahead before yielding, like a pool with work in flight
+        held = []
+        for texts in text_batches:
+            held.append([[float(len(text)), 0.0] for text in texts])
+            if len(held) == 2:
+                yield held.pop(0)
+        yield from held
+
+    def upsert(records, vectors):
+        with lock:
+            pairs.extend(
+                (record["text"], vector[0])
+                for record, vector in zip(records, vectors, strict=True)
+            )
+
+    documents = make_documents(6)
+    for i, document in enumerate(documents):
+        document["text"] = " ".join(f"w{i}x{j}" for j in range(40 + 30 * i))
+    run_ingestion_pipeline(
+        iter(documents),
+        lambda texts: pytest.fail("encode must not be used with encode_stream"),
+        upsert,
+        batch_size=2,
+        encode_stream=encode_stream,
+    )
+    assert len(pairs) == len(build_chunk_records(documents))
+    assert all(float(len(text)) == length for text, length in pairs)
+
+
+def test_chunk_spans_match_word_windows_and_keep_offsets() -> None:
+    text = "  alpha beta\n\ngamma   delta epsilon zeta eta  "
+    spans = list(iter_chunk_spans(text, chunk_size=4, overlap=1))
+    assert [text[start:end].split() for start, end in spans] == [
+        ["alpha", "beta", "gamma", "delta"],
+        ["delta", "epsilon", "zeta", "eta"],
+    ]
+    assert chunk_text(text, chunk_size=4, overlap=1) == [
+        "alpha beta gamma delta",
+        "delta epsilon zeta eta",
+    ]
+    document = {**make_documents(1)[0], "text": text}
+    record = build_chunk_records([document], chunk_size=4, overlap=1)[0]
+    assert (record["start_char"], record["end_char"]) == spans[0]
+
+
+def test_chunk_spans_snap_to_sentence_end() -> None:
+    text = "One two three four. Five six seven eight nine ten"
+    spans = list(
+        iter_chunk_spans(text, chunk_size=6, overlap=1, snap_to_sentences=True)
+    )
+    assert text[spans[0][0]:spans[0][1]] == "One two three four."
+    assert text[spans[-1][0]:spans[-1][1]].endswith("ten")
+
+
+def test_chunk_spans_respect_token_budget() -> None:
+    text = " ".join(["short"] * 5 + ["veryverylongword"] + ["short"] * 5)
+
+    def count(word: str) -> int:
+        return 4 if len(word) > 10 else 1
+
+    spans = iter_chunk_spans(
+        text, chunk_size=80, overlap=2, max_tokens=6, count_tokens=count
+    )
+    for start, end in spans:
+        assert sum(count(word) for word in text[start:end].split()) <= 6
+    with pytest.raises(ValueError):
+        list(iter_chunk_spans(text, max_tokens=6))
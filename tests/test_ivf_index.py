@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import numpy as np
+
+from git_day_practice.ivf_index import IVFIndex, train_centroids
+from git_day_practice.local_index import LocalVectorIndex, recall_at_k
+
+
+def make_clustered_corpus(n_clusters: int = 8, per_cluster: int = 60, dim: int = 16):
+    rng = np.random.default_rng(3)
+    centers = rng.normal(size=(n_clusters, dim))
+    vectors = np.concatenate(
+        [center + 0.1 * rng.normal(size=(per_cluster, dim)) for center in centers]
+    ).astype(np.float32)
+    payloads = [{"chunk_id": f"c{i}"} for i in range(len(vectors))]
+    return vectors, payloads
+
+
+def test_train_centroids_returns_normalized_centroids() -> None:
+    vectors, _ = make_clustered_corpus()
+    centroids = train_centroids(vectors, n_clusters=8)
+    assert centroids.shape == (8, 16)
+    assert np.allclose(np.linalg.norm(centroids, axis=1), 1.0, atol=1e-5)
+
+
+def test_ivf_recall_against_exact_search() -> None:
+    vectors, payloads = make_clustered_corpus()
+    index = IVFIndex.build(vectors, payloads, n_clusters=8, nprobe=2)
+    exact = LocalVectorIndex(vectors, payloads)
+    queries = exact.vectors[::15].tolist()
+    assert len(index) == len(vectors)
+    assert recall_at_k(index, exact, queries, k=5) >= 0.9
+
+
+def test_ivf_index_grows_incrementally() -> None:
+    vectors, payloads = make_clustered_corpus()
+    index = IVFIndex.build(vectors[:240], payloads[:240], n_clusters=8, nprobe=8)
+    index.add(vectors[240:], payloads[240:])
+    assert sum(index.list_sizes()) == len(vectors)
+    hit = index.search(vectors[-1].tolist(), limit=1)[0]
+    assert hit.payload["chunk_id"] == payloads[-1]["chunk_id"]
+
+
+def test_ivf_index_round_trips_through_save_and_load(tmp_path) -> None:
+    vectors, payloads = make_clustered_corpus()
+    index = IVFIndex.build(vectors, payloads, n_clusters=8, nprobe=2)
+    path = tmp_path / "ivf.npz"
+    index.save(path)
+
+    loaded = IVFIndex.load(path)
+    assert loaded.nprobe == 2
+    assert loaded.list_sizes() == index.list_sizes()
+    query = vectors[7].tolist()
+    assert loaded.search(query, limit=5) == index.search(query, limit=5)
+    # Payloads are stored as UTF-8 bytes and decoded only for returned hits
+    assert loaded._blob.data.dtype == np.uint8
+    # A loaded index keeps growing like a freshly built one, and saves again
+    loaded.add(vectors[:3], payloads[:3])
+    assert len(loaded) == len(vectors) + 3
+    loaded.save(path)
+    reloaded = IVFIndex.load(path, nprobe=8)
+    assert reloaded.search(vectors[1].tolist(), limit=1)[0].payload == payloads[1]
+
+
+def test_ivf_search_batch_matches_single_searches() -> None:
+    vectors, payloads = make_clustered_corpus()
+    index = IVFIndex.build(vectors, payloads, n_clusters=8, nprobe=3)
+    queries = vectors[::40].tolist()
+    batched = index.search_batch(queries, limit=4)
+    for hits, query in zip(batched, queries, strict=True):
+        single = index.search(query, limit=4)
+        assert [hit.payload for hit in hits] == [hit.payload for hit in single]
+        assert np.allclose([hit.score for hit in hits], [hit.score for hit in single])
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import groq
+import httpx
+import pytest
+
+from git_day_practice import api
+from git_day_practice.llm_client import (
+    LLMClient,
+    LLMRequestError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+)
+
+COMPLETION = {
+    "id": "c1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "m",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "ok"},
+        }
+    ],
+}
+
+
+def make_client(handler, max_retries: int = 2) -> LLMClient:
+    client = LLMClient(
+        "key", "m", max_retries=max_retries, retry_base_delay=0.0, retry_max_delay=0.0
+    )
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client._client = groq.Groq(api_key="key", max_retries=0, http_client=http_client)
+    return client
+
+
+def scripted(responses: list, calls: list):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        response = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(response, Exception):
+            raise response
+        status, body = response
+        return httpx.Response(status, json=body)
+    return handler
+
+
+def test_retries_retryable_errors_then_succeeds() -> None:
+    calls: list = []
+    responses = [(503, {"error": {}}), (429, {"error": {}}), (200, COMPLETION)]
+    client = make_client(scripted(responses, calls))
+    assert client.complete("hi") == "ok"
+    assert len(calls) == 3
+
+
+def test_client_errors_are_not_retried() -> None:
+    calls: list = []
+    client = make_client(scripted([(400, {"error": {"message": "bad"}})], calls))
+    with pytest.raises(LLMRequestError) as info:
+        client.complete("hi")
+    assert info.value.status_code == 502
+    assert len(calls) == 1
+
+
+def test_gives_up_after_max_retries_with_typed_error() -> None:
+    calls: list = []
+    client = make_client(scripted([httpx.ReadTimeout("slow")], calls), max_retries=1)
+    with pytest.raises(LLMTimeoutError) as info:
+        client.complete("hi")
+    assert info.value.status_code == 504
+    assert len(calls) == 2
+
+
+def test_async_client_retries_connection_errors() -> None:
+    calls: list = []
+    handler = scripted([httpx.ConnectError("down"), (200, COMPLETION)], calls)
+    client = LLMClient("key", "m", retry_base_delay=0.0, retry_max_delay=0.0)
+
+    async def run() -> str:
+        async_client, _ = client._async_state()
+        async_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return await client.complete_async("hi")
+
+    assert asyncio.run(run()) == "ok"
+    assert len(calls) == 2
+
+    calls.clear()
+    handler = scripted([httpx.ConnectError("down")], calls)
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(run())
+
+
+def test_api_maps_llm_errors_to_status_codes(client, monkeypatch) -> None:
+    async def failing(question: str, limit: int) -> dict:
+        raise LLMTimeoutError("LLM request timed out")
+
+    monkeypatch.setattr(api, "answer_with_rag_async", failing)
+    response = client.post("/rag/async", json={"question": "What is Qdrant?"})
+    assert response.status_code == 504
+    assert response.json() == {"detail": "LLM request timed out"}
+
+
+def test_stream_retries_only_before_first_delta() -> None:
+    calls: list = []
+    chunk = {
+        "id": "c1",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "m",
+        "choices": [{"index": 0, "delta": {"content": "ok"}, "finish_reason": None}],
+    }
+    body = f"data: {json.dumps(chunk)}\n\ndata: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503, json={"error": {}})
+        headers = {"content-type": "text/event-stream"}
+        return httpx.Response(200, content=body, headers=headers)
+
+    client = LLMClient("key", "m", retry_base_delay=0.0, retry_max_delay=0.0)
+
+    async def run() -> list[str]:
+        async_client, _ = client._async_state()
+        async_client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return [delta async for delta in client.stream_async("hi")]
+
+    assert asyncio.run(run()) == ["ok", "ok"]
+    assert len(calls) == 2
+
+
+def test_async_calls_queue_on_a_per_loop_semaphore() -> None:
+    client = LLMClient("key", "m", max_concurrency=1)
+
+    async def run() -> asyncio.Semaphore:
+        _, semaphore = client._async_state()
+        # The sync cap is separate and never blocks the event loop
+        with client._semaphore:
+            async with semaphore:
+                assert semaphore.locked()
+        return semaphore
+
+    first = asyncio.run(run())
+    assert asyncio.run(run()) is not first
+
+
+def test_async_client_of_a_previous_loop_is_closed() -> None:
+    client = LLMClient("key", "m")
+
+    async def state() -> groq.AsyncGroq:
+        return client._async_state()[0]
+
+    async def replace() -> groq.AsyncGroq:
+        replacement, _ = client._async_state()
+        await asyncio.gather(*client._closing)
+        return replacement
+
+    first = asyncio.run(state())
+    second = asyncio.run(replace())
+    assert second is not first
+    assert first.is_closed()
+    assert not second.is_closed()
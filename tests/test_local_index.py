@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from git_day_practice.local_index import LocalVectorIndex, top_k_indices
+
+SAMPLE_POINTS = Path(__file__).resolve().parent.parent / "sample_points.json"
+
+
+def test_top_k_indices_orders_best_first() -> None:
+    scores = np.array([0.1, 0.9, 0.5, 0.7], dtype=np.float32)
+    assert top_k_indices(scores, 2).tolist() == [1, 3]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 0]
+
+
+def test_search_returns_cosine_scores_and_payloads() -> None:
+    index = LocalVectorIndex(
+        np.array([[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]]),
+        [{"chunk_id": "a"}, {"chunk_id": "b"}, {"chunk_id": "c"}],
+    )
+    hits = index.search([0.0, 1.0], limit=2)
+    assert [hit.payload["chunk_id"] for hit in hits] == ["b", "c"]
+    assert abs(hits[0].score - 1.0) < 1e-6
+
+
+def test_search_batch_matches_single_search() -> None:
+    index = LocalVectorIndex.from_points_file(SAMPLE_POINTS)
+    queries = [index.vectors[0].tolist(), index.vectors[-1].tolist()]
+    batch = index.search_batch(queries, limit=3)
+    for query, hits in zip(queries, batch, strict=True):
+        single = index.search(query, 3)
+        assert [hit.payload for hit in hits] == [hit.payload for hit in single]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from git_day_practice.normalization import (
+    RomanUrduNormalizer,
+    get_normalizer,
+    load_dictionary,
+)
+
+
+def test_bundled_dictionary_keeps_original_replacements() -> None:
+    normalizer = get_normalizer()
+    assert normalizer.size > 50
+    assert normalizer.normalize("  Mjhe   btado  ") == "mujhe bata do"
+
+
+def test_longest_phrase_wins_over_single_words() -> None:
+    normalizer = RomanUrduNormalizer(
+        {"is": "yeh", "is mein": "ismein", "is mein bhi": "ismein bhi"}
+    )
+    assert normalizer.normalize("is mein kya hai") == "ismein kya hai"
+    assert normalizer.normalize("is mein bhi") == "ismein bhi"
+    assert normalizer.normalize("is wala") == "yeh wala"
+    # A phrase prefix without a complete match falls back to word lookups
+    assert normalizer.normalize("is") == "yeh"
+
+
+def test_count_changed_tokens_counts_phrase_words() -> None:
+    normalizer = RomanUrduNormalizer(
+        {"vector db": "vector database", "he": "hai", "kya": "kya"}
+    )
+    assert normalizer.count_changed_tokens("vector db kya he") == 3
+
+
+def test_batch_api_and_cache() -> None:
+    normalizer = RomanUrduNormalizer({"kia": "kya"}, cache_size=4)
+    normalized = normalizer.normalize_many(["kia", "kia baat", "kia"])
+    assert normalized == ["kya", "kya baat", "kya"]
+    normalizer.normalize("kia")
+    assert normalizer.cache_info().hits >= 1
+
+
+def test_load_dictionary_rejects_malformed_lines(tmp_path) -> None:
+    path = tmp_path / "dictionary.tsv"
+    path.write_text("# comment\n\nKia\tKya\nQ  Drant\tqdrant\n", encoding="utf-8")
+    assert load_dictionary(path) == {"kia": "kya", "q drant": "qdrant"}
+    path.write_text("kia kya\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_dictionary(path)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from git_day_practice import query_cache
+from git_day_practice.query_cache import QueryEmbeddingCache
+
+
+def test_cache_evicts_least_recently_used_entry() -> None:
+    cache = QueryEmbeddingCache(max_size=2, ttl_seconds=0)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    assert cache.get("m", "a") == [1.0]
+    cache.put("m", "c", [3.0])
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_cache_keys_include_model_name() -> None:
+    cache = QueryEmbeddingCache()
+    cache.put("model-a", "query", [1.0])
+    assert cache.get("model-b", "query") is None
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+    cache = QueryEmbeddingCache(ttl_seconds=10)
+    cache.put("m", "a", [1.0])
+    now[0] = 111.0
+    assert cache.get("m", "a") is None
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from git_day_practice.result_fusion import fuse_results
+from git_day_practice.retrieved_chunk import RetrievedChunk
+
+
+def item(chunk_id: str, score: float) -> RetrievedChunk:
+    return RetrievedChunk(score=score, chunk_id=chunk_id, doc_id=chunk_id.split("-")[0])
+
+
+SETS = [
+    [item("a-1", 0.9), item("b-1", 0.8), item("c-1", 0.3)],
+    [item("b-1", 0.85), item("a-2", 0.7), item("c-1", 0.6)],
+    [item("c-1", 0.4), item("b-1", 0.2)],
+]
+
+
+def test_max_fusion_matches_full_sort_reference() -> None:
+    rng = random.Random(1)
+    result_sets = [
+        [
+            item(f"d{rng.randrange(50)}-{rng.randrange(3)}", rng.random())
+            for _ in range(40)
+        ]
+        for _ in range(6)
+    ]
+    best: dict[str, RetrievedChunk] = {}
+    for result_set in result_sets:
+        for entry in result_set:
+            if entry.chunk_id not in best or entry.score > best[entry.chunk_id].score:
+                best[entry.chunk_id] = entry
+    reference = sorted(best.values(), key=lambda entry: entry.score, reverse=True)[:7]
+    assert fuse_results(result_sets, 7) == reference
+
+
+def test_rrf_rewards_chunks_found_by_several_sets() -> None:
+    fused = fuse_results(SETS, 3, "rrf")
+    assert [entry.chunk_id for entry in fused] == ["b-1", "c-1", "a-1"]
+    # The representative item is the chunk's best-scoring one
+    assert fused[0].score == 0.85
+
+
+def test_weighted_fusion_uses_normalized_scores_and_weights() -> None:
+    fused = fuse_results(SETS[:2], 2, "weighted", weights=[1.0, 0.1])
+    assert [entry.chunk_id for entry in fused] == ["a-1", "b-1"]
+    with pytest.raises(ValueError):
+        fuse_results(SETS, 2, "weighted", weights=[1.0])
+
+
+def test_collapse_by_doc_keeps_best_chunk_per_document() -> None:
+    fused = fuse_results(SETS, 5, "max", collapse_by_doc=True)
+    assert [entry.chunk_id for entry in fused] == ["a-1", "b-1", "c-1"]
+
+
+def test_unknown_strategy_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        fuse_results(SETS, 3, "median")
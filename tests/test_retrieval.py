@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from git_day_practice import retrieval
+from git_day_practice.vector_store import QdrantSearchAdapter
+
+
+class FakeModel:
+    def __init__(self) -> None:
+        self.encode_calls = 0
+
+    def encode(self, sentences, normalize_embeddings=False):
+        self.encode_calls += 1
+        if isinstance(sentences, str):
+            return np.ones(4)
+        return np.ones((len(sentences), 4))
+
+
+def make_point(chunk_id: str, score: float) -> SimpleNamespace:
+    return SimpleNamespace(
+        score=score,
+        payload={
+            "chunk_id": chunk_id, "doc_id": chunk_id.split("-")[0], "text": chunk_id
+        },
+    )
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.single_calls = 0
+        self.batch_calls = 0
+
+    def query_points(self, collection_name, query, limit):
+        self.single_calls += 1
+        return SimpleNamespace(points=[make_point("a-chunk-001", 0.9)])
+
+    def query_batch_points(self, collection_name, requests):
+        self.batch_calls += 1
+        return [
+            SimpleNamespace(points=[make_point(f"doc{i}-chunk-001", 0.5 + i / 10)])
+            for i, _ in enumerate(requests)
+        ]
+
+
+@pytest.fixture()
+def fakes(monkeypatch):
+    model = FakeModel()
+    client = FakeClient()
+    monkeypatch.setattr(retrieval, "get_embedding_model", lambda: model)
+    adapter = QdrantSearchAdapter(client, "documents")
+    monkeypatch.setattr(retrieval, "get_search_adapter", lambda: adapter)
+    retrieval.get_query_embedding_cache.cache_clear()
+    return model, client
+
+
+def test_dual_query_search_batches_both_variants(fakes) -> None:
+    model, client = fakes
+    payload = retrieval.dual_query_search("qdrant kia karta he", limit=3)
+    assert model.encode_calls == 1
+    assert client.batch_calls == 1
+    assert client.single_calls == 0
+    assert [item.chunk_id for item in payload["results"]] == [
+        "doc1-chunk-001",
+        "doc0-chunk-001",
+    ]
+
+
+def test_dual_query_search_skips_second_search_when_nothing_is_rewritten(fakes) -> None:
+    model, client = fakes
+    # Normalization only lowercases this query, which is no reason to search twice
+    payload = retrieval.dual_query_search("What does Qdrant do", limit=3)
+    assert model.encode_calls == 1
+    assert client.single_calls == 1
+    assert client.batch_calls == 0
+    assert payload["retrieval_path"] == "single"
+    assert payload["normalized_query"] == payload["original_query"].lower()
+
+
+def test_adaptive_strategy_stops_after_confident_first_pass(fakes, monkeypatch) -> None:
+    model, client = fakes
+    monkeypatch.setattr(retrieval.settings, "dual_query_strategy", "adaptive")
+    monkeypatch.setattr(retrieval.settings, "min_avg_score_for_answer", 0.5)
+    payload = retrieval.dual_query_search("What does Qdrant do he", limit=3)
+    assert payload["retrieval_path"] == "adaptive_original_only"
+    assert client.single_calls == 1
+
+
+def test_adaptive_strategy_runs_second_pass_for_weak_results(
+    fakes, monkeypatch
+) -> None:
+    model, client = fakes
+    monkeypatch.setattr(retrieval.settings, "dual_query_strategy", "adaptive")
+    monkeypatch.setattr(retrieval.settings, "min_top_score_for_answer", 0.95)
+    payload = retrieval.dual_query_search("What does Qdrant do he", limit=3)
+    assert payload["retrieval_path"] == "adaptive_second_pass"
+    assert client.single_calls == 2
+
+
+def test_adaptive_strategy_batches_heavily_normalized_queries(
+    fakes, monkeypatch
+) -> None:
+    model, client = fakes
+    monkeypatch.setattr(retrieval.settings, "dual_query_strategy", "adaptive")
+    payload = retrieval.dual_query_search("qdrant kia krta he", limit=3)
+    assert payload["retrieval_path"] == "adaptive_batched"
+    assert client.batch_calls == 1
+
+
+def test_repeated_query_is_served_from_embedding_cache(fakes) -> None:
+    model, client = fakes
+    retrieval.search_chunks("What does  Qdrant do", limit=3)
+    retrieval.search_chunks("What does Qdrant do ", limit=3)
+    assert model.encode_calls == 1
+    assert retrieval.get_query_embedding_cache().stats()["hits"] == 1
+
+
+class FakeAsyncClient:
+    def __init__(self) -> None:
+        self.batch_calls = 0
+
+    async def query_batch_points(self, collection_name, requests):
+        self.batch_calls += 1
+        return [
+            SimpleNamespace(points=[make_point(f"doc{i}-chunk-001", 0.5 + i / 10)])
+            for i, _ in enumerate(requests)
+        ]
+
+
+def test_dual_query_search_async_matches_sync_batching(fakes, monkeypatch) -> None:
+    model, _ = fakes
+    async_client = FakeAsyncClient()
+    monkeypatch.setattr(retrieval, "get_async_qdrant_client", lambda: async_client)
+    payload = asyncio.run(
+        retrieval.dual_query_search_async("qdrant kia karta he", limit=3)
+    )
+    assert model.encode_calls == 1
+    assert async_client.batch_calls == 1
+    assert payload["retrieval_path"] == "batched"
+    assert [item.chunk_id for item in payload["results"]] == [
+        "doc1-chunk-001",
+        "doc0-chunk-001",
+    ]
+
+
+def test_search_adapter_resolves_legacy_search_keyword_once() -> None:
+    class LegacyClient:
+        def search(self, collection_name, vector, limit):
+            return [make_point("a-chunk-001", 0.7)]
+
+    adapter = QdrantSearchAdapter(LegacyClient(), "documents")
+    assert adapter.search_method == "search"
+    assert adapter.batch_method == "per_vector"
+    assert adapter.search_batch([[1.0], [0.5]], 3)[1][0].score == 0.7
+
+
+def test_hybrid_search_fuses_lexical_hits_with_cosine_floor(fakes, monkeypatch) -> None:
+    from git_day_practice.bm25_index import BM25Index
+
+    index = BM25Index.from_chunk_records([
+        {
+            "chunk_id": "b-chunk-001",
+            "doc_id": "b",
+            "chunk_index": 1,
+            "text": "ERR-4711 explained",
+        },
+    ])
+    monkeypatch.setattr(retrieval.settings, "hybrid_search_enabled", True)
+    monkeypatch.setattr(retrieval, "get_bm25_index", lambda: index)
+
+    results = retrieval.search_chunks("ERR-4711", limit=3)
+    assert [item.chunk_id for item in results] == ["a-chunk-001", "b-chunk-001"]
+    # The lexical-only hit never scores above the vector candidates
+    assert results[1].score == results[0].score == 0.9
+
+
+def test_format_points_returns_compact_frozen_chunks() -> None:
+    from dataclasses import FrozenInstanceError
+
+    from git_day_practice.guardrails import compute_confidence
+    from git_day_practice.retrieved_chunk import RetrievedChunk
+
+    points = [make_point("a-chunk-001", 0.9), make_point("b-chunk-001", 0.5)]
+    results = retrieval._format_points(points)
+    assert all(isinstance(item, RetrievedChunk) for item in results)
+    assert not hasattr(results[0], "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        results[0].score = 1.0
+    assert compute_confidence(results) == {
+        "top_score": 0.9,
+        "avg_score": 0.7,
+        "result_count": 2,
+    }
+
+
+def test_search_adapter_is_resolved_at_startup(monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+    from git_day_practice import api
+
+    calls = []
+    monkeypatch.setattr(api, "get_search_adapter", lambda: calls.append(1))
+    with TestClient(api.app):
+        assert calls == [1]
+
+
+def test_bm25_index_reloads_after_collection_version_bump(monkeypatch) -> None:
+    loads = []
+    monkeypatch.setattr(retrieval, "load_bm25_index", lambda *paths: loads.append(1))
+    versions = iter([3, 3, 4])
+    cache = SimpleNamespace(get_collection_version=lambda name: next(versions))
+    monkeypatch.setattr(retrieval, "get_answer_cache", lambda: cache)
+    retrieval._load_bm25_index.cache_clear()
+
+    for _ in range(3):
+        retrieval.get_bm25_index()
+    assert len(loads) == 2
+    retrieval._load_bm25_index.cache_clear()
+
+
+def test_bm25_index_is_preloaded_at_startup_when_hybrid(monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+    from git_day_practice import api
+
+    calls = []
+    monkeypatch.setattr(api, "get_search_adapter", lambda: None)
+    monkeypatch.setattr(api, "get_bm25_index", lambda: calls.append(1))
+    monkeypatch.setattr(api.settings, "hybrid_search_enabled", True)
+    with TestClient(api.app):
+        assert calls == [1]
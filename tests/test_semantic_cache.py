@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from git_day_practice.semantic_cache import SemanticAnswerCache, chunk_overlap
+
+
+def test_chunk_overlap_is_jaccard() -> None:
+    assert chunk_overlap(["a", "b"], ["b", "c"]) == 1 / 3
+    assert chunk_overlap([], []) == 1.0
+
+
+def test_lookup_returns_answer_for_similar_question_with_same_evidence() -> None:
+    cache = SemanticAnswerCache(similarity_threshold=0.9, min_chunk_overlap=0.5)
+    cache.add("rag", [1.0, 0.0], ["c1", "c2"], 0, "answer", question="q1")
+    assert cache.lookup("rag", [0.99, 0.14], ["c1", "c2"], 0) == "answer"
+    assert cache.stats()["hits"] == 1
+
+
+def test_lookup_rejects_similar_question_with_different_evidence() -> None:
+    cache = SemanticAnswerCache(similarity_threshold=0.9, min_chunk_overlap=0.5)
+    cache.add("rag", [1.0, 0.0], ["c1", "c2"], 0, "answer")
+    assert cache.lookup("rag", [1.0, 0.0], ["c3", "c4"], 0) is None
+    stats = cache.stats()
+    assert stats["rejected_by_overlap"] == 1
+    assert stats["recent_rejections"][0]["chunk_overlap"] == 0.0
+
+
+def test_lookup_ignores_other_namespace_and_stale_version() -> None:
+    cache = SemanticAnswerCache(similarity_threshold=0.9)
+    cache.add("rag", [1.0, 0.0], ["c1"], 0, "answer")
+    assert cache.lookup("agent", [1.0, 0.0], ["c1"], 0) is None
+    assert cache.lookup("rag", [1.0, 0.0], ["c1"], 1) is None
+
+
+def test_ring_buffer_overwrites_oldest_entry() -> None:
+    cache = SemanticAnswerCache(max_entries=1, similarity_threshold=0.9)
+    cache.add("rag", [1.0, 0.0], ["c1"], 0, "first")
+    cache.add("rag", [0.0, 1.0], ["c1"], 0, "second")
+    assert cache.lookup("rag", [1.0, 0.0], ["c1"], 0) is None
+    assert cache.lookup("rag", [0.0, 1.0], ["c1"], 0) == "second"
+
+
+def test_cache_stats_endpoint_exposes_diagnostics(client) -> None:
+    response = client.get("/cache/stats")
+    assert response.status_code == 200
+    body = response.json()
+    for key in ("hit_rate", "rejected_by_overlap", "recent_hits", "recent_rejections"):
+        assert key in body
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from git_day_practice.bm25_index import BM25Index
+from git_day_practice.normalization import RomanUrduNormalizer
+from git_day_practice.spelling import (
+    SymSpellIndex,
+    bounded_edit_distance,
+    load_vocabulary,
+    save_vocabulary,
+)
+
+REPLACEMENTS = {"mujhay": "mujhe", "kia": "kya", "retrival": "retrieval"}
+VOCABULARY = {"retrieval": 12, "qdrant": 30, "embedding": 8, "mujhe": 5, "chunk": 20}
+
+
+def test_bounded_edit_distance_counts_transpositions_once() -> None:
+    assert bounded_edit_distance("qdrnat", "qdrant", 2) == 1
+    assert bounded_edit_distance("retreival", "retrieval", 2) == 1
+    assert bounded_edit_distance("abc", "xyzabc", 2) == 3
+
+
+def test_corrects_unknown_terms_to_nearest_known_word() -> None:
+    index = SymSpellIndex.build(VOCABULARY, REPLACEMENTS)
+    assert index.correct("retreival") == "retrieval"
+    assert index.correct("qdrnat") == "qdrant"
+    # A near-miss of a dictionary variant goes straight to its canonical form
+    assert index.correct("mujhayy") == "mujhe"
+    assert index.correct("embeddng") == "embedding"
+
+
+def test_leaves_known_short_and_distant_terms_alone() -> None:
+    index = SymSpellIndex.build(VOCABULARY, REPLACEMENTS)
+    assert index.correct("qdrant") is None
+    assert index.correct("xyz") is None
+    assert index.correct("1234") is None
+    assert index.correct("completelyunrelated") is None
+
+
+def test_ties_go_to_the_more_frequent_word() -> None:
+    index = SymSpellIndex.build({"chunk": 20, "chunks": 1, "chant": 2})
+    assert index.correct("chunkz") == "chunk"
+
+
+def test_normalizer_uses_corrector_for_unknown_tokens_only() -> None:
+    corrector = SymSpellIndex.build(VOCABULARY, REPLACEMENTS)
+    normalizer = RomanUrduNormalizer(REPLACEMENTS, corrector=corrector)
+    assert (
+        normalizer.normalize("Kia retreival qdrnat karta hai")
+        == "kya retrieval qdrant karta hai"
+    )
+    assert normalizer.count_changed_tokens("kia retreival") == 2
+    # Indexing text is never corrected, as it defines the vocabulary
+    assert normalizer.normalize_text("retreival", correct=False) == "retreival"
+
+
+def test_vocabulary_round_trip_from_bm25_index(tmp_path) -> None:
+    bm25 = BM25Index()
+    bm25.add([
+        {"chunk_id": "a", "doc_id": "d1", "text": "qdrant stores vectors"},
+        {"chunk_id": "b", "doc_id": "d2", "text": "qdrant retrieval"},
+    ])
+    path = tmp_path / "vocabulary.tsv"
+    save_vocabulary(path, bm25.vocabulary())
+    vocabulary = load_vocabulary(path)
+    assert vocabulary["qdrant"] == 2
+    assert vocabulary["retrieval"] == 1
+
+
+def test_corrector_is_built_at_startup_when_enabled(monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+    from git_day_practice import api
+
+    calls = []
+    monkeypatch.setattr(api, "get_search_adapter", lambda: None)
+    monkeypatch.setattr(api, "get_normalizer", lambda: calls.append(1))
+    monkeypatch.setattr(api.settings, "spelling_correction_enabled", True)
+    with TestClient(api.app):
+        assert calls == [1]
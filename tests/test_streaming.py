@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from git_day_practice import agent, answer_cache, rag
+from git_day_practice.answer_cache import InMemoryAnswerCache
+from git_day_practice.llm_client import LLMTimeoutError
+from git_day_practice.retrieved_chunk import RetrievedChunk
+from git_day_practice.settings import settings
+
+RESULTS = [
+    RetrievedChunk(
+        score=0.9,
+        chunk_id="c1",
+        doc_id="d1",
+        title="Qdrant",
+        text="Qdrant stores vectors.",
+    ),
+    RetrievedChunk(
+        score=0.8, chunk_id="c2", doc_id="d1", title="Qdrant", text="It searches them."
+    ),
+]
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        payload = json.loads(data.removeprefix("data: "))
+        events.append((name.removeprefix("event: "), payload))
+    return events
+
+
+@pytest.fixture()
+def stream_fakes(monkeypatch):
+    prompts = []
+
+    async def fake_search(question: str, limit: int) -> dict:
+        return {
+            "original_query": question,
+            "normalized_query": question.lower(),
+            "retrieval_path": "batched",
+            "results": RESULTS,
+        }
+
+    async def fake_stream(prompt: str):
+        prompts.append(prompt)
+        for delta in ["Qdrant ", "is a ", "vector database."]:
+            yield delta
+
+    monkeypatch.setattr(rag, "dual_query_search_async", fake_search)
+    monkeypatch.setattr(agent, "dual_query_search_async", fake_search)
+    monkeypatch.setattr(rag, "stream_answer_from_prompt_async", fake_stream)
+    monkeypatch.setattr(settings, "semantic_cache_enabled", False)
+    cache = InMemoryAnswerCache(ttl_seconds=60)
+    monkeypatch.setattr(answer_cache, "get_answer_cache", lambda: cache)
+    return prompts
+
+
+def test_rag_stream_sends_sources_tokens_then_done(client, stream_fakes) -> None:
+    response = client.post("/rag/stream", json={"question": "What is Qdrant?"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    names = [name for name, _ in events]
+    assert names == ["sources", "token", "token", "token", "done"]
+    assert [item["chunk_id"] for item in events[0][1]["sources"]] == ["c1", "c2"]
+    answer = "".join(data["text"] for name, data in events if name == "token")
+    assert answer == "Qdrant is a vector database."
+    done = events[-1][1]
+    assert done["answer_cache_hit"] is False
+    assert done["confidence"]["result_count"] == 2
+    assert set(done["timings_ms"]) == {"retrieval", "first_token", "total"}
+
+    # The streamed answer was cached, so a repeat arrives whole without the LLM
+    response = client.post("/rag/stream", json={"question": "What is Qdrant?"})
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == ["sources", "token", "done"]
+    assert events[1][1]["text"] == "Qdrant is a vector database."
+    assert events[-1][1]["answer_cache_type"] == "exact"
+    assert len(stream_fakes) == 1
+
+
+def post_agent_stream(client) -> list[tuple[str, dict]]:
+    payload = {"question": "What does Qdrant do?"}
+    return parse_events(client.post("/agent-rag/stream", json=payload).text)
+
+
+def test_agent_stream_sends_decision_and_skips_llm_on_refusal(
+    client, stream_fakes, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "min_top_score_for_answer", 0.95)
+    events = post_agent_stream(client)
+    assert [name for name, _ in events] == ["decision", "token", "done"]
+    assert events[0][1]["action"] == "refuse"
+    assert events[1][1]["text"] == agent.AGENT_FALLBACK_ANSWERS["refuse"]
+    assert stream_fakes == []
+
+
+def test_llm_failure_mid_stream_becomes_error_event(
+    client, stream_fakes, monkeypatch
+) -> None:
+    async def failing_stream(prompt: str):
+        yield "Qdrant "
+        raise LLMTimeoutError("LLM request timed out")
+
+    monkeypatch.setattr(rag, "stream_answer_from_prompt_async", failing_stream)
+    events = post_agent_stream(client)
+    assert [name for name, _ in events] == ["decision", "token", "error"]
+    assert events[-1][1] == {"status_code": 504, "detail": "LLM request timed out"}